@@ -0,0 +1,57 @@
+"""
+bench_data.py
+--------------------------------------
+基准测试用合成数据: 寄存器XML与AVES脚本, 结构同真实芯片文件
+(file -> device -> interface -> field[@class='Field'])。
+
+用法示例：
+    from bench_data import write_chip_xml, write_aves_script
+    write_chip_xml("chip.xml", num_pages=16, fields_per_page=64)
+    write_aves_script("chip_aves.txt", num_lines=2000)
+--------------------------------------
+"""
+
+FIRST_PAGE = 0x10
+
+
+def write_chip_xml(path, num_pages=16, fields_per_page=64):
+    """
+    每页fields_per_page个field, 每3个中1个12bit跨字节field, 其余3bit field
+    每5个field中1个为只读状态位(<access>R</access>)
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<file>\n<device>\n<name>BENCH</name>\n")
+        for page_index in range(num_pages):
+            page = FIRST_PAGE + page_index
+            f.write(f"<interface>\n<name>PAGE_{page_index}</name>\n")
+            for field_index in range(fields_per_page):
+                addr = (page << 8) | ((field_index * 2) & 0xFF)
+                if field_index % 3 == 0:
+                    f.write(
+                        f"<field class='Field'><name>reg{field_index}[11:0]</name><caption>REG {field_index}</caption>"
+                        f"<address>0x{addr:04X}.0</address><defaultvalue>0x{(field_index * 37) & 0xFFF:X}</defaultvalue>"
+                        f"<size>12</size><description>bench field {field_index}</description><datatype>uint</datatype>"
+                        f"<mask>{{0x{addr:04X}:0xFF,0x{addr + 1:04X}:0x0F}}</mask>"
+                        f"<shift>{{0x{addr:04X}:0,0x{addr + 1:04X}:-8}}</shift>"
+                        f"<byteorder>littleendian</byteorder></field>\n")
+                else:
+                    access = "<access>R</access>" if field_index % 5 == 0 else ""
+                    f.write(
+                        f"<field class='Field'><name>reg{field_index}</name><caption>REG {field_index}</caption>"
+                        f"<address>0x{addr:04X}.4</address><defaultvalue>{field_index % 8}</defaultvalue>"
+                        f"<size>3</size><description>bench field {field_index}</description><datatype>uint</datatype>"
+                        f"<mask>{{0x{addr:04X}:0x70}}</mask><shift>{{0x{addr:04X}:4}}</shift>{access}</field>\n")
+            f.write("</interface>\n")
+        f.write("</device>\n</file>\n")
+    return path
+
+
+def write_aves_script(path, num_lines=2000, num_pages=16):
+    """一个AVES函数 :01_01 Bench Power Up:, num_lines行寄存器写"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(":01_01 Bench Power Up:\n")
+        for i in range(num_lines):
+            page = FIRST_PAGE + (i >> 8) % num_pages
+            f.write(f"b0 {page:02x}{i & 0xFF:02x} {(i * 7) & 0xFF:02x} ; line {i}\n")
+        f.write("End\n")
+    return path
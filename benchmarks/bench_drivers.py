@@ -0,0 +1,206 @@
+"""
+bench_drivers.py
+--------------------------------------
+I2C驱动吞吐基准, 无需硬件。
+
+后端:
+- sim        DrvSim, 内存寄存器
+- ftdi_stub  DrvFTDI + stub_mpsse共享库(代替libMPSSE)
+- pi_fake    DrvPI(i2ctransfer) + fake i2ctransfer脚本(含进程启动开销)
+- aves_sim   aves_script(backend="sim"), 含脚本层
+
+访问模式: writeReg, readReg, writeBits, readRegs(64/256 burst), writeRegs整页,
+以及GetAVES生成脚本的整函数回放(aves_sim)。
+每个case先预热, 再跑 --repeat 次取最快一次, 降低噪声。
+
+输出JSON: 每个 "后端/模式" 的 ops/s 与延时百分位(us)。
+--baseline 与之前保存的JSON比较, ops/s下降超过 --tolerance 判为回退, 退出码1。
+
+用法：
+    python benchmarks/bench_drivers.py --out result.json
+    python benchmarks/bench_drivers.py --baseline result.json --tolerance 0.2
+--------------------------------------
+"""
+
+import argparse
+import contextlib
+import ctypes
+import importlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_data import write_aves_script, write_chip_xml
+from stub_libs import build_fake_i2ctransfer, build_stub_mpsse
+
+PAGE = 0x10
+
+
+def percentile(sorted_ns, pct):
+    index = min(len(sorted_ns) - 1, int(round(pct / 100.0 * (len(sorted_ns) - 1))))
+    return sorted_ns[index] / 1000.0
+
+
+def run_case(func, args, num, repeat=1):
+    #time every call, return ops/s + latency percentile in us
+    #warmup num/10 call, best of repeat run
+    for i in range(max(1, num // 10)):
+        func(*args)
+    best = None
+    perf_ns = time.perf_counter_ns
+    for r in range(repeat):
+        lat_ns = []
+        t_start = perf_ns()
+        for i in range(num):
+            t0 = perf_ns()
+            func(*args)
+            lat_ns.append(perf_ns() - t0)
+        total_ns = perf_ns() - t_start
+        if best is None or total_ns < best[0]:
+            best = (total_ns, lat_ns)
+    total_ns, lat_ns = best
+    lat_ns.sort()
+    return {
+        "num": num,
+        "ops_per_s": num / (total_ns / 1e9),
+        "p50_us": percentile(lat_ns, 50),
+        "p90_us": percentile(lat_ns, 90),
+        "p99_us": percentile(lat_ns, 99),
+        "max_us": lat_ns[-1] / 1000.0,
+    }
+
+
+def driver_cases(drv):
+    page_data = [i & 0xFF for i in range(256)]
+    return [
+        ("writeReg", drv.writeReg, (PAGE, 0x01, 0x5A)),
+        ("readReg", drv.readReg, (PAGE, 0x01)),
+        ("writeBits", drv.writeBits, (PAGE, 0x02, 4, 3, 5)),
+        ("readRegs64", drv.readRegs, (PAGE, 0x00, 64)),
+        ("readRegs256", drv.readRegs, (PAGE, 0x00, 256)),
+        ("writeRegs256", drv.writeRegs, (PAGE, 0x00, page_data)),
+    ]
+
+
+def make_backends(work_dir, xml_path):
+    from py_testenv.drv_sim import DrvSim
+    from py_testenv.drv_pi import DrvPI
+    from py_testenv.drv_ftdi import DrvFTDI
+    from py_testenv.get_aves_def import aves_script
+
+    backends = {}
+    backends["sim"] = lambda: DrvSim(xml_file_path=xml_path)
+
+    def make_ftdi():
+        lib = ctypes.CDLL(build_stub_mpsse())
+        with contextlib.redirect_stdout(None):
+            return DrvFTDI(ftd2xx_lib=lib, mpsse_lib=lib)
+    backends["ftdi_stub"] = make_ftdi
+    backends["pi_fake"] = lambda: DrvPI(i2ctransfer=build_fake_i2ctransfer())
+    backends["aves_sim"] = lambda: aves_script(backend="sim", xml_file_path=xml_path)
+    return backends
+
+
+def build_aves_module(work_dir, xml_path, num_lines):
+    #GetAVES -> generated script module, run in work_dir (reg_def written to cwd)
+    from py_testenv.get_aves import GetAVES
+    aves_path = write_aves_script(os.path.join(work_dir, "bench_aves.txt"), num_lines)
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        with contextlib.redirect_stdout(None):
+            GetAVES(xml_file_path=xml_path, aves_script_name=aves_path).write_aves_script()
+    finally:
+        os.chdir(cwd)
+    sys.path.insert(0, work_dir)
+    return importlib.import_module("bench_chip_scripts")
+
+
+def run_all(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        xml_path = write_chip_xml(os.path.join(work_dir, "bench_chip.xml"))
+        backends = make_backends(work_dir, xml_path)
+        for name in args.backends:
+            drv = backends[name]()
+            num = args.num_slow if name == "pi_fake" else args.num
+            for case_name, func, call_args in driver_cases(drv):
+                results[f"{name}/{case_name}"] = run_case(func, call_args, num, args.repeat)
+                print(f"{name + '/' + case_name:<28}{results[f'{name}/{case_name}']['ops_per_s']:>14.0f} ops/s",
+                      file=sys.stderr)
+
+        if "aves_sim" in args.backends:
+            module = build_aves_module(work_dir, xml_path, args.aves_lines)
+            chip = module.aves_script(backend="sim", xml_file_path=xml_path)
+            replay = chip.func_01_01_Bench_Power_Up
+            with contextlib.redirect_stdout(None):
+                results["aves_sim/replay"] = run_case(replay, (), args.num_replay, args.repeat)
+
+                def replay_batch():
+                    with chip.batch():
+                        replay()
+                results["aves_sim/replay_batch"] = run_case(replay_batch, (), args.num_replay, args.repeat)
+            for key in ("aves_sim/replay", "aves_sim/replay_batch"):
+                results[key]["writes_per_s"] = results[key]["ops_per_s"] * args.aves_lines
+                print(f"{key:<28}{results[key]['writes_per_s']:>14.0f} writes/s", file=sys.stderr)
+    return results
+
+
+def compare_baseline(results, baseline, tolerance):
+    #ops/s drop > tolerance -> regression
+    regressions = []
+    for key, base in baseline.get("results", {}).items():
+        new = results.get(key)
+        if new is None:
+            continue
+        ratio = new["ops_per_s"] / base["ops_per_s"]
+        status = "REGRESSION" if ratio < 1.0 - tolerance else "ok"
+        print(f"{key:<28}{base['ops_per_s']:>12.0f} -> {new['ops_per_s']:>12.0f}  {ratio:6.2f}x  {status}",
+              file=sys.stderr)
+        if status != "ok":
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--backends", nargs="+", default=["sim", "ftdi_stub", "pi_fake", "aves_sim"])
+    arg_parser.add_argument("-n", "--num", type=int, default=2000, help="calls per case")
+    arg_parser.add_argument("--num-slow", type=int, default=100, help="calls per case for pi_fake")
+    arg_parser.add_argument("--num-replay", type=int, default=10, help="AVES function replays")
+    arg_parser.add_argument("--aves-lines", type=int, default=2000, help="writes in AVES function")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs per case, best one kept")
+    arg_parser.add_argument("--out", help="save JSON result")
+    arg_parser.add_argument("--baseline", help="JSON result to compare")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed ops/s drop, 0.2 -> 20%%")
+    args = arg_parser.parse_args()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": run_all(args),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare_baseline(report["results"], baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
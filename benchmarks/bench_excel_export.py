@@ -0,0 +1,68 @@
+"""
+bench_excel_export.py
+--------------------------------------
+XMLParser.xml_to_excel 普通工作簿(write_only=False) 与 write_only流式写出 对比,
+字段表预先生成, 只测导出本身。
+
+报告:
+- 耗时(不开tracemalloc单独计时)
+- 导出过程内存峰值(tracemalloc)
+- 输出文件大小
+
+用法：
+    python benchmarks/bench_excel_export.py [--pages 16] [--fields 256]
+--------------------------------------
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_data import write_chip_xml
+from py_testenv.xml_parser import XMLParser
+
+
+def run_export(parser, path, write_only):
+    gc.collect()
+    t0 = time.perf_counter()
+    parser.xml_to_excel(path, write_only=write_only)
+    elapsed = time.perf_counter() - t0
+
+    gc.collect()
+    tracemalloc.start()
+    parser.xml_to_excel(path, write_only=write_only)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, os.path.getsize(path)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--pages", type=int, default=16, help="XML page number")
+    arg_parser.add_argument("--fields", type=int, default=256, help="field per page")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        xml_path = write_chip_xml(os.path.join(work_dir, "bench_chip.xml"),
+                                  num_pages=args.pages, fields_per_page=args.fields)
+        parser = XMLParser(xml_path, cache=False)
+        num_rows = len(parser.get_field_records())
+
+        results = {}
+        for name, write_only in (("workbook", False), ("write_only", True)):
+            results[name] = run_export(parser, os.path.join(work_dir, f"{name}.xlsx"), write_only)
+
+    print(f"row: {num_rows}")
+    print(f"{'mode':<14}{'time s':>10}{'peak MB':>10}{'file MB':>10}")
+    for name, (elapsed, peak, file_size) in results.items():
+        print(f"{name:<14}{elapsed:>10.3f}{peak / 1e6:>10.1f}{file_size / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
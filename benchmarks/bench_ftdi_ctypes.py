@@ -0,0 +1,118 @@
+"""
+bench_ftdi_ctypes.py
+--------------------------------------
+DrvFTDI ctypes调用开销微基准。
+
+stub_mpsse共享库代替libMPSSE, C侧几乎无开销, 测出的就是每次调用的
+Python/ctypes开销:
+- legacy: 原写法, 每次新建list/(c_uint8*n)数组/c_uint32, 无argtypes
+- fast:   DrvFTDI当前写法, 预绑定带argtypes的函数 + 复用buffer
+
+用法：
+    python benchmarks/bench_ftdi_ctypes.py [-n 200000]
+--------------------------------------
+"""
+
+import argparse
+import ctypes
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from stub_libs import build_stub_mpsse
+from py_testenv.drv_ftdi import DrvFTDI, FT_OK, I2C_ADDR_OPTIONS, I2C_READ_OPTIONS, I2C_WRITE_OPTIONS
+
+
+class LegacyCalls:
+    #copy of the call pattern before prebound prototype
+    def __init__(self, lib, handle, chip_addr):
+        self.lib = lib
+        self.handle = handle
+        self.chip_addr = ctypes.c_uint32(chip_addr)
+        self.bytes_written = ctypes.c_ulong()
+
+    def writeReg(self, addr1, addr2, data_8b):
+        command = [addr1, addr2, data_8b]
+        status = self.lib.I2C_DeviceWrite(
+            self.handle,
+            self.chip_addr,
+            ctypes.c_uint32(3),
+            (ctypes.c_uint8 * 3)(*command),
+            ctypes.byref(self.bytes_written),
+            ctypes.c_uint32(I2C_WRITE_OPTIONS)
+        )
+        if status != FT_OK:
+            raise RuntimeError(f"FAIL I2C write: {status}")
+        aves_str = self.get_aves_str(addr1, addr2, data_8b)
+        self.print_str_to_aves(aves_str)
+
+    def get_aves_str(self, addr1, addr2, value):
+        return f"{0xb0:02x} {addr1:02x}{addr2:02x} {value:02x};\n"
+
+    def print_str_to_aves(self, print_str):
+        return
+
+    def readReg(self, addr1, addr2):
+        command = [addr1, addr2]
+        status = self.lib.I2C_DeviceWrite(
+            self.handle,
+            self.chip_addr,
+            ctypes.c_uint32(2),
+            (ctypes.c_uint8 * 2)(*command),
+            ctypes.byref(self.bytes_written),
+            ctypes.c_uint32(I2C_ADDR_OPTIONS)
+        )
+        if status != FT_OK:
+            raise RuntimeError(f"FAIL I2C write page_addr: {status}")
+        rb_buffer = (ctypes.c_uint8 * 1)()
+        status = self.lib.I2C_DeviceRead(
+            self.handle,
+            self.chip_addr,
+            ctypes.c_uint32(1),
+            rb_buffer,
+            ctypes.byref(self.bytes_written),
+            ctypes.c_uint32(I2C_READ_OPTIONS)
+        )
+        if status != FT_OK:
+            raise RuntimeError(f"FAIL I2C read data: {status}")
+        return list(rb_buffer)[0]
+
+
+def time_calls(func, args, num):
+    t0 = time.perf_counter()
+    for i in range(num):
+        func(*args)
+    return (time.perf_counter() - t0) / num * 1e9
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("-n", "--num", type=int, default=200000, help="calls per case")
+    args = arg_parser.parse_args()
+
+    lib_path = build_stub_mpsse()
+    #two CDLL objects, legacy one keep no argtypes
+    fast_lib = ctypes.CDLL(lib_path)
+    legacy_lib = ctypes.CDLL(lib_path)
+
+    drv = DrvFTDI(i2c_port=0, ftd2xx_lib=fast_lib, mpsse_lib=fast_lib)
+    legacy = LegacyCalls(legacy_lib, drv.handle, 0x58)
+
+    cases = [
+        ("writeReg", legacy.writeReg, drv.ftdi_i2c_writeReg, (0x26, 0x01, 0x5A)),
+        ("readReg", legacy.readReg, drv.ftdi_i2c_readReg, (0x26, 0x01)),
+    ]
+    print(f"{'case':<10}{'legacy ns/call':>16}{'fast ns/call':>16}{'speedup':>10}")
+    for name, legacy_func, fast_func, call_args in cases:
+        assert legacy_func(*call_args) == fast_func(*call_args)
+        ns_legacy = time_calls(legacy_func, call_args, args.num)
+        ns_fast = time_calls(fast_func, call_args, args.num)
+        print(f"{name:<10}{ns_legacy:>16.0f}{ns_fast:>16.0f}{ns_legacy / ns_fast:>9.2f}x")
+
+    drv.close_ftdi()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+bench_mpsse_queue.py
+--------------------------------------
+MpsseQueue打包效率, MpsseSim代替FTDI, 无需硬件。
+
+报告每种访问模式:
+- 每个USB传输(FT_Write+FT_Read)承载的i2c事务数
+- USB往返次数 vs libMPSSE逐次调用(writeReg 1次, readReg 2次)
+- Python侧打包+解析的事务速率
+
+用法：
+    python benchmarks/bench_mpsse_queue.py [--block-size 4096]
+--------------------------------------
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from py_testenv.mpsse_queue import DEFAULT_BLOCK_SIZE, MpsseQueue
+from py_testenv.mpsse_sim import MpsseSim
+
+
+def make_cases():
+    return [
+        ("single write x2000", [("w", 0x10 + (i >> 8), i & 0xFF, (i & 0xFF,)) for i in range(2000)], 2000),
+        ("single read x2000", [("r", 0x10 + (i >> 8), i & 0xFF, 1) for i in range(2000)], 4000),
+        ("mixed w/r x2000", [("w", 0x10, i & 0xFF, (i & 0xFF,)) if i % 2 else ("r", 0x10, i & 0xFF, 1)
+                             for i in range(2000)], 3000),
+        ("page read x16", [("r", 0x10 + i, 0x00, 256) for i in range(16)], 32),
+        ("512B read x4", [("r", 0x10 + 2 * i, 0x00, 512) for i in range(4)], 8),
+    ]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="MPSSE block byte")
+    args = arg_parser.parse_args()
+
+    print(f"{'case':<22}{'txn/USB':>10}{'USB queue':>11}{'USB libMPSSE':>14}{'txn/s':>12}")
+    for name, txns, usb_libmpsse in make_cases():
+        sim = MpsseSim()
+        queue = MpsseQueue(sim, block_size=args.block_size)
+        t0 = time.perf_counter()
+        queue.run(txns)
+        elapsed = time.perf_counter() - t0
+        usb_queue = sim.usb_writes + sim.usb_reads
+        print(f"{name:<22}{queue.transactions_per_block():>10.1f}{usb_queue:>11}{usb_libmpsse:>14}"
+              f"{len(txns) / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+bench_multi_port.py
+--------------------------------------
+MultiPortRunner多端口并行 vs 逐个端口串行, sim后端模拟总线延时, 无需硬件。
+
+报告每个端口数:
+- 串行/并行墙钟时间
+- 加速比(理想值=端口数, 受GIL下Python侧开销限制)
+
+用法：
+    python benchmarks/bench_multi_port.py [--ports 4] [--writes 200] [--latency 0.002]
+--------------------------------------
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from py_testenv.multi_port import MultiPortRunner
+
+
+def make_sweep(num_writes):
+    def sweep(chip):
+        for i in range(num_writes):
+            chip.writeReg(0x10 + (i >> 8), i & 0xFF, i & 0xFF)
+        return chip.readRegs(0x10, 0x00, 16)
+    return sweep
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--ports", type=int, default=4, help="max port number")
+    arg_parser.add_argument("--writes", type=int, default=200, help="writeReg per port")
+    arg_parser.add_argument("--latency", type=float, default=2e-3, help="sim bus latency, second")
+    args = arg_parser.parse_args()
+
+    sweep = make_sweep(args.writes)
+    print(f"{'ports':<8}{'serial s':>10}{'parallel s':>12}{'speedup':>9}")
+    for num_ports in range(1, args.ports + 1):
+        with MultiPortRunner(ports=range(num_ports), backend="sim", latency=args.latency) as runner:
+            report = runner.compare(sweep)
+        failed = [res for res in report["parallel"].values() if not res.ok]
+        if failed:
+            raise RuntimeError(f"port fail: {failed}")
+        print(f"{num_ports:<8}{report['serial_s']:>10.3f}{report['parallel_s']:>12.3f}{report['speedup']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+bench_snapshot.py
+--------------------------------------
+RegSnapshot全芯片快照: sim后端抓取, 存/读二进制文件, 与XML默认值及上一快照
+做字段级diff, 无需硬件。模拟扫描: 每个快照前随机改几个寄存器。
+
+报告:
+- 抓取/保存/加载/字节diff/字段diff 每个快照耗时
+- 单个快照文件大小
+
+用法：
+    python benchmarks/bench_snapshot.py [--num 1000] [--pages 16] [--changes 4]
+--------------------------------------
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_data import write_chip_xml
+from py_testenv.drv_sim import DrvSim
+from py_testenv.reg_snapshot import FieldMap, RegSnapshot
+from py_testenv.xml_parser import XMLParser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--num", type=int, default=1000, help="snapshot number")
+    arg_parser.add_argument("--pages", type=int, default=16, help="XML page number")
+    arg_parser.add_argument("--changes", type=int, default=4, help="reg write between snapshot")
+    args = arg_parser.parse_args()
+
+    rand = random.Random(0)
+    with tempfile.TemporaryDirectory() as work_dir:
+        xml_path = write_chip_xml(os.path.join(work_dir, "bench_chip.xml"), num_pages=args.pages)
+        parser = XMLParser(xml_path, cache=False)
+        pages = parser.parse_to_dict()
+        field_map = FieldMap.from_parser(parser)
+        default_snap = RegSnapshot.from_defaults(field_map)
+        drv = DrvSim(reg_defaults=parser.get_reg_defaults())
+        field_addrs = sorted(field_map.addr_fields)
+
+        t0 = time.perf_counter()
+        paths = []
+        for i in range(args.num):
+            for _ in range(args.changes):
+                addr = rand.choice(field_addrs)
+                drv.writeReg(addr >> 8, addr & 0xFF, rand.randrange(256))
+            snap = RegSnapshot.capture(drv.readRegs, pages, label=f"step_{i}")
+            paths.append(snap.save(os.path.join(work_dir, f"step_{i:05d}.snap")))
+        t_capture = time.perf_counter() - t0
+        file_size = os.path.getsize(paths[0])
+
+        t0 = time.perf_counter()
+        snaps = [RegSnapshot.load(path) for path in paths]
+        t_load = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        num_bytes = sum(len(b.diff_bytes(a)) for a, b in zip(snaps, snaps[1:]))
+        t_diff_bytes = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        num_fields = sum(len(b.diff_fields(a, field_map)) for a, b in zip(snaps, snaps[1:]))
+        t_diff_fields = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        num_default = sum(len(snap.diff_fields(default_snap, field_map)) for snap in snaps)
+        t_diff_default = time.perf_counter() - t0
+
+    num = args.num
+    print(f"snapshot: {num}, page: {len(pages)}, field: {len(field_map.fields)}, file: {file_size} byte")
+    print(f"{'step':<26}{'total s':>10}{'us/snap':>10}{'diff found':>12}")
+    for name, elapsed, found in (
+        ("capture+save (sim)", t_capture, ""),
+        ("load", t_load, ""),
+        ("diff bytes vs previous", t_diff_bytes, num_bytes),
+        ("diff fields vs previous", t_diff_fields, num_fields),
+        ("diff fields vs XML default", t_diff_default, num_default),
+    ):
+        print(f"{name:<26}{elapsed:>10.3f}{elapsed / num * 1e6:>10.1f}{found:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+bench_xml_parse.py
+--------------------------------------
+XMLParser 整树解析(ET.parse) 与 流式解析(stream=True, iterparse) 对比:
+同一合成XML分别构建dev_addr_dict + json_data, 校验结果一致。
+
+报告:
+- 耗时(不开tracemalloc单独计时)
+- 内存峰值与json生成后仍占用的内存(tracemalloc)
+
+用法：
+    python benchmarks/bench_xml_parse.py [--pages 256] [--fields 256]
+--------------------------------------
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_data import write_chip_xml
+from py_testenv.xml_parser import XMLParser
+
+
+def build(xml_path, stream):
+    parser = XMLParser(xml_path, stream=stream, cache=False)
+    parser.parse_to_dict()
+    parser.xml_to_json()
+    return parser
+
+
+def run_time(xml_path, stream):
+    gc.collect()
+    t0 = time.perf_counter()
+    parser = build(xml_path, stream)
+    return time.perf_counter() - t0, parser
+
+
+def run_memory(xml_path, stream):
+    gc.collect()
+    tracemalloc.start()
+    parser = build(xml_path, stream)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del parser
+    return peak, current
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--pages", type=int, default=256, help="XML page number")
+    arg_parser.add_argument("--fields", type=int, default=256, help="field per page")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        xml_path = write_chip_xml(os.path.join(work_dir, "bench_chip.xml"),
+                                  num_pages=args.pages, fields_per_page=args.fields)
+        file_mb = os.path.getsize(xml_path) / 1e6
+
+        results = {}
+        parsers = {}
+        for name, stream in (("tree (ET.parse)", False), ("stream (iterparse)", True)):
+            elapsed, parsers[name] = run_time(xml_path, stream)
+            peak, retained = run_memory(xml_path, stream)
+            results[name] = (elapsed, peak, retained)
+
+    tree, stream = parsers.values()
+    same = (tree.dev_addr_dict == stream.dev_addr_dict and tree.json_data == stream.json_data)
+    print(f"xml: {file_mb:.1f} MB, page: {len(tree.dev_addr_dict)}, "
+          f"record: {len(tree.get_field_records())}, same result: {same}")
+    print(f"{'mode':<22}{'time s':>10}{'peak MB':>10}{'retained MB':>13}")
+    for name, (elapsed, peak, retained) in results.items():
+        print(f"{name:<22}{elapsed:>10.3f}{peak / 1e6:>10.1f}{retained / 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
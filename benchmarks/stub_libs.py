@@ -0,0 +1,61 @@
+"""
+stub_libs.py
+--------------------------------------
+Build stand-in libs for driver benchmark, no hardware:
+1. stub_mpsse.c -> shared lib, replace ftd2xx.dll + libMPSSE.dll
+2. fake i2ctransfer shell script, replace /usr/sbin/i2ctransfer
+
+用法示例：
+    from stub_libs import build_stub_mpsse
+    lib_path = build_stub_mpsse()
+--------------------------------------
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = os.path.join(tempfile.gettempdir(), "py_testenv_bench")
+
+
+def build_stub_mpsse(cc="cc"):
+    """编译stub_mpsse.c, 返回共享库路径(已是最新则不重编)"""
+    src = os.path.join(BENCH_DIR, "stub_mpsse.c")
+    ext = ".dll" if sys.platform == "win32" else ".so"
+    out = os.path.join(BUILD_DIR, "stub_mpsse" + ext)
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    if not os.path.isfile(out) or os.path.getmtime(out) < os.path.getmtime(src):
+        subprocess.check_call([cc, "-O2", "-shared", "-fPIC", "-o", out, src])
+    return out
+
+
+FAKE_I2CTRANSFER = """#!/bin/sh
+# fake i2ctransfer: accept any msg, print 0x00 for every read byte,
+# one line per read msg, same as i2ctransfer -f -y
+for arg in "$@"; do
+    case "$arg" in
+        r*@*)
+            num=${arg#r}
+            num=${num%@*}
+            line=""
+            while [ "$num" -gt 0 ]; do
+                line="$line 0x00"
+                num=$((num - 1))
+            done
+            echo "${line# }"
+            ;;
+    esac
+done
+"""
+
+
+def build_fake_i2ctransfer():
+    """写出fake i2ctransfer脚本, 返回路径"""
+    out = os.path.join(BUILD_DIR, "i2ctransfer")
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    with open(out, "w") as f:
+        f.write(FAKE_I2CTRANSFER)
+    os.chmod(out, 0o755)
+    return out
@@ -0,0 +1,79 @@
+/*
+ * stub_mpsse.c
+ * Stand-in for ftd2xx.dll + libMPSSE.dll, build as one shared lib.
+ * Keep a 64K register file, I2C_DeviceWrite set reg pointer with the
+ * first 2 bytes (addr1, addr2) and write the rest, I2C_DeviceRead read
+ * from the reg pointer. No USB, only the C call cost is left.
+ */
+#include <stdint.h>
+#include <string.h>
+
+typedef unsigned long FT_STATUS;
+typedef void *FT_HANDLE;
+
+static uint8_t reg_file[65536];
+static uint16_t reg_ptr;
+static unsigned long num_write;
+static unsigned long num_read;
+
+typedef struct {
+    unsigned long Flags;
+    unsigned long Type;
+    unsigned long ID;
+    unsigned long LocId;
+    char SerialNumber[16];
+    char Description[64];
+    void *ftHandle;
+} FT_DEVICE_LIST_INFO_NODE;
+
+FT_STATUS FT_CreateDeviceInfoList(unsigned long *num)
+{
+    *num = 1;
+    return 0;
+}
+
+FT_STATUS FT_GetDeviceInfoList(FT_DEVICE_LIST_INFO_NODE *list, unsigned long *num)
+{
+    memset(list, 0, sizeof(*list));
+    strcpy(list->SerialNumber, "STUB0A");
+    strcpy(list->Description, "stub mpsse");
+    *num = 1;
+    return 0;
+}
+
+FT_STATUS FT_OpenEx(void *arg, unsigned long flags, FT_HANDLE *handle)
+{
+    *handle = (FT_HANDLE)reg_file;
+    return 0;
+}
+
+FT_STATUS FT_ResetDevice(FT_HANDLE handle) { return 0; }
+FT_STATUS FT_Close(FT_HANDLE handle) { return 0; }
+FT_STATUS I2C_InitChannel(FT_HANDLE handle, void *config) { return 0; }
+
+FT_STATUS I2C_DeviceWrite(FT_HANDLE handle, uint32_t dev, uint32_t size,
+                          uint8_t *buf, uint32_t *done, uint32_t options)
+{
+    uint32_t i;
+    num_write++;
+    if (size >= 2)
+        reg_ptr = (uint16_t)((buf[0] << 8) | buf[1]);
+    for (i = 2; i < size; i++)
+        reg_file[reg_ptr++] = buf[i];
+    *done = size;
+    return 0;
+}
+
+FT_STATUS I2C_DeviceRead(FT_HANDLE handle, uint32_t dev, uint32_t size,
+                         uint8_t *buf, uint32_t *done, uint32_t options)
+{
+    uint32_t i;
+    num_read++;
+    for (i = 0; i < size; i++)
+        buf[i] = reg_file[reg_ptr++];
+    *done = size;
+    return 0;
+}
+
+unsigned long stub_num_write(void) { return num_write; }
+unsigned long stub_num_read(void) { return num_read; }
@@ -5,6 +5,7 @@ py_testenv 包初始化文件
 
 包含主要模块：
 - xml_parser
+- reg_model
 - get_aves
 - auto_py_script
 - drv_ftdi
@@ -19,5 +20,6 @@ py_testenv 包初始化文件
 
 # 可选：导入常用类
 from .xml_parser import XMLParser
+from .reg_model import RegisterModel
 from .get_aves import GetAVES
 from .auto_py_script import AutoPyScript
@@ -9,7 +9,7 @@ auto_py_script.py
 2. 支持去重、清理、分组寄存器字段。
 3. 可自动生成Python寄存器访问类文件，便于后续脚本开发。
 
-依赖：json, xml_parser
+依赖：json, reg_model
 
 用法示例：
     from auto_py_script import AutoPyScript
@@ -23,39 +23,62 @@ auto_py_script.py
 
 import json
 import os
+import re
 import shutil
 
-from .xml_parser import XMLParser
+from .reg_model import RegisterModel
 from .get_aves import GetAVES
 
+# Regex 匹配 AutoClass.<PAGE>.<reg>.<op>(), 及行首缩进
+AUTO_CLASS_RE = re.compile(r"AutoClass\.(?P<page>\w+)\.(?P<reg>\w+)\.(?P<op>r|w)\(\s*(?P<args>[^)]*)\)")
+INDENT_RE = re.compile(r'\s*')
+
 class AutoPyScript:
 
     def __init__(self,
                  xml_file_path: str,
                  aves_script_name: str,
-                 class_instance_name: str = "super()"):
+                 class_instance_name: str = "super()",
+                 model: RegisterModel = None):
         """
-        初始化类，从XML里build json data。
+        初始化类，寄存器数据来自RegisterModel, 首次使用时才解析XML。
         :param xml_file_path: XML文件路径
+        :param model: (可选)共用的RegisterModel, 默认按xml_file_path新建
         """
         self.aves_script_name = aves_script_name
         self.class_instance_name = class_instance_name
 
-        #get data from XML use XMLParser
-        self.parser = XMLParser(xml_file_path)
-        self.parser.xml_to_json()
-        self.data = self.parser.json_data
-
-        self.unique_data = self._remove_page_level_duplicates()
-        self.page_name_dict = self._create_page_name_dict()
-        self.page_reg_map = self._create_page_reg_map()
+        #XML parse once, shared with GetAVES
+        self.model = model if model is not None else RegisterModel(xml_file_path)
 
         # init GetAVES instance
         self.get_aves = GetAVES(
             xml_file_path=xml_file_path,
             aves_script_name=aves_script_name,
+            model=self.model,
         )
 
+    #data from model, build on first access
+    @property
+    def parser(self):
+        return self.model.parser
+
+    @property
+    def data(self):
+        return self.model.json_data
+
+    @property
+    def unique_data(self):
+        return self.model.unique_data
+
+    @property
+    def page_name_dict(self):
+        return self.model.page_name_dict
+
+    @property
+    def page_reg_map(self):
+        return self.model.page_reg_map
+
     def aves_buildall(self):
         """
         一键生成Python脚本、C头文件、C源文件。
@@ -66,52 +89,6 @@ class AutoPyScript:
         self.get_aves.write_c_file()
         print("GetAVES All files generated.")
 
-    def _create_page_reg_map(self):
-        """
-        构建两级哈希表：PAGE -> register_name -> [寄存器信息字典]，支持O(1)查找。
-        """
-        page_reg_map = {}
-        for page, registers in self.data.items():
-            if page not in page_reg_map:
-                page_reg_map[page] = {}
-            for reg in registers:
-                reg_name = reg.get("register_name")
-                if reg_name:
-                    if reg_name not in page_reg_map[page]:
-                        page_reg_map[page][reg_name] = []
-                    page_reg_map[page][reg_name].append(reg.copy())
-        return page_reg_map
-
-    def _create_page_name_dict(self):
-        """
-        从unique_data生成一个只包含PAGE name和register_name的字典。
-        """
-        page_name_dict = {}
-        for key, registers in self.unique_data.items():
-            page_name_dict[key] = [
-                reg.get("register_name")
-                for reg in registers 
-                if reg.get("register_name")
-            ]
-        return page_name_dict
-
-    def _remove_page_level_duplicates(self):
-        """
-        在每个PAGE下去除重复的register_name
-        :return: 去重后的JSON数据
-        """
-        unique_data = {}
-        for key, registers in self.data.items():
-            seen_fields = set()
-            unique_registers = []
-            for register in registers:
-                field_name = register.get("register_name")
-                if field_name and field_name not in seen_fields:
-                    unique_registers.append(register)
-                    seen_fields.add(field_name)
-            unique_data[key] = unique_registers
-        return unique_data
-
     def _convert_to_valid_class_name(self, name: str) -> str:
         """
         将寄存器名称转换为有效的Python类名
@@ -139,7 +116,7 @@ class AutoPyScript:
         :param output_file_path: 输出的Python文件路径
         """
 
-        #self.page_name_dict initial in __init__
+        #self.page_name_dict from model, build on first access
         
         # 开始写入文件
         with open(output_file_path, "w", encoding="utf-8") as f:
@@ -183,7 +160,7 @@ class AutoPyScript:
         根据输入的page和reg_name，O(1)查找寄存器信息。
         :param page: PAGE名称
         :param reg_name: 要查询的寄存器名称
-        :return: 包含该寄存器所有信息的字典（如有多个，返回列表）
+        :return: 该寄存器各字节的FieldDesc元组, 见reg_model.py
         """
         page_dict = self.page_reg_map.get(page)
         if not page_dict:
@@ -191,42 +168,16 @@ class AutoPyScript:
         result = page_dict.get(reg_name)
         if not result:
             return None
-        #result is dict list
+        #result is FieldDesc tuple
         return result
 
-    def _get_addr12(self, addr_str) -> list:
-        addr_int = int(addr_str, 16)
-        addr1 = (addr_int >> 8) & 0xFF
-        addr2 = addr_int & 0xFF
-        # 返回十六进制字符串
-        return [f"0x{addr1:02X}", f"0x{addr2:02X}"]
-    
-    def _get_rshift_str(self, byte_shift: str) -> str:
-        shift = int(byte_shift)
-        if shift == 0:
-            return ""
-        elif shift < 0:
-            return f"<<{-shift}"
-        else:
-            return f">>{shift}"
-
     def _get_read_cmd(self, reg_info) -> str:
-        addr_str = reg_info.get("byte_address")
-        [addr1, addr2] = self._get_addr12(addr_str)
-        #lsb = int(reg_info.get("byte_shift")) % 8
-        #bits = reg_info.get("effective_bits")
-
-        byte_mask = reg_info.get("byte_mask")
-        if byte_mask == "0xFF":
-            byte_mask_str = ""
-        else:
-            byte_mask_str = f"&{byte_mask}"
-
-        shift_str = self._get_rshift_str(reg_info.get("byte_shift"))
-
-        cmd = f"( {self.class_instance_name}.readReg({addr1},{addr2}){byte_mask_str} ) {shift_str}"
+        #reg_info -> FieldDesc, addr/mask/shift string precomputed
+        if reg_info.read_shift_str is None:
+            raise ValueError(f"{reg_info.record.register_name}: no byte_shift")
+        cmd = (f"( {self.class_instance_name}.readReg({reg_info.addr1_str},{reg_info.addr2_str})"
+               f"{reg_info.read_mask_str} ) {reg_info.read_shift_str}")
         return cmd
-        
 
     def _get_read_list(self, page: str, reg_name: str) -> list:
         return_list = []
@@ -250,51 +201,13 @@ class AutoPyScript:
                 return_list.append(full_cmd)
         return return_list
 
-    def _mask_to_lsb_bits(self, mask: str) -> list:
-        """
-        将I2C掩码转换为LSB位置和位数
-        
-        参数:
-            mask (str): 掩码值，是十六进制字符串(如"0xF0")
-        
-        返回:
-            tuple: (lsb, bits) - LSB位置和位数
-            
-        示例:
-            >>> mask_to_lsb_bits("0xF0")
-            (4, 4)
-            >>> mask_to_lsb_bits(0b11000000)
-            (6, 2)
-        """
-        mask = int(mask, 16)
-        
-        # 确保mask是整数
-        mask = int(mask)
-        
-        if mask == 0:
-            return (0, 0)
-        
-        # 计算LSB位置（第一个置1的位的位置）
-        lsb = (mask & -mask).bit_length() - 1
-        
-        # 计算连续1的位数
-        shifted = mask >> lsb
-        bits = 0
-        while (shifted & 1):
-            bits += 1
-            shifted >>= 1
-        
-        return [lsb, bits]
-    
-    def _get_w_val(self, shift: str, mask: str, w_str: str) -> int:
+    def _get_w_val(self, shift_num: int, mask_num: int, w_str: str) -> int:
         # 处理字符串形式的input
         if w_str.startswith(('0x', '0X')):
             w_num = int(w_str, 16)
         else:
             w_num = int(w_str)
 
-        shift_num = int(shift)
-        mask_num = int(mask, 16)
         if shift_num == 0:
             out_val = w_num & mask_num
         elif shift_num < 0:
@@ -305,16 +218,13 @@ class AutoPyScript:
 
 
     def _get_write_cmd(self, reg_info, value_var) -> str:
-        addr_str = reg_info.get("byte_address")
-        mask_str = reg_info.get("byte_mask")
-        shift_str = reg_info.get("byte_shift")
-        #value_str = str(value_var)
-
-        [addr1, addr2] = self._get_addr12(addr_str)
-        [lsb, bits] = self._mask_to_lsb_bits(mask_str)
-        write_val_num = self._get_w_val(shift_str, mask_str, value_var)
+        #reg_info -> FieldDesc, only value parse per call site
+        if reg_info.mask is None or reg_info.shift is None:
+            raise ValueError(f"{reg_info.record.register_name}: no byte_mask/byte_shift")
+        write_val_num = self._get_w_val(reg_info.shift, reg_info.mask, value_var)
 
-        cmd = f"{self.class_instance_name}.writeBits({addr1},{addr2},{lsb},{bits},{write_val_num})"
+        cmd = (f"{self.class_instance_name}.writeBits({reg_info.addr1_str},{reg_info.addr2_str},"
+               f"{reg_info.lsb},{reg_info.width},{write_val_num})")
         return cmd
 
     def _get_write_list(self, page: str, reg_name: str, value_var: str) -> list:
@@ -359,15 +269,13 @@ class AutoPyScript:
         自动生成寄存器操作脚本，replace指定文件。
         :param file_path: 输出的Python脚本文件路径
         """
-        import re
         # 备份原文件
         self._backup_file_before_write(file_path)
         # 读取原文件内容
         with open(file_path, "r", encoding="utf-8") as fr:
             lines = fr.readlines()
         new_lines = []
-        # Regex 匹配 AutoClass.<PAGE>.<reg>.<op>()
-        pattern = re.compile(r"AutoClass\.(?P<page>\w+)\.(?P<reg>\w+)\.(?P<op>r|w)\(\s*(?P<args>[^)]*)\)")
+        pattern = AUTO_CLASS_RE
         for line in lines:
             m = pattern.search(line)
             if m:
@@ -375,7 +283,7 @@ class AutoPyScript:
                 reg = m.group('reg')
                 op = m.group('op')
                 args = m.group('args').strip()
-                indent = re.match(r'\s*', line).group(0)
+                indent = INDENT_RE.match(line).group(0)
 
                 if op == 'r':
                     cmds = self._get_read_list(page, reg)
@@ -0,0 +1,134 @@
+#########################AVES record writer python3#####################
+#   buffered sink for aves_write=True, replace open/append/close per reg
+#   same text, same append mode -> file byte-identical to before
+#
+#   flush when:
+#   - buffer >= buffer_size char
+#   - flush_interval second since last flush, by background thread, so the
+#     last line of a burst reach the file even if no write come after
+#   - close(), and atexit for all live recorder
+#
+#   background (default when flush_interval set) -> write() only append to
+#   buffer, a daemon thread do the file write
+#   background=False -> interval only checked on next write(), tail of a
+#   burst stay in memory until close()/atexit
+#
+#   file write fail (e.g. ./to_aves/ missing) -> line stay in buffer, error
+#   raised to caller: foreground at once, background on next write()/flush()/
+#   close(), thread keep running and retry
+#
+#########################AVES record writer python3#####################
+
+import atexit
+import threading
+import time
+import weakref
+
+DEFAULT_BUFFER_SIZE = 64 * 1024     #char, ~4000 reg line
+DEFAULT_FLUSH_INTERVAL = 1.0        #second
+
+_live_recorders = weakref.WeakSet()
+
+
+def _close_all():
+    #close every recorder even if one fail, raise first error after
+    error = None
+    for recorder in list(_live_recorders):
+        try:
+            recorder.close()
+        except Exception as e:
+            if error is None:
+                error = e
+    if error is not None:
+        raise error
+
+atexit.register(_close_all)
+
+
+class AvesRecorder:
+    def __init__(
+        self,
+        path,
+        buffer_size=DEFAULT_BUFFER_SIZE,
+        flush_interval=DEFAULT_FLUSH_INTERVAL,
+        background=None,    #None -> True if flush_interval
+        ):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.buf = []
+        self.buf_len = 0
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.thread = None
+        self.wake = threading.Event()
+        self.stop = False
+        self.error = None       #background flush error, raised in caller thread
+        if background is None:
+            background = bool(flush_interval)
+        if background:
+            self.thread = threading.Thread(target=self.run_background, name="aves_recorder", daemon=True)
+            self.thread.start()
+        _live_recorders.add(self)
+
+    def write(self, text):
+        with self.lock:
+            self.buf.append(text)
+            self.buf_len += len(text)
+            full = self.buf_len >= self.buffer_size
+        if self.thread is not None:
+            self.raise_error()
+            if full:
+                self.wake.set()
+        elif full or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+        return
+
+    def raise_error(self):
+        #background flush fail -> raise here, line still in buffer
+        error = self.error
+        if error is not None:
+            self.error = None
+            raise error
+        return
+
+    def flush(self):
+        #file write under lock, keep line order if thread flush at same time
+        #buffer cleared only after write ok, fail -> raise, line kept for next flush
+        self.error = None
+        self.flush_buf()
+        return
+
+    def flush_buf(self):
+        with self.lock:
+            self.last_flush = time.monotonic()
+            if not self.buf:
+                return
+            data = "".join(self.buf)
+            with open(self.path, "a") as file:
+                file.write(data)
+            self.buf = []
+            self.buf_len = 0
+        return
+
+    def run_background(self):
+        while not self.stop:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                self.flush_buf()
+                self.error = None
+            except Exception as e:
+                #keep thread alive, retry on next interval
+                self.error = e
+
+    def close(self):
+        if self.thread is not None:
+            self.stop = True
+            self.wake.set()
+            self.thread.join()
+            self.thread = None
+        self.flush()
+        _live_recorders.discard(self)
+        return
@@ -0,0 +1,95 @@
+#########################I2C backend registry python3#####################
+#   aves_script pick i2c driver by name, no platform check per call
+#   "sim" -> DrvSim, XML default from kwarg xml_file_path or env PY_TESTENV_SIM_XML
+#
+#   name from (high to low priority):
+#   aves_script(backend="...") > env PY_TESTENV_BACKEND > platform default
+#
+#   every backend implement BACKEND_METHODS, same arg as DrvPI:
+#   readReg(addr1, addr2)                       -> int
+#   writeReg(addr1, addr2, value)
+#   readBits(addr1, addr2, lsb, bits)           -> int
+#   writeBits(addr1, addr2, lsb, bits, invalue)
+#   readRegs(addr1, addr2, num)                 -> list, burst
+#   writeRegs(addr1, addr2, data_list)          burst
+#   batch()                                     context manager, queue write
+#   flush()
+#   shadow_sync()                               + attribute shadow
+#
+#########################I2C backend registry python3#####################
+
+import os
+
+BACKEND_ENV = "PY_TESTENV_BACKEND"
+SIM_XML_ENV = "PY_TESTENV_SIM_XML"     #XML for "sim" default value
+
+BACKEND_METHODS = (
+    "readReg",
+    "writeReg",
+    "readBits",
+    "writeBits",
+    "readRegs",
+    "writeRegs",
+    "batch",
+    "flush",
+    "shadow_sync",
+)
+
+_registry = {}
+
+
+def register_backend(name, factory):
+    #factory(i2c_port=, chip_addr=, **kwargs) -> driver instance
+    _registry[name] = factory
+    return factory
+
+
+def get_backend_names():
+    return sorted(_registry)
+
+
+def default_backend_name(system):
+    #system -> get_system() output
+    name = os.environ.get(BACKEND_ENV)
+    if name:
+        return name
+    return "pi" if system == "linux" else "ftdi"
+
+
+def check_backend(drv):
+    missing = [m for m in BACKEND_METHODS if not callable(getattr(drv, m, None))]
+    if missing:
+        raise TypeError(f"{type(drv).__name__} not a valid i2c backend, missing: {', '.join(missing)}")
+    return drv
+
+
+def create_backend(name, i2c_port, chip_addr, **kwargs):
+    factory = _registry.get(name)
+    if factory is None:
+        raise ValueError(f"unknown i2c backend '{name}', registered: {', '.join(get_backend_names())}")
+    return check_backend(factory(i2c_port=i2c_port, chip_addr=chip_addr, **kwargs))
+
+
+########build-in backend, import driver only when used#######
+def _create_pi(i2c_port, chip_addr, **kwargs):
+    from .drv_pi import DrvPI
+    return DrvPI(i2c_port=i2c_port, chip_addr=chip_addr, **kwargs)
+
+def _create_pi_ioctl(i2c_port, chip_addr, **kwargs):
+    from .drv_pi import DrvPI
+    return DrvPI(i2c_port=i2c_port, chip_addr=chip_addr, mode="ioctl", **kwargs)
+
+def _create_ftdi(i2c_port, chip_addr, **kwargs):
+    from .drv_ftdi import DrvFTDI
+    return DrvFTDI(i2c_port=i2c_port, chip_addr=chip_addr, **kwargs)
+
+def _create_sim(i2c_port, chip_addr, **kwargs):
+    from .drv_sim import DrvSim
+    if "xml_file_path" not in kwargs and "reg_defaults" not in kwargs:
+        kwargs["xml_file_path"] = os.environ.get(SIM_XML_ENV)
+    return DrvSim(i2c_port=i2c_port, chip_addr=chip_addr, **kwargs)
+
+register_backend("pi", _create_pi)
+register_backend("pi_ioctl", _create_pi_ioctl)
+register_backend("ftdi", _create_ftdi)
+register_backend("sim", _create_sim)
@@ -0,0 +1,293 @@
+#########################asyncio I2C driver python3#####################
+#   async readReg/writeReg/readBits/writeBits/readRegs/writeRegs + batch
+#   for asyncio test bench, one event loop drive many board/instrument
+#
+#   AsyncDrv:   wrap any sync backend (DrvFTDI, ioctl DrvPI, DrvSim)
+#               all driver call run in one bus worker thread (executor)
+#               -> driver never touched by two thread, loop never block
+#   AsyncDrvPI: DrvPI i2ctransfer mode, asyncio.create_subprocess_exec
+#               no thread, many port/board fork i2ctransfer at same time
+#               msg build/batch/shadow/AVES by DrvPI helper, only the
+#               bus transfer here, drv.enable_stats() count async op too
+#
+#   adrv = create_async_backend("pi", i2c_port=1)
+#   value = await adrv.readReg(0x10, 0x00)
+#   async with adrv.batch():
+#       await adrv.writeReg(0x10, 0x00, 0x01)
+#
+#########################asyncio I2C driver python3#####################
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import functools
+import time
+
+from .drv_pi import DrvPI
+from .i2c_util import split_write
+from .reg_poll import wait_conditions_async
+from .retry_policy import I2CBusError, msgs_addr
+
+
+class AsyncDrv:
+    def __init__(self, drv, executor=None):
+        #executor -> shared one must be single thread per driver
+        self.drv = drv
+        self.own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"i2c_bus{getattr(drv, 'i2c_port', '')}")
+        self.executor = executor
+
+    async def call(self, func, *args):
+        #run blocking driver call in bus worker
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def readReg(self, addr1, addr2):
+        return await self.call(self.drv.readReg, addr1, addr2)
+
+    async def writeReg(self, addr1, addr2, value):
+        await self.call(self.drv.writeReg, addr1, addr2, value)
+
+    async def readBits(self, addr1, addr2, lsb, bits):
+        return await self.call(self.drv.readBits, addr1, addr2, lsb, bits)
+
+    async def writeBits(self, addr1, addr2, lsb, bits, invalue):
+        await self.call(self.drv.writeBits, addr1, addr2, lsb, bits, invalue)
+
+    async def readRegs(self, addr1, addr2, num):
+        return await self.call(self.drv.readRegs, addr1, addr2, num)
+
+    async def writeRegs(self, addr1, addr2, data_list):
+        await self.call(self.drv.writeRegs, addr1, addr2, data_list)
+
+    async def flush(self):
+        await self.call(self.drv.flush)
+
+    async def wait_bits(self, addr1, addr2, lsb, bits, expected, timeout=1.0, **poll_kwargs):
+        #asyncio.sleep between round, loop free for other board while waiting
+        return await wait_conditions_async(self.readRegs, [(addr1, addr2, lsb, bits, expected)], timeout, **poll_kwargs)
+
+    async def wait_conditions(self, conditions, timeout=1.0, **poll_kwargs):
+        return await wait_conditions_async(self.readRegs, conditions, timeout, **poll_kwargs)
+
+    async def shadow_sync(self):
+        await self.call(self.drv.shadow_sync)
+
+    @asynccontextmanager
+    async def batch(self):
+        #same as sync batch(), write queued in driver, flush on exit
+        #NOTE, batch is per driver, other task on same driver queue too
+        batch_cm = self.drv.batch()
+        await self.call(batch_cm.__enter__)
+        try:
+            yield self
+        finally:
+            await self.call(batch_cm.__exit__, None, None, None)
+
+    async def run_batch(self, ops):
+        #ops -> [(method_name, *args), ...], all in one worker job inside batch()
+        #return list of return, one loop round trip for whole sequence
+        drv = self.drv
+
+        def run_ops():
+            with drv.batch():
+                return [getattr(drv, op[0])(*op[1:]) for op in ops]
+        return await self.call(run_ops)
+
+    async def aclose(self):
+        drv = self.drv
+        closer = getattr(drv, "close", None) or getattr(drv, "close_ftdi", None)
+        if closer is not None:
+            await self.call(closer)
+        if self.own_executor:
+            self.executor.shutdown(wait=False)
+        return
+
+
+def timed_op(op_name):
+    #AsyncDrvPI op -> DrvStats op count/latency when drv.stats on
+    def decorator(func):
+        @functools.wraps(func)
+        async def timed(self, *args):
+            stats = self.drv.stats
+            if stats is None:
+                return await func(self, *args)
+            return await stats.time_async(op_name, func(self, *args))
+        return timed
+    return decorator
+
+
+class AsyncDrvPI(AsyncDrv):
+    #DrvPI i2ctransfer mode, bus by non-blocking subprocess
+    #same shadow/batch/AVES state as the wrapped DrvPI, sync and async call can mix
+    #every op = DrvPI helper + await bus transfer, see DrvPI "op helper"
+    def __init__(self, drv=None, executor=None, **drv_kwargs):
+        if drv is None:
+            drv = DrvPI(**drv_kwargs)
+        super().__init__(drv, executor)
+        #writeBits read-modify-write, one at a time per driver
+        #made on first use, Lock bind to the running loop on py3.7~3.9
+        self.bits_lock = None
+
+    async def xfer_i2ctransfer(self, msgs):
+        #same as DrvPI.xfer_i2ctransfer, None if error
+        drv = self.drv
+        stats = drv.stats
+        t0 = time.perf_counter_ns()
+        read_out = await self.run_i2ctransfer(msgs)
+        if stats is not None:
+            stats.add_xfer(msgs, read_out, time.perf_counter_ns() - t0)
+        return read_out
+
+    async def run_i2ctransfer(self, msgs):
+        drv = self.drv
+        args = ["-f", "-y", str(drv.i2c_port)] + drv.i2ctransfer_args(msgs)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                drv.i2ctransfer, *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+        except OSError as error_exec:
+            print(f"Command '{drv.i2ctransfer}' fail to start: {error_exec}")
+            return None
+        output, _ = await proc.communicate()
+        output = output.decode("utf-8").strip()
+        if proc.returncode != 0:
+            print(f"Command '{drv.i2ctransfer} {' '.join(args)}' returned non-zero exit status {proc.returncode}:\n{output}")
+            return None
+        return drv.parse_i2ctransfer(output, msgs)
+
+    async def xfer_once(self, msgs):
+        read_out = await self.xfer_i2ctransfer(msgs)
+        if read_out is None:
+            raise I2CBusError(f"PI::i2c transfer fail on i2c-{self.drv.i2c_port}")
+        return read_out
+
+    async def xfer_retry(self, msgs, op_name):
+        #same as DrvPI.xfer_retry, driver RetryPolicy + retry count, asyncio.sleep wait
+        drv = self.drv
+        read_out = await self.xfer_i2ctransfer(msgs)
+        if read_out is not None:
+            return read_out
+        return await drv.retry_policy.retry_async(
+            self.xfer_once, (msgs,), op_name, msgs_addr(msgs),
+            f"PI::i2c transfer fail on i2c-{drv.i2c_port}", drv.count_retry)
+
+    async def send_write(self, msgs, op_name):
+        #same as DrvPI.send_write
+        drv = self.drv
+        try:
+            for xfer_msgs in drv.get_xfer_groups(msgs):
+                await self.xfer_retry(xfer_msgs, op_name)
+        except Exception:
+            drv.shadow_drop_msgs(msgs)
+            raise
+        return
+
+    async def read_burst(self, addr1, addr2, num, op_name):
+        #same as DrvPI.read_burst
+        drv = self.drv
+        if drv.batch_msgs:
+            await self.flush()
+        read_outs = [await self.xfer_retry(xfer_msgs, op_name)
+                     for xfer_msgs in drv.get_xfer_groups(drv.get_read_msgs(addr1, addr2, num))]
+        return drv.read_done(addr1, addr2, read_outs)
+
+    @timed_op("flush")
+    async def flush(self):
+        drv = self.drv
+        msgs = drv.batch_msgs
+        if not msgs:
+            return
+        drv.batch_msgs = []
+        await self.send_write(msgs, "flush")
+        return
+
+    @asynccontextmanager
+    async def batch(self):
+        #same queue as DrvPI.batch(), flush on exit by subprocess
+        drv = self.drv
+        drv.batch_depth += 1
+        try:
+            yield self
+        finally:
+            drv.batch_depth -= 1
+            if drv.batch_depth == 0:
+                await self.flush()
+
+    async def run_batch(self, ops):
+        async with self.batch():
+            return [await getattr(self, op[0])(*op[1:]) for op in ops]
+
+    @timed_op("writeReg")
+    async def writeReg(self, addr1, addr2, value):
+        drv = self.drv
+        msgs = [("w", [addr1, addr2, value])]
+        if not drv.queue_write(msgs):
+            await self.send_write(msgs, "writereg")
+        drv.write_reg_done(addr1, addr2, value)
+        return
+
+    @timed_op("writeRegs")
+    async def writeRegs(self, addr1, addr2, data_list):
+        drv = self.drv
+        chunks = split_write(addr1, addr2, data_list, drv.burst_chunk)
+        msgs = drv.get_write_msgs(chunks)
+        if not drv.queue_write(msgs):
+            await self.send_write(msgs, "writeregs")
+        drv.write_done(chunks)
+        return
+
+    @timed_op("readReg")
+    async def readReg(self, addr1, addr2):
+        drv = self.drv
+        read_int = drv.shadow_get(addr1, addr2)
+        if read_int is not None:
+            return read_int
+        if drv.batch_msgs:
+            await self.flush()
+        read_out = await self.xfer_retry([("w", [addr1, addr2]), ("r", 1)], "readreg")
+        return drv.read_reg_done(addr1, addr2, read_out)
+
+    @timed_op("readRegs")
+    async def readRegs(self, addr1, addr2, num):
+        return await self.read_burst(addr1, addr2, num, "readregs")
+
+    @timed_op("writeBits")
+    async def writeBits(self, addr1, addr2, lsb, bits, invalue):
+        #other task may await between read and write, lock so no bit lost
+        if self.bits_lock is None:
+            self.bits_lock = asyncio.Lock()
+        async with self.bits_lock:
+            old_value = await self.readReg(addr1, addr2)
+            await self.writeReg(addr1, addr2, self.drv.get_bits_write(old_value, lsb, bits, invalue))
+
+    @timed_op("readBits")
+    async def readBits(self, addr1, addr2, lsb, bits):
+        old_value = await self.readReg(addr1, addr2)
+        return self.drv.get_bits_read(old_value, lsb, bits)
+
+    async def shadow_sync(self):
+        drv = self.drv
+        shadow = drv.shadow
+        if shadow is None:
+            return
+        for addr1, addr2, num in shadow.cached_runs(drv.chip_addr):
+            await self.readRegs(addr1, addr2, num)
+        return
+
+
+def wrap_async(drv, executor=None):
+    #DrvPI on i2ctransfer -> subprocess path, everything else -> bus worker
+    #by configured mode, i2c_xfer may be the enable_stats() wrapper
+    if isinstance(drv, DrvPI) and drv.mode == "i2ctransfer":
+        return AsyncDrvPI(drv, executor)
+    return AsyncDrv(drv, executor)
+
+
+def create_async_backend(name, i2c_port=1, chip_addr=0x58, executor=None, **kwargs):
+    #same name/kwargs as backends.create_backend
+    from .backends import create_backend
+    return wrap_async(create_backend(name, i2c_port=i2c_port, chip_addr=chip_addr, **kwargs), executor)
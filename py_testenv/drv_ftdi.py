@@ -8,24 +8,40 @@
 #
 #   20250804 yfzhao, build python3 fdit driver to python package
 #
+#   enable_stats() -> opt-in DrvStats, see drv_stats.py
+#   bus error -> bounded RetryPolicy, same as DrvPI, see retry_policy.py
+#
 #########################FTDI I2C driver python3#####################
 import datetime
 import ctypes
+from contextlib import contextmanager
 from ctypes.util import find_library
+import platform
 import time
 from pathlib import Path
 
-# 加载ftd2xx.dll
-ftd2xx = ctypes.windll.ftd2xx
-
-# 加载libMPSSE.dll, x64 PC
-#libmpsse = ctypes.CDLL("../libMPSSE.dll")
-#libmpsse = ctypes.CDLL("./libMPSSE.dll")      #if use vscode
-#libmpsse = ctypes.windll.libMPSSE
+from .aves_recorder import AvesRecorder
+from .i2c_util import DEFAULT_BURST_CHUNK, PAGE_SIZE, split_burst, split_write
+from .mpsse_queue import DEFAULT_BLOCK_SIZE, Ftd2xxPort, MpsseQueue
+from .reg_poll import wait_conditions
+from .retry_policy import I2CBusError, RetryPolicy
 
-# 修改DLL加载逻辑（替换原来的CDLL调用）
 dll_path = Path(__file__).parent / "libMPSSE.dll"
-libmpsse = ctypes.CDLL(str(dll_path))
+if platform.system() == "Windows":
+    # 加载ftd2xx.dll
+    ftd2xx = ctypes.windll.ftd2xx
+
+    # 加载libMPSSE.dll, x64 PC
+    #libmpsse = ctypes.CDLL("../libMPSSE.dll")
+    #libmpsse = ctypes.CDLL("./libMPSSE.dll")      #if use vscode
+    #libmpsse = ctypes.windll.libMPSSE
+
+    # 修改DLL加载逻辑（替换原来的CDLL调用）
+    libmpsse = ctypes.CDLL(str(dll_path))
+else:
+    #no FTDI dll, pass stub lib by DrvFTDI(ftd2xx_lib=..., mpsse_lib=...)
+    ftd2xx = None
+    libmpsse = None
 
 
 ########Var deine#######
@@ -51,6 +67,18 @@ I2C_TRANSFER_OPTIONS_BREAK_ON_NACK = 0x04
 I2C_TRANSFER_OPTIONS_FAST_TRANSFER_BYTES = 0x08
 I2C_TRANSFER_OPTIONS_FAST_TRANSFER = 0x30
 
+#fast path options, START/STOP + fast transfer
+# NOTE, if enable FAST_transfer, break on noack can not work
+I2C_WRITE_OPTIONS = I2C_TRANSFER_OPTIONS_START_BIT | I2C_TRANSFER_OPTIONS_STOP_BIT | \
+                    I2C_TRANSFER_OPTIONS_FAST_TRANSFER_BYTES | I2C_TRANSFER_OPTIONS_FAST_TRANSFER
+#addr phase before read, donot stop, wait Repeated START
+I2C_ADDR_OPTIONS = I2C_TRANSFER_OPTIONS_START_BIT | \
+                   I2C_TRANSFER_OPTIONS_FAST_TRANSFER_BYTES | I2C_TRANSFER_OPTIONS_FAST_TRANSFER
+I2C_READ_OPTIONS = I2C_WRITE_OPTIONS
+
+#transfer buffer size, addr1 + addr2 + one full page
+XFER_BUF_SIZE = 2 + PAGE_SIZE
+
 #use in i2c channel config
 class ChannelConfig(ctypes.Structure):
     _fields_ = [
@@ -71,20 +99,83 @@ class FT_DEVICE_LIST_INFO_NODE(ctypes.Structure):
         ("ftHandle", ctypes.c_void_p),
     ]
 
+def bind_mpsse_prototypes(lib):
+    #declare argtypes/restype once, ctypes no need guess type per call
+    FT_STATUS = ctypes.c_ulong
+    FT_HANDLE = ctypes.c_void_p
+    p_uint8 = ctypes.POINTER(ctypes.c_uint8)
+    p_uint32 = ctypes.POINTER(ctypes.c_uint32)
+
+    lib.I2C_InitChannel.argtypes = [FT_HANDLE, ctypes.POINTER(ChannelConfig)]
+    lib.I2C_InitChannel.restype = FT_STATUS
+    #handle, deviceAddress, sizeToTransfer, buffer, sizeTransferred, options
+    lib.I2C_DeviceWrite.argtypes = [FT_HANDLE, ctypes.c_uint32, ctypes.c_uint32, p_uint8, p_uint32, ctypes.c_uint32]
+    lib.I2C_DeviceWrite.restype = FT_STATUS
+    lib.I2C_DeviceRead.argtypes = [FT_HANDLE, ctypes.c_uint32, ctypes.c_uint32, p_uint8, p_uint32, ctypes.c_uint32]
+    lib.I2C_DeviceRead.restype = FT_STATUS
+    return lib
+
+def bind_fast_call(lib, name):
+    #hot path func, look up once and keep the bound callable on the driver
+    #exported attribute keep argtypes/restype from bind_mpsse_prototypes,
+    #ctypes convert and check every argument, wrong type -> ArgumentError
+    func = getattr(lib, name)
+    if func.argtypes is None:
+        raise TypeError(f"{name} has no argtypes, call bind_mpsse_prototypes first")
+    return func
+
 class DrvFTDI:
     def __init__(
         self,
         i2c_port=0,  #FTDI default i2c port
         chip_addr=0x58,
+        burst_chunk=DEFAULT_BURST_CHUNK,    #max reg per burst read, limit by adapter buffer
+        ftd2xx_lib=None,    #default ftd2xx.dll, stub lib for test
+        mpsse_lib=None,     #default libMPSSE.dll, stub lib for test
+        mpsse_port=None,    #raw MPSSE queue port, default FT_Write/FT_Read, MpsseSim for test
+        mpsse_block_size=DEFAULT_BLOCK_SIZE,    #FTDI USB buffer size
+        mpsse_batch=False,  #batch() flush by raw MPSSE queue, not validated on hardware yet
+        retry_policy=None,  #RetryPolicy, default bounded backoff
         ):
         self.aves_write = False                             # define if write to AVES script
+        self.aves_write_page = False                        # write_page to AVES script too, page write not recorded before
         self.i2c_port = i2c_port                            #FTDI i2c port sel 0/1
         self.chip_addr=ctypes.c_uint32(chip_addr)           #
+        self.burst_chunk = min(burst_chunk, PAGE_SIZE)      #limit by preallocated buffer
+        self.ftd2xx = ftd2xx_lib if ftd2xx_lib is not None else ftd2xx
+        self.libmpsse = bind_mpsse_prototypes(mpsse_lib if mpsse_lib is not None else libmpsse)
         self.handle = ctypes.c_void_p()                     #pointer to USB device?
         self.device_list = FT_DEVICE_LIST_INFO_NODE * 10    #rsv for more usb FTDI ctrl
         self.devices = self.device_list()                   #
         self.num_devices = ctypes.c_ulong()                 #num of usb FTDI
-        self.bytes_written = ctypes.c_ulong()               #assume usb stable, not check
+        self.bytes_written = ctypes.c_uint32()              #assume usb stable, not check
+
+        #fast path, reuse buffer/ref/func pointer, no new ctypes object per call
+        self.dev_addr = chip_addr                           #int for fast call
+        self.wbuf = (ctypes.c_uint8 * XFER_BUF_SIZE)()
+        self.rbuf = (ctypes.c_uint8 * XFER_BUF_SIZE)()
+        self.bytes_written_ref = ctypes.byref(self.bytes_written)
+        self.dev_write = bind_fast_call(self.libmpsse, "I2C_DeviceWrite")
+        self.dev_read = bind_fast_call(self.libmpsse, "I2C_DeviceRead")
+
+        #opt-in ShadowCache, see reg_cache.py
+        self.shadow = None
+
+        #opt-in DrvStats, see enable_stats()
+        self.stats = None
+
+        #bus error retry, (addr1, addr2)->retry count
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.retry_counts = {}
+
+        #raw MPSSE queue, many transaction per USB transfer, see mpsse_queue.py
+        #build after open_ftdi, need handle
+        self.mpsse_port = mpsse_port
+        self.mpsse_block_size = mpsse_block_size
+        self.mpsse_batch = mpsse_batch
+        self.mpsse_queue = None
+        self.batch_depth = 0
+        self.batch_txns = []
 
         #connect FTDI when class initial
         self.open_ftdi()        #get FTDI handle id
@@ -98,6 +189,7 @@ class DrvFTDI:
         now = datetime.datetime.now()
         StyleTime = now.strftime("%Y_%m_%d_%H_%M_%S")
         self.write_to = aves_path + "aves_" + StyleTime + ".txt"
+        self.aves_recorder = None
 
     def get_aves_str(self, addr1, addr2, value):
         #b0
@@ -113,10 +205,27 @@ class DrvFTDI:
 
         return print_str
 
+    def open_aves_recorder(self, **kwargs):
+        #buffered AVES record to self.write_to, kwargs see AvesRecorder
+        #(buffer_size, flush_interval, background)
+        self.close_aves_recorder()
+        self.aves_recorder = AvesRecorder(self.write_to, **kwargs)
+        return self.aves_recorder
+
+    def close_aves_recorder(self):
+        #flush all buffered AVES line to file
+        if self.aves_recorder is not None:
+            self.aves_recorder.close()
+            self.aves_recorder = None
+        return
+
     def print_str_to_aves(self, print_str):
         if(self.aves_write):
-            with open(self.write_to, "a") as file:
-                file.write(print_str)
+            recorder = self.aves_recorder
+            #write_to may change by user, follow it
+            if recorder is None or recorder.path != self.write_to:
+                recorder = self.open_aves_recorder()
+            recorder.write(print_str)
         return
 
     def dac_to_hot_temp_code(self,num_in):
@@ -140,9 +249,82 @@ class DrvFTDI:
             num_out = 0xFF
         return num_out
 
+    @contextmanager
+    def batch(self):
+        #with ftdi.batch(): ...
+        #queue writeReg/writeRegs, flush by libMPSSE write one by one (default)
+        #mpsse_batch=True -> raw MPSSE queue, few USB transfer
+        #any read flush the queue first, so order on bus is kept
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.flush()
+
+    def flush(self):
+        txns = self.batch_txns
+        if not txns:
+            return
+        self.batch_txns = []
+        try:
+            if self.mpsse_batch:
+                self.ftdi_i2c_run_queue(txns)
+            else:
+                for rw, addr1, addr2, data in txns:
+                    self.ftdi_i2c_burst_write(addr1, addr2, data)
+        except Exception:
+            #queued write may not reach chip, shadow took it at queue time
+            if self.shadow is not None:
+                for rw, addr1, addr2, data in txns:
+                    if rw == "w":
+                        self.shadow.drop_burst(self.dev_addr, addr1, addr2, len(data))
+            raise
+        return
+
+    def get_mpsse_queue(self):
+        if self.mpsse_queue is None:
+            port = self.mpsse_port
+            if port is None:
+                port = Ftd2xxPort(self.ftd2xx, self.handle)
+            self.mpsse_queue = MpsseQueue(port, self.dev_addr, self.mpsse_block_size)
+        return self.mpsse_queue
+
+    def ftdi_i2c_run_queue(self, transactions):
+        #transactions:
+        #   ("w", addr1, addr2, [data, ...])
+        #   ("r", addr1, addr2, num)
+        #pack into MPSSE command block <= USB buffer, one USB write+read per block
+        #return read data list per "r" transaction
+        #NACK -> retry the whole list by retry_policy, I2CRetryError if all fail
+        #NOTE, write here not record to AVES/shadow, use writeReg in batch()
+        queue = self.get_mpsse_queue()
+        try:
+            return queue.run(transactions)
+        except I2CBusError as error_bus:
+            addr = (transactions[0][1], transactions[0][2]) if transactions else None
+            return self.retry_policy.retry(queue.run, (transactions,), "run_queue", addr, error_bus, self.count_retry)
+
+    def enable_stats(self):
+        #wrap op + dev_write/dev_read on this instance, fast path untouched if never call
+        from .drv_stats import DrvStats
+        self.disable_stats()
+        self.stats = DrvStats().attach(self)
+        return self.stats
+
+    def disable_stats(self):
+        #remove wrapper, back to prebound fast call
+        if self.stats is not None:
+            self.stats.detach()
+            self.stats = None
+        return
+
     def close_ftdi(self):
+        self.flush()
+        self.close_aves_recorder()
         try:
-            status = ftd2xx.FT_Close(self.handle)
+            status = self.ftd2xx.FT_Close(self.handle)
         except:
             print(f"fail close FTDI, status:{status}")
         return
@@ -150,8 +332,8 @@ class DrvFTDI:
     def open_ftdi(self):
         # 获取设备列表
         status = FT_OK
-        status |= ftd2xx.FT_CreateDeviceInfoList(ctypes.byref(self.num_devices))
-        status |= ftd2xx.FT_GetDeviceInfoList(self.devices, ctypes.byref(self.num_devices))
+        status |= self.ftd2xx.FT_CreateDeviceInfoList(ctypes.byref(self.num_devices))
+        status |= self.ftd2xx.FT_GetDeviceInfoList(self.devices, ctypes.byref(self.num_devices))
 
         # 打印所有设备信息
         print_info = False
@@ -169,14 +351,14 @@ class DrvFTDI:
 
         # 打开设备
         # OpenEX HERE can define which to be opened
-        status |= ftd2xx.FT_OpenEx(
+        status |= self.ftd2xx.FT_OpenEx(
             self.devices[self.i2c_port].SerialNumber,
             FT_OPEN_BY_SERIAL_NUMBER,
             ctypes.byref(self.handle)
             )
 
         # reset device
-        status |= ftd2xx.FT_ResetDevice(self.handle)
+        status |= self.ftd2xx.FT_ResetDevice(self.handle)
 
         if status != FT_OK:
             raise Exception(f"FAIL open ftdi, FTstatus={status}")
@@ -212,7 +394,7 @@ class DrvFTDI:
         config.Options = I2C_ENABLE_FAST_TRANSFER | I2C_ENABLE_HIGH_SPEED
 
         # 调用I2C_InitChannel
-        status = libmpsse.I2C_InitChannel(self.handle, ctypes.byref(config))
+        status = self.libmpsse.I2C_InitChannel(self.handle, ctypes.byref(config))
         if status != FT_OK:
             raise RuntimeError(f"FAIL I2C config: {status}")
         time.sleep(0.5)
@@ -233,7 +415,7 @@ class DrvFTDI:
         command = [0x00, 0x00]
         # loop 调用I2C_DeviceWrite函数
         for i in range(20):
-            status = libmpsse.I2C_DeviceWrite(
+            status = self.libmpsse.I2C_DeviceWrite(
                 self.handle,  # FT_HANDLE handle
                 self.chip_addr,  # uint32 deviceAddress
                 ctypes.c_uint32(2),  # uint32 sizeToTransfer
@@ -253,6 +435,44 @@ class DrvFTDI:
 
 
 
+    def ftdi_i2c_write_once(self, num, options):
+        #one attempt for RetryPolicy, wbuf already filled
+        status = self.dev_write(self.handle, self.dev_addr, num, self.wbuf, self.bytes_written_ref, options)
+        if status != FT_OK:
+            raise I2CBusError(f"FAIL I2C write: {status}")
+        return
+
+    def ftdi_i2c_read_once(self, num):
+        #one attempt for RetryPolicy, addr phase from wbuf[0:2], data to rbuf
+        status = self.dev_write(self.handle, self.dev_addr, 2, self.wbuf, self.bytes_written_ref, I2C_ADDR_OPTIONS)
+        if status == FT_OK:
+            status = self.dev_read(self.handle, self.dev_addr, num, self.rbuf, self.bytes_written_ref, I2C_READ_OPTIONS)
+        if status != FT_OK:
+            raise I2CBusError(f"FAIL I2C read: {status}")
+        return
+
+    def ftdi_retry(self, attempt, args, op_name, addr1, addr2, status):
+        #fast path fail once, retry by policy, I2CRetryError if all fail
+        self.retry_policy.retry(attempt, args, op_name, (addr1, addr2), f"FAIL I2C {op_name}: {status}", self.count_retry)
+        return
+
+    def ftdi_write_retry(self, attempt, args, op_name, addr1, addr2, num, status):
+        #write retry, all fail -> chip state unknown, drop shadow of num reg
+        try:
+            self.ftdi_retry(attempt, args, op_name, addr1, addr2, status)
+        except Exception:
+            if self.shadow is not None:
+                self.shadow.drop_burst(self.dev_addr, addr1, addr2, num)
+            raise
+        return
+
+    def count_retry(self, op_name, addr, attempt, delay, error):
+        #RetryPolicy on_retry
+        self.retry_counts[addr] = self.retry_counts.get(addr, 0) + 1
+        if self.stats is not None:
+            self.stats.retries += 1
+        print(f"FTDI::{op_name} error, retry {attempt} after {delay*1000:.0f}ms.")
+
     def ftdi_i2c_writeReg(self, addr1, addr2, data_8b):
 
         #for gscoolink chip i2c
@@ -267,37 +487,87 @@ class DrvFTDI:
         #direct use ftdi_i2c.c, see libmpsse
         #https://www.ftdichip.cn/Support/SoftwareExamples/MPSSE/LibMPSSE-I2C.htm
 
-        #options = I2C_TRANSFER_OPTIONS_START_BIT | I2C_TRANSFER_OPTIONS_STOP_BIT | I2C_TRANSFER_OPTIONS_BREAK_ON_NACK
-
         # NOTE, if enable FAST_transfer, break on noack can not work
-        options = I2C_TRANSFER_OPTIONS_START_BIT | I2C_TRANSFER_OPTIONS_STOP_BIT | \
-                  I2C_TRANSFER_OPTIONS_FAST_TRANSFER_BYTES | I2C_TRANSFER_OPTIONS_FAST_TRANSFER
-
-
-        # 将addr1, addr2, data打包成要写入的数据
-        command = [addr1, addr2, data_8b]
-        #write_data = (ctypes.c_uint8 * 3)(addr1, addr2, data_8b)
+        # options = I2C_WRITE_OPTIONS
+
+        if self.batch_depth:
+            #shadow at queue, flush fail drop it
+            self.batch_txns.append(("w", addr1, addr2, (data_8b,)))
+            if self.shadow is not None:
+                self.shadow.put(self.dev_addr, addr1, addr2, data_8b)
+            if self.aves_write:
+                self.print_str_to_aves(self.get_aves_str(addr1, addr2, data_8b))
+            return
 
-        #yfzhao note c++ use in python
-        #在Python中，可以通过ctypes库创建固定大小的数组来模拟C/C++中的数组指针
+        #fast path, fill preallocated buffer, call prebound prototype
+        wbuf = self.wbuf
+        wbuf[0] = addr1
+        wbuf[1] = addr2
+        wbuf[2] = data_8b
 
         # 调用I2C_DeviceWrite函数
-        status = libmpsse.I2C_DeviceWrite(
+        status = self.dev_write(
             self.handle,  # FT_HANDLE handle
-            self.chip_addr,  # uint32 deviceAddress
-            ctypes.c_uint32(3),  # uint32 sizeToTransfer
-            (ctypes.c_uint8 * 3)(*command),  # uint8 *buffer
-            ctypes.byref(self.bytes_written),  # uint32 *sizeTransferred
-            ctypes.c_uint32(options)  # uint32 options
+            self.dev_addr,  # uint32 deviceAddress
+            3,  # uint32 sizeToTransfer
+            wbuf,  # uint8 *buffer
+            self.bytes_written_ref,  # uint32 *sizeTransferred
+            I2C_WRITE_OPTIONS  # uint32 options
         )
         if status != FT_OK:
-            raise RuntimeError(f"FAIL I2C write: {status}")
+            self.ftdi_write_retry(self.ftdi_i2c_write_once, (3, I2C_WRITE_OPTIONS), "writeReg", addr1, addr2, 1, status)
 
+        #shadow after bus write, failed write never cached
+        if self.shadow is not None:
+            self.shadow.put(self.dev_addr, addr1, addr2, data_8b)
 
         ###add write to aves function###
-        aves_str = self.get_aves_str(addr1, addr2, data_8b)
-        self.print_str_to_aves(aves_str)
+        if self.aves_write:
+            aves_str = self.get_aves_str(addr1, addr2, data_8b)
+            self.print_str_to_aves(aves_str)
+
+        return
+
+    def ftdi_i2c_writeRegs(self, addr1, addr2, data_list):
+        #burst write from (addr1, addr2), any start offset and length
+        #chunk by page/burst_chunk(<= wbuf), cross page -> continue at (addr1+1, 0x00)
+        chunks = split_write(addr1, addr2, data_list, self.burst_chunk)
+
+        for chunk_addr1, chunk_addr2, data_chunk in chunks:
+            if self.batch_depth:
+                self.batch_txns.append(("w", chunk_addr1, chunk_addr2, tuple(data_chunk)))
+            else:
+                self.ftdi_i2c_burst_write(chunk_addr1, chunk_addr2, data_chunk)
 
+            #shadow after bus write, batch -> at queue
+            if self.shadow is not None:
+                self.shadow.put_burst(self.dev_addr, chunk_addr1, chunk_addr2, data_chunk)
+
+            ###add write to aves function, one line per reg###
+            if self.aves_write:
+                for i, value in enumerate(data_chunk):
+                    aves_str = self.get_aves_str(chunk_addr1, chunk_addr2 + i, value)
+                    self.print_str_to_aves(aves_str)
+
+        return
+
+    def ftdi_i2c_burst_write(self, addr1, addr2, data_list):
+        len_data = len(data_list)
+        wbuf = self.wbuf
+        wbuf[0] = addr1
+        wbuf[1] = addr2
+        wbuf[2:2 + len_data] = data_list
+
+        status = self.dev_write(
+            self.handle,  # FT_HANDLE handle
+            self.dev_addr,  # uint32 deviceAddress
+            2 + len_data,  # uint32 sizeToTransfer
+            wbuf,  # uint8 *buffer
+            self.bytes_written_ref,  # uint32 *sizeTransferred
+            I2C_WRITE_OPTIONS  # uint32 options
+        )
+        if status != FT_OK:
+            self.ftdi_write_retry(self.ftdi_i2c_write_once, (2 + len_data, I2C_WRITE_OPTIONS), "writeRegs", addr1, addr2, len_data, status)
         return
 
     def ftdi_i2c_readReg(self, addr1, addr2):
@@ -314,42 +584,48 @@ class DrvFTDI:
         #addr1 8bit
         #addr2 8bit
 
-        #write option, donot stop, wait Repeated START
-        w_options = I2C_TRANSFER_OPTIONS_START_BIT | \
-                    I2C_TRANSFER_OPTIONS_FAST_TRANSFER_BYTES | I2C_TRANSFER_OPTIONS_FAST_TRANSFER
+        #shadow hit -> no bus access, volatile reg never cached
+        shadow = self.shadow
+        if shadow is not None:
+            rb_data = shadow.get(self.dev_addr, addr1, addr2)
+            if rb_data is not None:
+                return rb_data
+
+        if self.batch_txns:
+            self.flush()
 
-        # 将addr1, addr2打包成要写入的数据
-        command = [addr1, addr2]
+        #write option, donot stop, wait Repeated START
+        wbuf = self.wbuf
+        wbuf[0] = addr1
+        wbuf[1] = addr2
         # 调用I2C_DeviceWrite函数
-        status = libmpsse.I2C_DeviceWrite(
+        status = self.dev_write(
             self.handle,  # FT_HANDLE handle
-            self.chip_addr,  # uint32 deviceAddress
-            ctypes.c_uint32(2),  # uint32 sizeToTransfer
-            (ctypes.c_uint8 * 2)(*command),  # uint8 *buffer
-            ctypes.byref(self.bytes_written),  # uint32 *sizeTransferred
-            ctypes.c_uint32(w_options)  # uint32 options
+            self.dev_addr,  # uint32 deviceAddress
+            2,  # uint32 sizeToTransfer
+            wbuf,  # uint8 *buffer
+            self.bytes_written_ref,  # uint32 *sizeTransferred
+            I2C_ADDR_OPTIONS  # uint32 options
         )
-        if status != FT_OK:
-            raise RuntimeError(f"FAIL I2C write page_addr: {status}")
 
         #read option, as normal
-        r_options = I2C_TRANSFER_OPTIONS_START_BIT | I2C_TRANSFER_OPTIONS_STOP_BIT | \
-                    I2C_TRANSFER_OPTIONS_FAST_TRANSFER_BYTES | I2C_TRANSFER_OPTIONS_FAST_TRANSFER
-
-        rb_buffer = (ctypes.c_uint8 * 1)()
-
-        status = libmpsse.I2C_DeviceRead(
-            self.handle,  # handle
-            self.chip_addr,  # deviceAddress
-            ctypes.c_uint32(1),  # sizeToTransfer
-            rb_buffer,  # uint8 *buffer
-            ctypes.byref(self.bytes_written),  # uint32 *sizeTransferred
-            ctypes.c_uint32(r_options)  # options
-        )
+        rb_buffer = self.rbuf
+
+        if status == FT_OK:
+            status = self.dev_read(
+                self.handle,  # handle
+                self.dev_addr,  # deviceAddress
+                1,  # sizeToTransfer
+                rb_buffer,  # uint8 *buffer
+                self.bytes_written_ref,  # uint32 *sizeTransferred
+                I2C_READ_OPTIONS  # options
+            )
         if status != FT_OK:
-            raise RuntimeError(f"FAIL I2C read data: {status}")
+            self.ftdi_retry(self.ftdi_i2c_read_once, (1,), "readReg", addr1, addr2, status)
 
-        rb_data = list(rb_buffer)[0]
+        rb_data = rb_buffer[0]
+        if shadow is not None:
+            shadow.put(self.dev_addr, addr1, addr2, rb_data)
 
         return rb_data
 
@@ -357,7 +633,7 @@ class DrvFTDI:
         #bits -> temp_code bits
         bits_temp=self.dac_to_hot_temp_code(bits)
 
-        #first read old value
+        #first read old value, shadow hit if enable -> no readback
         old_value=self.ftdi_i2c_readReg(addr1, addr2)
         #print("-------"+hex(old_value))
         #gen value mask 0
@@ -382,7 +658,7 @@ class DrvFTDI:
         #bits -> temp_code bits
         bits_temp=self.dac_to_hot_temp_code(bits)
         bits_pos = bits_temp << lsb
-        #first read old value
+        #first read old value, shadow hit if enable -> no readback
         old_value=self.ftdi_i2c_readReg(addr1, addr2)
         #python bit not need & 0xFF
         mask0 = bits_pos & 0xFF
@@ -393,51 +669,88 @@ class DrvFTDI:
         return new_value
 
     def ftdi_i2c_readRegs(self, addr1, addr2, num):
+        #burst read, one address phase + N byte sequential read per chunk
+        #chunk by page/burst_chunk
+        if self.batch_txns:
+            self.flush()
         read_list=[]
-        for i in range(num):
-            addr_loop = addr2 + i
-            read_value = self.ftdi_i2c_readReg(addr1, addr_loop)
-            read_list.append(read_value)
+        for chunk_addr1, chunk_addr2, len_chunk in split_burst(addr1, addr2, num, self.burst_chunk):
+            read_list.extend(self.ftdi_i2c_burst_read(chunk_addr1, chunk_addr2, len_chunk))
+        #burst always from bus, refresh shadow
+        if self.shadow is not None:
+            self.shadow.put_burst(self.dev_addr, addr1, addr2, read_list)
         return read_list
 
+    def ftdi_i2c_wait_bits(self, addr1, addr2, lsb, bits, expected, timeout=1.0, **poll_kwargs):
+        #poll readBits field until == expected, adaptive interval, see reg_poll.py
+        #return WaitResult, .ok / .elapsed
+        return wait_conditions(self.ftdi_i2c_readRegs, [(addr1, addr2, lsb, bits, expected)], timeout, **poll_kwargs)
 
-    #Write all i2c in page addr_page
-    def ftdi_i2c_write_page(self, addr_page, data_list):
-
-        #write from 0x00->0xFF
-        #data len must be 256
-
-        len_data = len(data_list)
-
-        if len_data != 256:
-            print(f"WARNING write page i2c, len data={len_data} should eq 256!")
-
-
-        options = I2C_TRANSFER_OPTIONS_START_BIT | I2C_TRANSFER_OPTIONS_STOP_BIT | \
-                  I2C_TRANSFER_OPTIONS_FAST_TRANSFER_BYTES | I2C_TRANSFER_OPTIONS_FAST_TRANSFER
-
-
-        #write addr from 0x00
-        command = [addr_page, 0x00]
-        command.extend(data_list)
+    def ftdi_i2c_wait_conditions(self, conditions, timeout=1.0, **poll_kwargs):
+        #conditions -> [(addr1, addr2, lsb, bits, expected), ...], one burst read per round
+        return wait_conditions(self.ftdi_i2c_readRegs, conditions, timeout, **poll_kwargs)
 
-        c_command = (ctypes.c_uint8 * len(command))(*command)
+    def shadow_sync(self):
+        #re-read all shadow cached reg from chip
+        if self.shadow is not None:
+            self.shadow.sync(self.dev_addr, self.ftdi_i2c_readRegs)
+        return
 
-        # 调用I2C_DeviceWrite函数
-        status = libmpsse.I2C_DeviceWrite(
+    def ftdi_i2c_burst_read(self, addr1, addr2, num):
+        #START + addr write, no STOP
+        wbuf = self.wbuf
+        wbuf[0] = addr1
+        wbuf[1] = addr2
+        status = self.dev_write(
             self.handle,  # FT_HANDLE handle
-            self.chip_addr,  # uint32 deviceAddress
-            ctypes.c_uint32(len(command)),  # uint32 sizeToTransfer
-            c_command,  # uint8 *buffer
-            ctypes.byref(self.bytes_written),  # uint32 *sizeTransferred
-            ctypes.c_uint32(options)  # uint32 options
+            self.dev_addr,  # uint32 deviceAddress
+            2,  # uint32 sizeToTransfer
+            wbuf,  # uint8 *buffer
+            self.bytes_written_ref,  # uint32 *sizeTransferred
+            I2C_ADDR_OPTIONS  # uint32 options
         )
 
+        #repeated START + N byte read, master NACK last byte then STOP
+        #num <= burst_chunk <= rbuf size
+        if status == FT_OK:
+            status = self.dev_read(
+                self.handle,  # handle
+                self.dev_addr,  # deviceAddress
+                num,  # sizeToTransfer
+                self.rbuf,  # uint8 *buffer
+                self.bytes_written_ref,  # uint32 *sizeTransferred
+                I2C_READ_OPTIONS  # options
+            )
         if status != FT_OK:
-            raise RuntimeError(f"ERROR write page i2c: {status}")
+            self.ftdi_retry(self.ftdi_i2c_read_once, (num,), "readRegs", addr1, addr2, status)
+
+        return self.rbuf[:num]
+
 
+    #Write all i2c in page addr_page
+    def ftdi_i2c_write_page(self, addr_page, data_list):
+        #write from (addr_page, 0x00), any length
+        #< 256 -> part of page, > 256 -> continue on next page
+        #AVES line only if aves_write_page
+        aves_write = self.aves_write
+        self.aves_write = aves_write and self.aves_write_page
+        try:
+            self.ftdi_i2c_writeRegs(addr_page, 0x00, data_list)
+        finally:
+            self.aves_write = aves_write
         return
 
+    #common backend API, same name as DrvPI, see backends.py
+    readReg = ftdi_i2c_readReg
+    writeReg = ftdi_i2c_writeReg
+    readBits = ftdi_i2c_readBits
+    writeBits = ftdi_i2c_writeBits
+    readRegs = ftdi_i2c_readRegs
+    writeRegs = ftdi_i2c_writeRegs
+    write_page = ftdi_i2c_write_page
+    wait_bits = ftdi_i2c_wait_bits
+    wait_conditions = ftdi_i2c_wait_conditions
+
 
 if __name__ == "__main__":
     i2c = DrvFTDI(i2c_port=0)
@@ -4,12 +4,45 @@
 #   raspberry pi i2c driver in python3
 #   use i2ctransfer to access i2c bus
 #
+#   mode="ioctl": open /dev/i2c-N once, use I2C_RDWR ioctl in-process
+#   no fork of i2ctransfer per register
+#
+#   enable_stats() -> opt-in DrvStats, see drv_stats.py
+#   bus error -> bounded RetryPolicy, I2CRetryError at the end, see retry_policy.py
+#
 #########################PI I2C driver python3#####################
 
 
+import ctypes
 import datetime
+from contextlib import contextmanager
+import fcntl
+import os
 import subprocess
-import time
+
+from .aves_recorder import AvesRecorder
+from .i2c_util import DEFAULT_BURST_CHUNK, split_burst, split_write
+from .reg_poll import wait_conditions
+from .retry_policy import I2CBusError, RetryPolicy, msgs_addr
+
+########linux i2c-dev define, see <linux/i2c-dev.h> <linux/i2c.h>#######
+I2C_RDWR = 0x0707       #combined R/W transfer, one STOP at the end
+I2C_M_RD = 0x0001       #read data, from slave to master
+I2C_RDWR_IOCTL_MAX_MSGS = 42    #kernel max msgs per I2C_RDWR, i2ctransfer same
+
+class i2c_msg(ctypes.Structure):
+    _fields_ = [
+        ("addr", ctypes.c_uint16),
+        ("flags", ctypes.c_uint16),
+        ("len", ctypes.c_uint16),
+        ("buf", ctypes.POINTER(ctypes.c_uint8)),
+    ]
+
+class i2c_rdwr_ioctl_data(ctypes.Structure):
+    _fields_ = [
+        ("msgs", ctypes.POINTER(i2c_msg)),
+        ("nmsgs", ctypes.c_uint32),
+    ]
 
 
 class DrvPI:
@@ -17,16 +50,49 @@ class DrvPI:
         self,
         i2c_port=1,         #raspberry default i2c_1
         chip_addr=0x58,     #gs chip 0xB0->0x58
+        mode="i2ctransfer", #"i2ctransfer" or "ioctl"
+        burst_chunk=DEFAULT_BURST_CHUNK,    #max reg per burst read
+        i2ctransfer="/usr/sbin/i2ctransfer",    #i2c-tools path, fake one for test
+        retry_policy=None,  #RetryPolicy, default bounded backoff
         ):
         self.aves_write=False        #define if write to AVES script
+        self.aves_write_page=False   #write_page to AVES script too, page write not recorded before
         self.i2c_port=i2c_port
         self.chip_addr=chip_addr
+        self.mode=mode
+        self.burst_chunk=burst_chunk
+        self.i2ctransfer=i2ctransfer
+
+        #bus transfer function, select once here, no check per register
+        self.i2c_fd=None
+        if mode == "ioctl":
+            self.open_i2c_dev()
+            self.i2c_xfer=self.xfer_ioctl
+        elif mode == "i2ctransfer":
+            self.i2c_xfer=self.xfer_i2ctransfer
+        else:
+            raise ValueError(f"PI::unknown mode {mode}, use i2ctransfer/ioctl")
+
+        #write batch queue, see batch()/flush()
+        self.batch_depth=0
+        self.batch_msgs=[]
+
+        #bus error retry, (addr1, addr2)->retry count
+        self.retry_policy=retry_policy if retry_policy is not None else RetryPolicy()
+        self.retry_counts={}
+
+        #opt-in ShadowCache, see reg_cache.py
+        self.shadow=None
+
+        #opt-in DrvStats, see enable_stats()
+        self.stats=None
 
         '''Build AVES script path'''
         aves_path="./to_aves/"
         now = datetime.datetime.now()
         StyleTime = now.strftime("%Y_%m_%d_%H_%M_%S")
         self.write_to = aves_path + "aves_" + StyleTime + ".txt"
+        self.aves_recorder = None
 
     def run_linux(self,cmd):
         try:
@@ -37,6 +103,224 @@ class DrvPI:
             print(error_message)
             return "error"
 
+    def open_i2c_dev(self):
+        #open /dev/i2c-N once, keep fd for all transfer
+        dev_path=f"/dev/i2c-{self.i2c_port}"
+        self.i2c_fd=os.open(dev_path, os.O_RDWR)
+        return
+
+    def close(self):
+        self.flush()
+        self.close_aves_recorder()
+        if self.i2c_fd is not None:
+            os.close(self.i2c_fd)
+            self.i2c_fd=None
+        return
+
+    def i2ctransfer_args(self, msgs):
+        #msgs->i2ctransfer arg list, after "-f -y port"
+        args=[]
+        for rw, data in msgs:
+            if rw == "w":
+                args.append(f"w{len(data)}@{hex(self.chip_addr)}")
+                args.extend(hex(x) for x in data)
+            else:
+                args.append(f"r{data}@{hex(self.chip_addr)}")
+        return args
+
+    def parse_i2ctransfer(self, output, msgs):
+        #i2ctransfer print one line per read msg
+        num_read=sum(1 for rw, data in msgs if rw == "r")
+        if num_read == 0:
+            return []
+        lines=output.split("\n")
+        return [[int(x, 16) for x in line.split()] for line in lines[-num_read:]]
+
+    def xfer_i2ctransfer(self, msgs):
+        #msgs->[("w", [byte,...]), ("r", num), ...], one i2ctransfer call
+        #return list of read data per "r" msg, None if error
+        cmd=f"{self.i2ctransfer} -f -y {str(self.i2c_port)} " + " ".join(self.i2ctransfer_args(msgs))
+        output=self.run_linux(cmd)
+        if output == "error":
+            return None
+        return self.parse_i2ctransfer(output, msgs)
+
+    def xfer_ioctl(self, msgs):
+        #msgs->[("w", [byte,...]), ("r", num), ...], one I2C_RDWR ioctl
+        #all msgs use repeated START, STOP only at the end
+        num_msgs=len(msgs)
+        c_msgs=(i2c_msg * num_msgs)()
+        bufs=[]
+        for i, (rw, data) in enumerate(msgs):
+            if rw == "w":
+                buf=(ctypes.c_uint8 * len(data))(*data)
+                c_msgs[i].flags=0
+            else:
+                buf=(ctypes.c_uint8 * data)()
+                c_msgs[i].flags=I2C_M_RD
+            c_msgs[i].addr=self.chip_addr
+            c_msgs[i].len=len(buf)
+            c_msgs[i].buf=buf
+            bufs.append((rw, buf))
+        ioctl_data=i2c_rdwr_ioctl_data(c_msgs, num_msgs)
+        try:
+            fcntl.ioctl(self.i2c_fd, I2C_RDWR, ioctl_data)
+        except OSError as error_ioctl:
+            print(f"I2C_RDWR ioctl on /dev/i2c-{self.i2c_port} fail: {error_ioctl}")
+            return None
+        return [list(buf) for rw, buf in bufs if rw == "r"]
+
+    def xfer_once(self, msgs):
+        #one attempt for RetryPolicy
+        read_out=self.i2c_xfer(msgs)
+        if read_out is None:
+            raise I2CBusError(f"PI::i2c transfer fail on i2c-{self.i2c_port}")
+        return read_out
+
+    def xfer_retry(self, msgs, op_name):
+        #Make sure i2c transfer complete
+        #first try direct, retry policy only after error
+        read_out=self.i2c_xfer(msgs)
+        if read_out is not None:
+            return read_out
+        return self.retry_policy.retry(
+            self.xfer_once, (msgs,), op_name, msgs_addr(msgs),
+            f"PI::i2c transfer fail on i2c-{self.i2c_port}", self.count_retry)
+
+    def count_retry(self, op_name, addr, attempt, delay, error):
+        #RetryPolicy on_retry
+        self.retry_counts[addr]=self.retry_counts.get(addr, 0)+1
+        if self.stats is not None:
+            self.stats.retries+=1
+        print(f"PI::{op_name} error, retry {attempt} after {delay*1000:.0f}ms.")
+
+    def enable_stats(self):
+        #wrap op + i2c_xfer on this instance, nothing change if never call
+        from .drv_stats import DrvStats
+        self.disable_stats()
+        self.stats=DrvStats().attach(self)
+        return self.stats
+
+    def disable_stats(self):
+        #remove wrapper, back to plain method
+        if self.stats is not None:
+            self.stats.detach()
+            self.stats=None
+        return
+
+    @contextmanager
+    def batch(self):
+        #with pi.batch(): ...
+        #buffer writeReg, send as few transfer as kernel msg limit allow
+        #each write is one msg, repeated START between them, STOP at the end
+        #any read flush the queue first, so order on bus is kept
+        self.batch_depth+=1
+        try:
+            yield self
+        finally:
+            self.batch_depth-=1
+            if self.batch_depth == 0:
+                self.flush()
+
+    def flush(self):
+        msgs=self.batch_msgs
+        if not msgs:
+            return
+        self.batch_msgs=[]
+        self.send_write(msgs, "flush")
+        return
+
+    ########op helper, shared with AsyncDrvPI, only bus transfer differ########
+    def get_xfer_groups(self, msgs):
+        #one transfer per group, kernel msg limit
+        return [msgs[i:i+I2C_RDWR_IOCTL_MAX_MSGS] for i in range(0, len(msgs), I2C_RDWR_IOCTL_MAX_MSGS)]
+
+    def get_write_msgs(self, chunks):
+        #split_write chunk -> one w msg each, own addr
+        return [("w", [chunk_addr1, chunk_addr2] + list(data_chunk)) for chunk_addr1, chunk_addr2, data_chunk in chunks]
+
+    def queue_write(self, msgs):
+        #in batch() -> queue, True; else caller send now
+        if self.batch_depth:
+            self.batch_msgs.extend(msgs)
+            return True
+        return False
+
+    def send_write(self, msgs, op_name):
+        try:
+            if len(msgs) <= I2C_RDWR_IOCTL_MAX_MSGS:
+                self.xfer_retry(msgs, op_name)
+            else:
+                for xfer_msgs in self.get_xfer_groups(msgs):
+                    self.xfer_retry(xfer_msgs, op_name)
+        except Exception:
+            #part may be on chip, old/queued shadow value not valid
+            self.shadow_drop_msgs(msgs)
+            raise
+        return
+
+    def write_done(self, chunks):
+        #after bus write ok or queued: shadow, then AVES line per reg
+        #batch -> shadow at queue, flush fail drop it
+        if self.shadow is not None:
+            for chunk_addr1, chunk_addr2, data_chunk in chunks:
+                self.shadow.put_burst(self.chip_addr, chunk_addr1, chunk_addr2, data_chunk)
+        if self.aves_write:
+            for chunk_addr1, chunk_addr2, data_chunk in chunks:
+                for i, value in enumerate(data_chunk):
+                    aves_str = self.get_aves_str(chunk_addr1, chunk_addr2 + i, value)
+                    self.print_str_to_aves(aves_str)
+        return
+
+    def write_reg_done(self, addr1, addr2, value):
+        #write_done of one reg
+        if self.shadow is not None:
+            self.shadow.put(self.chip_addr, addr1, addr2, value)
+        if self.aves_write:
+            aves_str = self.get_aves_str(addr1, addr2, value)
+            self.print_str_to_aves(aves_str)
+        return
+
+    def shadow_drop_msgs(self, msgs):
+        #write msgs may not reach chip, forget shadow value of their reg
+        shadow=self.shadow
+        if shadow is not None:
+            for rw, data in msgs:
+                if rw == "w" and len(data) > 2:
+                    shadow.drop_burst(self.chip_addr, data[0], data[1], len(data)-2)
+        return
+
+    def get_read_msgs(self, addr1, addr2, num):
+        #chunk by page/burst_chunk, each chunk = w2 + rN msg pair
+        msgs=[]
+        for chunk_addr1, chunk_addr2, len_chunk in split_burst(addr1, addr2, num, self.burst_chunk):
+            msgs.append(("w", [chunk_addr1, chunk_addr2]))
+            msgs.append(("r", len_chunk))
+        return msgs
+
+    def read_done(self, addr1, addr2, read_outs):
+        #read data of all transfer -> one list, burst always from bus, refresh shadow
+        read_list=[]
+        for read_out in read_outs:
+            for data in read_out:
+                read_list.extend(data)
+        if self.shadow is not None:
+            self.shadow.put_burst(self.chip_addr, addr1, addr2, read_list)
+        return read_list
+
+    def read_reg_done(self, addr1, addr2, read_out):
+        #read_done of one reg, read_out of [w2, r1] transfer
+        read_int=read_out[0][0]
+        if self.shadow is not None:
+            self.shadow.put(self.chip_addr, addr1, addr2, read_int)
+        return read_int
+
+    def shadow_get(self, addr1, addr2):
+        #None -> must read from bus, volatile reg never cached
+        if self.shadow is None:
+            return None
+        return self.shadow.get(self.chip_addr, addr1, addr2)
+
     def get_aves_str(self, addr1, addr2, value):
         #b0
         device_addr_print="{:02x}".format(self.chip_addr<<1)
@@ -51,51 +335,89 @@ class DrvPI:
 
         return print_str
 
+    def open_aves_recorder(self, **kwargs):
+        #buffered AVES record to self.write_to, kwargs see AvesRecorder
+        #(buffer_size, flush_interval, background)
+        self.close_aves_recorder()
+        self.aves_recorder = AvesRecorder(self.write_to, **kwargs)
+        return self.aves_recorder
+
+    def close_aves_recorder(self):
+        #flush all buffered AVES line to file
+        if self.aves_recorder is not None:
+            self.aves_recorder.close()
+            self.aves_recorder = None
+        return
+
     def print_str_to_aves(self, print_str):
         if(self.aves_write):
-            with open(self.write_to, "a") as file:
-                file.write(print_str)
+            recorder = self.aves_recorder
+            #write_to may change by user, follow it
+            if recorder is None or recorder.path != self.write_to:
+                recorder = self.open_aves_recorder()
+            recorder.write(print_str)
         return
 
     def writeReg(self, addr1, addr2, value):
         #address1->first 8bit address
         #address2->second 8bit address
         #value->value write to addr
-        write_cmd=f"/usr/sbin/i2ctransfer -f -y {str(self.i2c_port)} " \
-                  f"w3@{hex(self.chip_addr)} " \
-                  f"{hex(addr1)} {hex(addr2)} " \
-                  f"{hex(value)}"
-        #Make sure write reg complete
-        while 1:
-            write_result = self.run_linux(write_cmd)
-            if (write_result != "error"):
-                break
-            else:
-                print("PI::writereg error, wait 1s, continue.")
-                time.sleep(1)
+        msgs=[("w", [addr1, addr2, value])]
+        if not self.queue_write(msgs):
+            self.send_write(msgs, "writereg")
 
-        # add print to aves function
-        aves_str = self.get_aves_str(addr1, addr2, value)
-        self.print_str_to_aves(aves_str)
+        # shadow + add print to aves function
+        self.write_reg_done(addr1, addr2, value)
+        return
+
+    def writeRegs(self, addr1, addr2, data_list):
+        #burst write from (addr1, addr2), any start offset and length
+        #chunk by page/burst_chunk, cross page -> continue at (addr1+1, 0x00)
+        #each chunk = one w msg with own addr, packed up to kernel msg limit
+        chunks=split_write(addr1, addr2, data_list, self.burst_chunk)
+        msgs=self.get_write_msgs(chunks)
+        if not self.queue_write(msgs):
+            self.send_write(msgs, "writeregs")
+
+        # shadow + add print to aves function, one line per reg
+        self.write_done(chunks)
+        return
+
+    def write_page(self, addr_page, data_list):
+        #same as DrvFTDI.ftdi_i2c_write_page, write from (addr_page, 0x00)
+        #AVES line only if aves_write_page
+        aves_write=self.aves_write
+        self.aves_write=aves_write and self.aves_write_page
+        try:
+            self.writeRegs(addr_page, 0x00, data_list)
+        finally:
+            self.aves_write=aves_write
         return
 
     def readReg(self, addr1, addr2):
         #address1->first 8bit address
         #address2->second 8bit address
-        read_cmd=f"/usr/sbin/i2ctransfer -f -y {str(self.i2c_port)} " \
-                 f"w2@{hex(self.chip_addr)} " \
-                 f"{hex(addr1)} {hex(addr2)} " \
-                 f"r1"
-        while 1:
-            read_out=self.run_linux(read_cmd)
-            if(read_out != "error"):
-                break
-            else:
-                print("PI::readreg error, wait 1s, continue.")
-                time.sleep(1)
-        #hex str -> int
-        read_int=int(read_out, 16)
-        return read_int
+        #shadow hit -> no bus access
+        if self.shadow is not None:
+            read_int=self.shadow_get(addr1, addr2)
+            if read_int is not None:
+                return read_int
+        #write addr + repeated START read, one combined transfer
+        if self.batch_msgs:
+            self.flush()
+        read_out=self.xfer_retry([("w", [addr1, addr2]), ("r", 1)], "readreg")
+        return self.read_reg_done(addr1, addr2, read_out)
+
+    def read_burst(self, addr1, addr2, num, op_name):
+        #any queued write go first, so order on bus is kept
+        if self.batch_msgs:
+            self.flush()
+        msgs=self.get_read_msgs(addr1, addr2, num)
+        if len(msgs) <= I2C_RDWR_IOCTL_MAX_MSGS:
+            read_outs=(self.xfer_retry(msgs, op_name),)
+        else:
+            read_outs=[self.xfer_retry(xfer_msgs, op_name) for xfer_msgs in self.get_xfer_groups(msgs)]
+        return self.read_done(addr1, addr2, read_outs)
 
     def dac_to_hot_temp_code(self,num_in):
         if num_in == 0:
@@ -118,16 +440,10 @@ class DrvPI:
             num_out = 0xFF
         return num_out
 
-    def writeBits(self, addr1, addr2, lsb, bits, old_invalue):
-
+    def get_bits_write(self, old_value, lsb, bits, old_invalue):
         #bits -> temp_code bits
         bits_temp=self.dac_to_hot_temp_code(bits)
 
-        #first read old value
-        old_value=self.readReg(addr1, addr2)
-        #print("-------"+hex(old_value))
-        #gen value mask 0
-
         #move up <<
         winvalue = old_invalue << lsb
         bits_pos = bits_temp << lsb
@@ -138,32 +454,47 @@ class DrvPI:
         clear_value = mask0 & old_value
 
         #get new value by bit_or
-        new_value = clear_value | winvalue
-
-        #write back
-        self.writeReg(addr1, addr2, new_value)
+        return clear_value | winvalue
 
-        return
-
-    def readBits(self, addr1, addr2, lsb, bits):
+    def get_bits_read(self, old_value, lsb, bits):
         #bits -> temp_code bits
         bits_temp=self.dac_to_hot_temp_code(bits)
         bits_pos = bits_temp << lsb
-        #first read old value
-        old_value=self.readReg(addr1, addr2)
         #python bit not need & 0xFF
         mask0 = bits_pos & 0xFF
         #clear part of old value
         clear_value = mask0 & old_value
+        return clear_value >> lsb
+
+    def writeBits(self, addr1, addr2, lsb, bits, old_invalue):
+        #first read old value, shadow hit if enable -> no readback
+        old_value=self.readReg(addr1, addr2)
+        #write back
+        self.writeReg(addr1, addr2, self.get_bits_write(old_value, lsb, bits, old_invalue))
+        return
 
-        new_value = clear_value >> lsb
-        return new_value
+    def readBits(self, addr1, addr2, lsb, bits):
+        #first read old value
+        old_value=self.readReg(addr1, addr2)
+        return self.get_bits_read(old_value, lsb, bits)
 
     def readRegs(self, addr1, addr2, num):
-        read_list=[]
-        for i in range(num):
-            addr_loop = addr2 + i
-            read_value = self.readReg(addr1, addr_loop)
-            read_list.append(read_value)
-        return read_list
+        #burst read: write addr once, then rN sequential read
+        #chunk pairs packed into one transfer up to kernel msg limit
+        return self.read_burst(addr1, addr2, num, "readregs")
+
+    def wait_bits(self, addr1, addr2, lsb, bits, expected, timeout=1.0, **poll_kwargs):
+        #poll readBits field until == expected, adaptive interval, see reg_poll.py
+        #return WaitResult, .ok / .elapsed
+        return wait_conditions(self.readRegs, [(addr1, addr2, lsb, bits, expected)], timeout, **poll_kwargs)
+
+    def wait_conditions(self, conditions, timeout=1.0, **poll_kwargs):
+        #conditions -> [(addr1, addr2, lsb, bits, expected), ...], one burst read per round
+        return wait_conditions(self.readRegs, conditions, timeout, **poll_kwargs)
+
+    def shadow_sync(self):
+        #re-read all shadow cached reg from chip
+        if self.shadow is not None:
+            self.shadow.sync(self.chip_addr, self.readRegs)
+        return
 
@@ -0,0 +1,125 @@
+#########################SIM I2C driver python3#####################
+#   simulated gscoolink chip, no hardware
+#   64K register file, default value from XML register model
+#
+#   same stack as DrvPI (batch, burst, shadow, AVES record), only the
+#   bus transfer go to memory, so generated script run/benchmark as is
+#   also FTDI method name, plug in where DrvPI/DrvFTDI used
+#
+#   latency -> second per bus transfer
+#   fault_rate -> random NACK per transfer, fault_addrs -> always NACK
+#
+#########################SIM I2C driver python3#####################
+
+import random
+import time
+
+from .drv_pi import DrvPI
+
+
+class DrvSim(DrvPI):
+    def __init__(
+        self,
+        i2c_port=1,
+        chip_addr=0x58,
+        xml_file_path=None,     #default value from XML
+        reg_defaults=None,      #or {16bit addr: value}
+        latency=0.0,            #second per transfer
+        fault_rate=0.0,         #0~1, NACK probability per transfer
+        fault_addrs=(),         #16bit addr, NACK if transfer touch it
+        seed=None,              #fault random seed
+        **kwargs,
+        ):
+        super().__init__(i2c_port=i2c_port, chip_addr=chip_addr, **kwargs)
+        #replace bus transfer, see DrvPI.__init__
+        self.i2c_xfer = self.xfer_sim
+        self.mode = "sim"
+
+        if reg_defaults is None:
+            reg_defaults = {}
+            if xml_file_path:
+                from .xml_parser import XMLParser
+                reg_defaults = XMLParser(xml_file_path).get_reg_defaults()
+        self.reg_defaults = reg_defaults
+        self.regs = bytearray(0x10000)
+        self.reset()
+
+        self.latency = latency
+        self.fault_rate = fault_rate
+        self.fault_addrs = set(fault_addrs)
+        self.rand = random.Random(seed)
+
+        #statistic
+        self.num_xfer = 0
+        self.num_msgs = 0
+        self.num_faults = 0
+
+    def reset(self):
+        #chip reset, all reg back to XML default
+        self.regs[:] = bytes(0x10000)
+        for addr, value in self.reg_defaults.items():
+            self.regs[addr] = value
+        if self.shadow is not None:
+            self.shadow.invalidate()
+        return
+
+    def wait_latency(self):
+        latency = self.latency
+        if latency >= 1e-3:
+            time.sleep(latency)
+        else:
+            #sleep too coarse for sub-ms, spin
+            t_end = time.perf_counter() + latency
+            while time.perf_counter() < t_end:
+                pass
+        return
+
+    def xfer_sim(self, msgs):
+        #msgs->[("w", [byte,...]), ("r", num), ...], same as DrvPI.i2c_xfer
+        #"w" first 2 byte set reg pointer, rest write with pointer increase
+        if self.latency:
+            self.wait_latency()
+        self.num_xfer += 1
+        self.num_msgs += len(msgs)
+        regs = self.regs
+        if self.fault_rate and self.rand.random() < self.fault_rate:
+            self.num_faults += 1
+            print(f"SIM::i2c-{self.i2c_port} NACK (fault inject)")
+            return None
+        read_out = []
+        reg_ptr = 0
+        for rw, data in msgs:
+            if rw == "w":
+                reg_ptr = (data[0] << 8) | data[1]
+                if self.fault_addrs and self.touch_fault(reg_ptr, max(len(data) - 2, 1)):
+                    return None
+                for value in data[2:]:
+                    regs[reg_ptr] = value
+                    reg_ptr = (reg_ptr + 1) & 0xFFFF
+            else:
+                if self.fault_addrs and self.touch_fault(reg_ptr, data):
+                    return None
+                end = reg_ptr + data
+                if end <= 0x10000:
+                    read_out.append(list(regs[reg_ptr:end]))
+                else:
+                    read_out.append(list(regs[reg_ptr:]) + list(regs[:end - 0x10000]))
+                reg_ptr = end & 0xFFFF
+        return read_out
+
+    def touch_fault(self, reg_ptr, num):
+        for addr in range(reg_ptr, reg_ptr + num):
+            if (addr & 0xFFFF) in self.fault_addrs:
+                self.num_faults += 1
+                print(f"SIM::i2c-{self.i2c_port} NACK at {addr & 0xFFFF:#06x} (fault inject)")
+                return True
+        return False
+
+    #FTDI method name, see DrvFTDI
+    ftdi_i2c_readReg = DrvPI.readReg
+    ftdi_i2c_writeReg = DrvPI.writeReg
+    ftdi_i2c_readBits = DrvPI.readBits
+    ftdi_i2c_writeBits = DrvPI.writeBits
+    ftdi_i2c_readRegs = DrvPI.readRegs
+    ftdi_i2c_writeRegs = DrvPI.writeRegs
+    ftdi_i2c_write_page = DrvPI.write_page
@@ -0,0 +1,234 @@
+#########################I2C driver statistic python3#####################
+#   opt-in per operation counter + latency histogram for DrvPI/DrvFTDI/DrvSim
+#
+#   drv.enable_stats() -> wrap driver op + bus call on the instance
+#   drv.disable_stats() -> remove wrapper, back to class method, zero cost
+#
+#   per op: count, error, total/max time, bus time, log2 latency histogram
+#   bus time: time in i2c_xfer (i2ctransfer/ioctl/sim) or libMPSSE call
+#   driver time = total - bus, our Python + ctypes marshalling
+#   global: bus transfer, byte written/read, error, retry
+#
+#   stats.snapshot() -> dict, stats.reset(), stats.dump(path) -> JSON
+#
+#########################I2C driver statistic python3#####################
+
+import json
+import time
+
+#op name -> method name on driver, FTDI name share one counter
+OP_METHODS = {
+    "readReg": ("readReg", "ftdi_i2c_readReg"),
+    "writeReg": ("writeReg", "ftdi_i2c_writeReg"),
+    "readBits": ("readBits", "ftdi_i2c_readBits"),
+    "writeBits": ("writeBits", "ftdi_i2c_writeBits"),
+    "readRegs": ("readRegs", "ftdi_i2c_readRegs"),
+    "writeRegs": ("writeRegs", "ftdi_i2c_writeRegs"),
+    "write_page": ("write_page", "ftdi_i2c_write_page"),
+    "run_queue": ("ftdi_i2c_run_queue",),
+    "flush": ("flush",),
+}
+
+NUM_BUCKETS = 40        #log2 ns bucket, 2^39ns ~ 9min
+
+
+class OpStat:
+    __slots__ = ("count", "errors", "total_ns", "bus_ns", "max_ns", "hist")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.bus_ns = 0
+        self.max_ns = 0
+        self.hist = [0] * NUM_BUCKETS
+
+    def add(self, elapsed_ns, bus_ns):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.bus_ns += bus_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.hist[min(elapsed_ns.bit_length(), NUM_BUCKETS - 1)] += 1
+
+    def percentile_us(self, pct):
+        #upper edge of the bucket hold pct, log2 resolution
+        target = self.count * pct / 100.0
+        seen = 0
+        for bucket, num in enumerate(self.hist):
+            seen += num
+            if num and seen >= target:
+                return (1 << bucket) / 1000.0
+        return 0.0
+
+    def snapshot(self):
+        count = self.count or 1
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": self.total_ns / 1e6,
+            "bus_ms": self.bus_ns / 1e6,
+            "driver_ms": (self.total_ns - self.bus_ns) / 1e6,
+            "mean_us": self.total_ns / count / 1000.0,
+            "mean_bus_us": self.bus_ns / count / 1000.0,
+            "p50_us": self.percentile_us(50),
+            "p99_us": self.percentile_us(99),
+            "max_us": self.max_ns / 1000.0,
+            #"<=N us": count, log2 bucket
+            "hist_us": {f"<={(1 << b) / 1000.0:g}": n for b, n in enumerate(self.hist) if n},
+        }
+
+
+class DrvStats:
+    def __init__(self):
+        self.drv = None
+        self.wrapped = {}       #attr name -> old instance value or None
+        self.ops = {}           #op name -> OpStat, wrapper keep a ref
+        self.reset()
+
+    def reset(self):
+        #clear in place, attached wrapper keep counting
+        for op in self.ops.values():
+            op.reset()
+        self.bus_ns = 0
+        self.bus_xfers = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.errors = 0
+        self.retries = 0
+        self.t_reset = time.perf_counter()
+        return
+
+    def get_op(self, op_name):
+        op = self.ops.get(op_name)
+        if op is None:
+            op = self.ops[op_name] = OpStat()
+        return op
+
+    ########attach/detach wrapper on driver instance#######
+    def attach(self, drv):
+        self.drv = drv
+        for op_name, method_names in OP_METHODS.items():
+            for method_name in method_names:
+                func = getattr(drv, method_name, None)
+                if callable(func):
+                    self.set_wrapper(method_name, self.wrap_op(op_name, func))
+        if callable(getattr(drv, "i2c_xfer", None)):
+            self.set_wrapper("i2c_xfer", self.wrap_xfer(drv.i2c_xfer))
+        if callable(getattr(drv, "dev_write", None)):
+            self.set_wrapper("dev_write", self.wrap_mpsse_call(drv.dev_write, True))
+            self.set_wrapper("dev_read", self.wrap_mpsse_call(drv.dev_read, False))
+        return self
+
+    def set_wrapper(self, name, wrapper):
+        #keep instance value (bound method set in __init__), None -> class method
+        self.wrapped[name] = self.drv.__dict__.get(name)
+        setattr(self.drv, name, wrapper)
+
+    def detach(self):
+        for name, old in self.wrapped.items():
+            if old is None:
+                del self.drv.__dict__[name]
+            else:
+                setattr(self.drv, name, old)
+        self.wrapped = {}
+        self.drv = None
+        return
+
+    def wrap_op(self, op_name, func):
+        stats = self
+        op = self.get_op(op_name)
+        perf_ns = time.perf_counter_ns
+
+        def timed_op(*args, **kwargs):
+            t0 = perf_ns()
+            bus0 = stats.bus_ns
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                op.errors += 1
+                raise
+            finally:
+                #bus time include nested op, e.g. readReg in writeBits
+                op.add(perf_ns() - t0, stats.bus_ns - bus0)
+        return timed_op
+
+    def wrap_xfer(self, func):
+        #DrvPI/DrvSim i2c_xfer(msgs) -> None if error
+        stats = self
+        perf_ns = time.perf_counter_ns
+
+        def timed_xfer(msgs):
+            t0 = perf_ns()
+            read_out = func(msgs)
+            stats.add_xfer(msgs, read_out, perf_ns() - t0)
+            return read_out
+        return timed_xfer
+
+    def add_xfer(self, msgs, read_out, elapsed_ns):
+        #one i2c_xfer done, read_out None -> error
+        self.bus_ns += elapsed_ns
+        self.bus_xfers += 1
+        if read_out is None:
+            self.errors += 1
+            return
+        for rw, data in msgs:
+            if rw == "w":
+                self.bytes_written += len(data)
+            else:
+                self.bytes_read += data
+        return
+
+    async def time_async(self, op_name, coro):
+        #same as wrap_op for AsyncDrvPI op, await coro under op timer
+        #NOTE, task on same driver run at same time -> bus time overlap
+        op = self.get_op(op_name)
+        t0 = time.perf_counter_ns()
+        bus0 = self.bus_ns
+        try:
+            return await coro
+        except Exception:
+            op.errors += 1
+            raise
+        finally:
+            op.add(time.perf_counter_ns() - t0, self.bus_ns - bus0)
+
+    def wrap_mpsse_call(self, func, is_write):
+        #DrvFTDI dev_write/dev_read(handle, addr, size, buf, ref, options) -> status
+        stats = self
+        perf_ns = time.perf_counter_ns
+
+        def timed_call(handle, dev_addr, size, buf, size_ref, options):
+            t0 = perf_ns()
+            status = func(handle, dev_addr, size, buf, size_ref, options)
+            stats.bus_ns += perf_ns() - t0
+            stats.bus_xfers += 1
+            if status != 0:
+                stats.errors += 1
+            elif is_write:
+                stats.bytes_written += size
+            else:
+                stats.bytes_read += size
+            return status
+        return timed_call
+
+    ########report#######
+    def snapshot(self):
+        return {
+            "elapsed_s": time.perf_counter() - self.t_reset,
+            "bus_xfers": self.bus_xfers,
+            "bus_ms": self.bus_ns / 1e6,
+            "bytes_written": self.bytes_written,
+            "bytes_read": self.bytes_read,
+            "errors": self.errors,
+            "retries": self.retries,
+            "ops": {name: op.snapshot() for name, op in self.ops.items() if op.count},
+        }
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
@@ -0,0 +1,260 @@
+"""
+field_record.py
+--------------------------------------
+字段字节配置记录: XMLParser字段表与json_data的存储单元。
+
+一条记录 = 一个field在一个字节上的配置(原13个key的dict)。
+- __slots__对象, 不带每条记录的dict
+- byte_address/byte_mask/byte_shift存整数(addr/mask/shift), 直接参与计算
+  原字符串只在不是标准写法时保留, 取值时按原样还原
+- 名称类字符串intern(XMLParser生成时), 同名只存一份
+
+兼容dict用法: reg.get("byte_address")、reg["register_name"] = ...、
+reg.copy()、keys()/items()、与dict比较; 写JSON用 json.dump(default=record_to_dict)。
+
+--------------------------------------
+"""
+
+import re
+import sys
+
+# 记录key顺序, 即json key顺序, 与Excel列一一对应
+FIELD_RECORD_KEYS = (
+    "register_name", "base_address", "field_name", "bit_range",
+    "total_bits", "default_value", "data_type", "description",
+    "byte_address", "byte_mask", "byte_shift", "effective_bits",
+    "configuration_notes",
+)
+
+# dict key -> slot, 整数存储的三个key单独处理
+_PLAIN_SLOTS = {
+    "register_name": "register_name",
+    "base_address": "base_address",
+    "field_name": "field_name",
+    "bit_range": "bit_range",
+    "total_bits": "total_bits",
+    "default_value": "default_value",
+    "data_type": "data_type",
+    "description": "description",
+    "effective_bits": "effective_bits",
+    "configuration_notes": "configuration_notes",
+}
+
+
+def intern_str(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+# 标准写法, 取值时可由整数还原, 不保留原字符串
+_CANON_ADDR_RE = re.compile(r"0x[0-9A-F]{4}\Z")
+_CANON_MASK_RE = re.compile(r"0x[0-9A-F]{2}\Z")
+_CANON_SHIFT_RE = re.compile(r"-?(0|[1-9][0-9]*)\Z")
+
+# mask/shift取值种类很少, 解析结果按原字符串缓存
+_MASK_CACHE = {}
+_SHIFT_CACHE = {}
+
+
+def _parse_addr(text):
+    # "" -> (None, None), 非十六进制 -> (None, 原字符串), 导出Excel时照原样写出
+    if not text:
+        return None, None
+    try:
+        addr = int(text, 16)
+    except ValueError:
+        return None, text
+    return addr, None if _CANON_ADDR_RE.match(text) else text
+
+
+def _parse_mask(text):
+    parsed = _MASK_CACHE.get(text)
+    if parsed is None:
+        if not text:
+            parsed = (None, None)
+        else:
+            parsed = (int(text, 16), None if _CANON_MASK_RE.match(text) else text)
+        _MASK_CACHE[text] = parsed
+    return parsed
+
+
+def _parse_shift(text):
+    parsed = _SHIFT_CACHE.get(text)
+    if parsed is None:
+        if not text:
+            parsed = (None, None)
+        else:
+            # "-0"按标准写法还原为"0", 不算标准
+            parsed = (int(text), None if _CANON_SHIFT_RE.match(text) and text != "-0" else text)
+        _SHIFT_CACHE[text] = parsed
+    return parsed
+
+
+class FieldRecord:
+    __slots__ = (
+        "register_name", "base_address", "field_name", "bit_range",
+        "total_bits", "default_value", "data_type", "description",
+        "addr", "mask", "shift", "effective_bits",
+        "configuration_notes", "volatile",
+        "addr_text", "mask_text", "shift_text",
+    )
+
+    def __init__(self, register_name, base_address, field_name, bit_range,
+                 total_bits, default_value, data_type, description,
+                 byte_address, byte_mask, byte_shift, effective_bits,
+                 configuration_notes, volatile=False):
+        """
+        参数同FIELD_RECORD_KEYS, byte_*为XML原字符串
+        名称字符串由调用方intern(同一field的各字节记录共用, 每个field只做一次)
+        """
+        self.register_name = register_name
+        self.base_address = base_address
+        self.field_name = field_name
+        self.bit_range = bit_range
+        self.total_bits = total_bits
+        self.default_value = default_value
+        self.data_type = data_type
+        self.description = description
+        self.effective_bits = effective_bits
+        self.configuration_notes = configuration_notes
+        self.volatile = volatile
+        self.addr, self.addr_text = _parse_addr(byte_address)
+        self.mask, self.mask_text = _parse_mask(byte_mask)
+        self.shift, self.shift_text = _parse_shift(byte_shift)
+
+    # ========== 整数存储的key, 还原字符串 ==========
+    @property
+    def byte_address(self) -> str:
+        if self.addr_text is not None:
+            return self.addr_text
+        return "" if self.addr is None else f"0x{self.addr:04X}"
+
+    @property
+    def byte_mask(self) -> str:
+        if self.mask_text is not None:
+            return self.mask_text
+        return "" if self.mask is None else f"0x{self.mask:02X}"
+
+    @property
+    def byte_shift(self) -> str:
+        if self.shift_text is not None:
+            return self.shift_text
+        return "" if self.shift is None else str(self.shift)
+
+    # ========== dict兼容 ==========
+    def __getitem__(self, key):
+        slot = _PLAIN_SLOTS.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        if key == "byte_address":
+            return self.byte_address
+        if key == "byte_mask":
+            return self.byte_mask
+        if key == "byte_shift":
+            return self.byte_shift
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        slot = _PLAIN_SLOTS.get(key)
+        if slot is not None:
+            setattr(self, slot, intern_str(value))
+        elif key == "byte_address":
+            self.addr, self.addr_text = _parse_addr(value)
+        elif key == "byte_mask":
+            self.mask, self.mask_text = _parse_mask(value)
+        elif key == "byte_shift":
+            self.shift, self.shift_text = _parse_shift(value)
+        else:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        slot = _PLAIN_SLOTS.get(key)
+        if slot is not None:
+            return getattr(self, slot)
+        getter = _TEXT_GETTERS.get(key)
+        if getter is not None:
+            return getter(self)
+        return default
+
+    def __contains__(self, key):
+        return key in FIELD_RECORD_KEYS
+
+    def __iter__(self):
+        return iter(FIELD_RECORD_KEYS)
+
+    def __len__(self):
+        return len(FIELD_RECORD_KEYS)
+
+    def keys(self):
+        return FIELD_RECORD_KEYS
+
+    def values(self) -> list:
+        return [
+            self.register_name, self.base_address, self.field_name, self.bit_range,
+            self.total_bits, self.default_value, self.data_type, self.description,
+            self.byte_address, self.byte_mask, self.byte_shift, self.effective_bits,
+            self.configuration_notes,
+        ]
+
+    def items(self):
+        return zip(FIELD_RECORD_KEYS, self.values())
+
+    def to_dict(self) -> dict:
+        return dict(zip(FIELD_RECORD_KEYS, self.values()))
+
+    def copy(self):
+        # 只复制引用, 逐个赋值比setattr循环快
+        new = _new_record(FieldRecord)
+        new.register_name = self.register_name
+        new.base_address = self.base_address
+        new.field_name = self.field_name
+        new.bit_range = self.bit_range
+        new.total_bits = self.total_bits
+        new.default_value = self.default_value
+        new.data_type = self.data_type
+        new.description = self.description
+        new.addr = self.addr
+        new.mask = self.mask
+        new.shift = self.shift
+        new.effective_bits = self.effective_bits
+        new.configuration_notes = self.configuration_notes
+        new.volatile = self.volatile
+        new.addr_text = self.addr_text
+        new.mask_text = self.mask_text
+        new.shift_text = self.shift_text
+        return new
+
+    def __eq__(self, other):
+        if isinstance(other, FieldRecord):
+            other = other.to_dict()
+        elif not isinstance(other, dict):
+            return NotImplemented
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"FieldRecord({self.to_dict()!r})"
+
+    # ========== pickle, 模型磁盘缓存 ==========
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in FieldRecord.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(FieldRecord.__slots__, state):
+            setattr(self, slot, value)
+
+
+_new_record = object.__new__
+# 整数存储key -> 还原字符串
+_TEXT_GETTERS = {
+    "byte_address": FieldRecord.byte_address.fget,
+    "byte_mask": FieldRecord.byte_mask.fget,
+    "byte_shift": FieldRecord.byte_shift.fget,
+}
+
+
+def record_to_dict(obj):
+    """json.dump(default=...)用, FieldRecord -> dict"""
+    if isinstance(obj, FieldRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -24,12 +24,17 @@ In the upper-level class, we generally inherit the aves_script class
                 super().__init__(i2c_port, 0x58)
 
 !!In this way, we can realize that two i2c ports share a set of scripts!!
+
 There is a little trouble if you want to call the function in the upper class to use super().
 that is:
     super().func_01_01_Chip_Power_Up()
 or:
     super().writeReg(0x58, 0x00, 0x01)
 
+GetAVES(async_mode=True) -> class async_aves_script(async_aves_base), async def
+    chip = async_aves_script(i2c_port=1)
+    await chip.func_01_01_Chip_Power_Up()
+
     
 '''
 
@@ -38,7 +43,7 @@ import os
 #import sys
 #sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from .xml_parser import XMLParser
+from .reg_model import RegisterModel
 
 class GetAVES:
     def __init__(self,
@@ -47,10 +52,13 @@ class GetAVES:
                  py_out_local_dir="",       #if need to change outdir
                  py_out_name="",            #if need to change out name
                  addr_conv=False,           #if need to change address name
+                 async_mode=False,          #emit async def, class async_aves_script
+                 model=None,                #shared RegisterModel, e.g. from AutoPyScript
                  ):
         self.xml_file_path = xml_file_path
         self.aves_script_name=aves_script_name
         self.addr_conv=addr_conv
+        self.async_mode=async_mode
 
         self.py_out_local_dir=py_out_local_dir
 
@@ -60,12 +68,19 @@ class GetAVES:
         else:
             self.py_out_name=py_out_name
 
-        #use XMLParser to read the XML file and get device address dictionary
-        self.parser = XMLParser(xml_file_path)
-        self.dev_addr_dict = self.parser.parse_to_dict()
+        #XML parse in RegisterModel, on first use of parser/dev_addr_dict
+        self.model = model if model is not None else RegisterModel(xml_file_path)
 
         print(f"aves path={self.aves_script_name}")
 
+    @property
+    def parser(self):
+        return self.model.parser
+
+    @property
+    def dev_addr_dict(self):
+        return self.model.dev_addr_dict
+
 
     def replace_func_name(self,func_name):
         func_name_new = list(func_name)
@@ -104,6 +119,14 @@ class GetAVES:
                 fo.write(line)
         #----Write Header End----
 
+        #async: func under own class, await every reg/sub func call
+        if self.async_mode:
+            fo.write("\n\nclass async_aves_script(async_aves_base):\n")
+            def_str="    async def "
+            call_str="        await self."
+        else:
+            def_str="    def "
+            call_str="        self."
 
         func_write_en = 0
         line_num = 1
@@ -132,7 +155,7 @@ class GetAVES:
                     func_name_new = "func_"+func_name_new
                     #print "func_name_new: "+func_name_new
                     if(True):
-                        fo.write("    def "+func_name_new+"(self):\n")
+                        fo.write(def_str+func_name_new+"(self):\n")
                         '''yfzhao MOVE to python3'''
                         #fo.write("    print \"Cfg "+func_name_new+"...\"\n")
                         fo.write("        print(\"Cfg "+func_name_new+"...\")\n")
@@ -148,7 +171,7 @@ class GetAVES:
                         call_func_name_new=line.strip().split('"')[-2]
                         call_func_name_new=self.replace_func_name(call_func_name_new)
                         #print "call_func_name_new:  "+call_func_name_new
-                        fo.write("        self.func_"+call_func_name_new+"()\n")
+                        fo.write(call_str+"func_"+call_func_name_new+"()\n")
                         #print("func_"+call_func_name_new+"()\n")
 
                     # Find End
@@ -173,9 +196,9 @@ class GetAVES:
                         cfg_sub_addr= cfg_16bit_addr[2:]
                         cfg_content = cfg_txt[2].strip()
                         if self.addr_conv:
-                            fo.write("        self.writeReg("+cfg_dev_addr_para+",0x"+cfg_sub_addr+",0x"+cfg_content+") #"+comments)
+                            fo.write(call_str+"writeReg("+cfg_dev_addr_para+",0x"+cfg_sub_addr+",0x"+cfg_content+") #"+comments)
                         else:
-                            fo.write("        self.writeReg(0x"+cfg_dev_addr+",0x"+cfg_sub_addr+",0x"+cfg_content+") #"+comments)
+                            fo.write(call_str+"writeReg(0x"+cfg_dev_addr+",0x"+cfg_sub_addr+",0x"+cfg_content+") #"+comments)
                         fo.write("\n")
         f.close()
         fo.close()
@@ -12,6 +12,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 #add windows judgement#
 #FTDI & raspberry Compatible#
 import platform
+from contextlib import contextmanager
 
 def get_system():
     system = platform.system()
@@ -26,53 +27,217 @@ def get_system():
 #no need to consider .dll issue
 #yfzhao, 250805
 
-class aves_script:
-    def __init__(self,i2c_port=1,chip_addr=0x58,):
+class async_aves_base:
+    #asyncio base for GetAVES(async_mode=True), await self.writeReg(...)
+    #same backend name/kwargs as aves_script, see py_testenv/drv_async.py
+    #NOTE, keep before aves_script, generated sync func append to last class
+    def __init__(self,i2c_port=1,chip_addr=0x58,backend=None,executor=None,**backend_kwargs):
+        from py_testenv.backends import default_backend_name
+        from py_testenv.drv_async import create_async_backend
         self.i2c_port = i2c_port
         self.chip_addr = chip_addr
         self.system = get_system()
-        if self.system == "linux":
-            #from common.raspberry import raspberry
-            from py_testenv.drv_pi import DrvPI
-            self.raspberry_i2c = DrvPI(i2c_port=self.i2c_port)
-        else:
-            #from common.FTDI import FTDI
-            from py_testenv.drv_ftdi import DrvFTDI
-            self.ftdi_i2c = DrvFTDI(i2c_port=self.i2c_port)
-
+        if backend is None:
+            backend = default_backend_name(self.system)
+        self.backend = backend
+        self.adrv = create_async_backend(backend, i2c_port=self.i2c_port, chip_addr=self.chip_addr,
+                                         executor=executor, **backend_kwargs)
+        self.drv = self.adrv.drv
+        adrv = self.adrv
+        self.readReg = adrv.readReg
+        self.writeReg = adrv.writeReg
+        self.readBits = adrv.readBits
+        self.writeBits = adrv.writeBits
+        self.readRegs = adrv.readRegs
+        self.writeRegs = adrv.writeRegs
+        self.batch = adrv.batch
+        self.run_batch = adrv.run_batch
+        self.flush = adrv.flush
+        self.wait_bits = adrv.wait_bits
+        self.wait_conditions = adrv.wait_conditions
+
+    def get_drv(self):
+        return self.drv
+
+    async def aclose(self):
+        await self.adrv.aclose()
 
+class aves_script:
+    def __init__(self,i2c_port=1,chip_addr=0x58,pi_mode="i2ctransfer",backend=None,**backend_kwargs):
+        #backend -> name in py_testenv.backends, or env PY_TESTENV_BACKEND
+        #default: linux "pi", windows "ftdi"
+        #pi_mode="ioctl" -> "pi_ioctl", /dev/i2c-N in-process, no i2ctransfer fork
+        from py_testenv.backends import create_backend, default_backend_name
+        self.i2c_port = i2c_port
+        self.chip_addr = chip_addr
+        self.system = get_system()
+        if backend is None:
+            backend = default_backend_name(self.system)
+            if backend == "pi" and pi_mode == "ioctl":
+                backend = "pi_ioctl"
+        self.backend = backend
+        self.drv = create_backend(backend, i2c_port=self.i2c_port, chip_addr=self.chip_addr, **backend_kwargs)
+        #old name, keep for upper class
+        if backend.startswith("pi"):
+            self.raspberry_i2c = self.drv
+        elif backend == "ftdi":
+            self.ftdi_i2c = self.drv
+        #open RegTransaction, see transaction()
+        self.txn = None
+        self.install_backend()
+
+    def install_backend(self):
+        #bind driver method to instance once, self.writeReg() call driver direct
+        #no system/backend check per call
+        drv = self.drv
+        self.readReg = drv.readReg
+        self.writeReg = drv.writeReg
+        self.readBits = drv.readBits
+        self.writeBits = drv.writeBits
+        self.readRegs = drv.readRegs
+        self.writeRegs = drv.writeRegs
+        self.batch = drv.batch
+        self.flush = drv.flush
+
+    #class level method, for super().writeReg() in upper class
+    #call the instance bound one, same path as self.writeReg()
     def readReg(self, addr1, addr2):
-        if self.system == "linux":
-            read_int = self.raspberry_i2c.readReg(addr1, addr2)
-        else:
-            read_int = self.ftdi_i2c.ftdi_i2c_readReg(addr1, addr2)
-        return read_int
+        return self.__dict__["readReg"](addr1, addr2)
 
     def writeReg(self, addr1, addr2, value):
-        if self.system == "linux":
-            self.raspberry_i2c.writeReg(addr1, addr2, value)
-        else:
-            self.ftdi_i2c.ftdi_i2c_writeReg(addr1, addr2, value)
+        self.__dict__["writeReg"](addr1, addr2, value)
 
     def writeBits(self, addr1, addr2, lsb, bits, invalue):
-        if self.system == "linux":
-            self.raspberry_i2c.writeBits(addr1, addr2, lsb, bits, invalue)
-        else:
-            self.ftdi_i2c.ftdi_i2c_writeBits(addr1, addr2, lsb, bits, invalue)
+        self.__dict__["writeBits"](addr1, addr2, lsb, bits, invalue)
 
     def readBits(self, addr1, addr2, lsb, bits):
-        if self.system == "linux":
-            output = self.raspberry_i2c.readBits(addr1, addr2, lsb, bits)
-        else:
-            output = self.ftdi_i2c.ftdi_i2c_readBits(addr1, addr2, lsb, bits)
-        return output
+        return self.__dict__["readBits"](addr1, addr2, lsb, bits)
 
     def readRegs(self, addr1, addr2, num):
-        if self.system == "linux":
-            output = self.raspberry_i2c.readRegs(addr1, addr2, num)
-        else:
-            output = self.ftdi_i2c.ftdi_i2c_readRegs(addr1, addr2, num)
-        return output
+        return self.__dict__["readRegs"](addr1, addr2, num)
+
+    def writeRegs(self, addr1, addr2, data_list):
+        #burst write, any start offset/length, driver chunk and cross page
+        self.__dict__["writeRegs"](addr1, addr2, data_list)
+
+    def batch(self):
+        #with self.batch(): self.func_xxx()
+        #queue writeReg, flush before any read and at the end
+        return self.__dict__["batch"]()
+
+    def flush(self):
+        self.__dict__["flush"]()
+
+    @contextmanager
+    def transaction(self):
+        #with self.transaction(): field writes...
+        #merge masked update per byte, on exit one read(or none) + one write
+        #per touched byte in address order, contiguous byte -> burst write
+        #exception inside -> pending update dropped, nothing written
+        if self.txn is not None:
+            #nested, outer one commit
+            yield self.txn
+            return
+        from py_testenv.reg_txn import RegTransaction
+        self.txn = RegTransaction()
+        #swap write to txn, read commit pending first
+        self.writeReg = self.txn.write_reg
+        self.writeBits = self.txn.write_bits
+        self.writeRegs = self.txn.write_regs
+        self.readReg = self.txn_read(self.drv.readReg)
+        self.readBits = self.txn_read(self.drv.readBits)
+        self.readRegs = self.txn_read(self.drv.readRegs)
+        try:
+            yield self.txn
+        except BaseException:
+            self.txn = None
+            self.install_backend()
+            raise
+        txn, self.txn = self.txn, None
+        self.install_backend()
+        txn.commit(self.drv.readReg, self.drv.writeReg, self.drv.writeRegs)
+
+    def txn_read(self, read_func):
+        #read inside transaction, commit pending first so read see new value
+        def read(*args):
+            self.txn.commit(self.drv.readReg, self.drv.writeReg, self.drv.writeRegs)
+            return read_func(*args)
+        return read
+
+    def wait_bits(self, addr1, addr2, lsb, bits, expected, timeout=1.0, **poll_kwargs):
+        #poll status field until == expected, e.g. wait_bits(0x10, 0x20, 0, 1, 1) PLL lock
+        #adaptive interval, return WaitResult .ok/.elapsed, see py_testenv/reg_poll.py
+        #raise_on_timeout=True -> WaitTimeout instead of ok=False
+        from py_testenv.reg_poll import wait_conditions
+        return wait_conditions(self.readRegs, [(addr1, addr2, lsb, bits, expected)], timeout, **poll_kwargs)
+
+    def wait_conditions(self, conditions, timeout=1.0, **poll_kwargs):
+        #conditions -> [(addr1, addr2, lsb, bits, expected), ...]
+        #one burst read cover all per round, mode="any" -> first hit return
+        from py_testenv.reg_poll import wait_conditions
+        return wait_conditions(self.readRegs, conditions, timeout, **poll_kwargs)
+
+    def get_drv(self):
+        return self.drv
+
+    def enable_shadow(self, xml_file_path=None, volatile=()):
+        #opt-in write-through shadow, writeBits no readback
+        #xml_file_path -> volatile hint from XML, status reg always re-read
+        #volatile -> extra 16bit addr or (addr1, addr2)
+        from py_testenv.reg_cache import ShadowCache
+        shadow = ShadowCache(volatile)
+        if xml_file_path:
+            from py_testenv.xml_parser import XMLParser
+            shadow.add_volatile(XMLParser(xml_file_path).get_volatile_addrs())
+        self.drv.shadow = shadow
+        return shadow
+
+    def disable_shadow(self):
+        self.drv.shadow = None
+
+    def shadow_invalidate(self, addr1=None, addr2=None):
+        #drop cached value, e.g. after chip reset
+        shadow = self.drv.shadow
+        if shadow is not None:
+            shadow.invalidate(None, addr1, addr2)
+
+    def shadow_sync(self):
+        #re-read all cached reg from chip
+        self.drv.shadow_sync()
+
+    def snapshot(self, pages=None, label="", xml_file_path=None):
+        #full chip burst read -> RegSnapshot, see py_testenv/reg_snapshot.py
+        #pages -> [addr1, ...] or dev_addr_dict, default all page in xml_file_path
+        from py_testenv.reg_snapshot import RegSnapshot
+        if pages is None:
+            if xml_file_path is None:
+                raise ValueError("snapshot needs pages or xml_file_path")
+            from py_testenv.xml_parser import XMLParser
+            pages = XMLParser(xml_file_path).parse_to_dict()
+        return RegSnapshot.capture(self.readRegs, pages, self.chip_addr, label)
+
+    def enable_stats(self):
+        #opt-in op count + latency, see py_testenv/drv_stats.py
+        #rebind so self.writeReg() go through the timed wrapper
+        stats = self.drv.enable_stats()
+        if self.txn is None:
+            self.install_backend()
+        return stats
+
+    def disable_stats(self):
+        self.drv.disable_stats()
+        if self.txn is None:
+            self.install_backend()
+
+    def get_stats(self, reset=False):
+        #snapshot dict, None if not enabled
+        stats = self.drv.stats
+        if stats is None:
+            return None
+        snapshot = stats.snapshot()
+        if reset:
+            stats.reset()
+        return snapshot
 
 
 #######rasp_conv_aves_defination end##########
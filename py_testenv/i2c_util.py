@@ -0,0 +1,37 @@
+#########################I2C common util python3#####################
+#   shared helper for DrvPI/DrvFTDI
+#   burst split: gscoolink chip addr = addr1(page) + addr2(offset in page)
+#   offset auto increase in one burst, but not cross page
+#   split_burst -> read chunk, split_write -> write chunk with data
+#
+#########################I2C common util python3#####################
+
+PAGE_SIZE = 0x100           #addr2 8bit, 256 reg per page
+DEFAULT_BURST_CHUNK = 256   #full page in one transaction
+
+
+def split_burst(addr1, addr2, num, chunk=DEFAULT_BURST_CHUNK):
+    #split num reg from (addr1, addr2) into (addr1, addr2, len) chunks
+    #each chunk <= chunk size and not cross page
+    #cross page -> continue at (addr1+1, 0x00)
+    chunk_list = []
+    while num > 0:
+        len_chunk = min(num, chunk, PAGE_SIZE - addr2)
+        chunk_list.append((addr1, addr2, len_chunk))
+        num -= len_chunk
+        addr2 += len_chunk
+        if addr2 == PAGE_SIZE:
+            addr1 += 1
+            addr2 = 0
+    return chunk_list
+
+
+def split_write(addr1, addr2, data_list, chunk=DEFAULT_BURST_CHUNK):
+    #same split as split_burst, (addr1, addr2, data_chunk) for burst write
+    data_list = list(data_list)
+    chunk_list = []
+    pos = 0
+    for chunk_addr1, chunk_addr2, len_chunk in split_burst(addr1, addr2, len(data_list), chunk):
+        chunk_list.append((chunk_addr1, chunk_addr2, data_list[pos:pos + len_chunk]))
+        pos += len_chunk
+    return chunk_list
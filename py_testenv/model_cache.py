@@ -0,0 +1,127 @@
+#########################register model cache python3#####################
+#   on-disk cache of XMLParser result, warm start no ElementTree at all
+#
+#   key: blake2b of XML content + XMLParser PARSER_VERSION, stored inside
+#   the cache file, any mismatch -> stale, rebuild and overwrite
+#   body: pickle (highest protocol) of dev_addr_dict/addr_to_key/json_data
+#   + field record table
+#
+#   opt-in, XMLParser(cache=...), None -> env PY_TESTENV_XML_CACHE:
+#     None/unset -> no cache
+#     True/"on"  -> user cache dir, ~/.cache/py_testenv or %LOCALAPPDATA%
+#     "xml"      -> next to the XML, <name>.xml.pytmodel
+#     "off"/False-> no cache
+#     other str  -> that directory
+#   XMLParser load/build the cache on first data access, not in __init__
+#   clear_cache() remove cache file in a cache dir
+#
+#   NOTE, pickle load run code, only point cache at trusted directory
+#
+#########################register model cache python3#####################
+
+import hashlib
+import os
+import pickle
+
+CACHE_ENV = "PY_TESTENV_XML_CACHE"
+CACHE_SUFFIX = ".pytmodel"
+CACHE_OFF = ("", "off", "0", "false", "no", "none")
+CACHE_ON = ("on", "1", "true", "yes", "user")
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def get_user_cache_dir():
+    base = os.environ.get("LOCALAPPDATA") if os.name == "nt" else None
+    if not base:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "py_testenv", "xml_model")
+
+
+def get_cache_dir(cache=None):
+    #cache arg/env -> cache dir, "xml" for next to the XML, None -> cache disabled
+    if cache is None:
+        cache = os.environ.get(CACHE_ENV)
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return get_user_cache_dir()
+    key = cache.strip().lower()
+    if key in CACHE_OFF:
+        return None
+    if key in CACHE_ON:
+        return get_user_cache_dir()
+    return cache
+
+
+def get_cache_path(xml_file_path, cache=None):
+    #None -> cache disabled
+    cache_dir = get_cache_dir(cache)
+    if cache_dir is None:
+        return None
+    xml_path = os.path.abspath(xml_file_path)
+    base_name = os.path.basename(xml_path)
+    if cache_dir == "xml":
+        return xml_path + CACHE_SUFFIX
+    #one file per XML path, content key checked inside
+    path_key = hashlib.blake2b(xml_path.encode("utf-8"), digest_size=6).hexdigest()
+    return os.path.join(cache_dir, f"{base_name}_{path_key}{CACHE_SUFFIX}")
+
+
+def file_digest(path):
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_model(cache_path, digest, version):
+    #model dict, None if missing/stale/broken
+    try:
+        with open(cache_path, "rb") as f:
+            model = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError, TypeError):
+        return None
+    if not isinstance(model, dict) or model.get("digest") != digest or model.get("version") != version:
+        return None
+    return model
+
+
+def save_model(cache_path, model):
+    #write tmp then rename, reader never see half file
+    #read-only dir etc. -> no cache, not an error
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def clear_cache(cache=True):
+    #remove all cache file in cache dir (default user cache dir), return number removed
+    #"xml" -> cache file next to each XML, not tracked, remove by hand
+    cache_dir = get_cache_dir(cache)
+    if cache_dir is None or cache_dir == "xml":
+        return 0
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return 0
+    num = 0
+    for name in names:
+        #cache file, or tmp file left by a killed save_model
+        if name.endswith(CACHE_SUFFIX) or (CACHE_SUFFIX + "." in name and name.endswith(".tmp")):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+                num += 1
+            except OSError:
+                pass
+    return num
@@ -0,0 +1,228 @@
+#########################FTDI MPSSE I2C queue python3#####################
+#   raw MPSSE command queue, pack many i2c transaction into one USB transfer
+#
+#   libMPSSE I2C_DeviceWrite/I2C_DeviceRead = one USB round trip each,
+#   here build MPSSE command for a list of transaction, cut to block
+#   <= FTDI buffer size, one FT_Write + one FT_Read per block
+#
+#   pin, same as libMPSSE i2c:
+#   ADBUS0 SCL, ADBUS1 SDA out, ADBUS2 SDA in
+#   see FTDI AN_108 (MPSSE command), AN_255 (i2c by MPSSE)
+#
+#   transaction:
+#   ("w", addr1, addr2, [data, ...])   START addr_w addr1 addr2 data.. STOP
+#   ("r", addr1, addr2, num)           START addr_w addr1 addr2
+#                                      START addr_r data*num STOP
+#
+#   transaction bigger than one block -> command cut at bus byte boundary,
+#   rest go in next block, still one i2c transaction (SCL held low between)
+#   NACK -> I2CBusError, driver RetryPolicy retry the whole list
+#
+#########################FTDI MPSSE I2C queue python3#####################
+
+import ctypes
+
+from .retry_policy import I2CBusError
+
+########MPSSE opcode, AN_108#######
+MPSSE_SET_BITS_LOW = 0x80           #value, direction
+MPSSE_BYTES_OUT_NEG_MSB = 0x11      #lenL, lenH, data...
+MPSSE_BITS_OUT_NEG_MSB = 0x13       #len, data
+MPSSE_BYTES_IN_POS_MSB = 0x20       #lenL, lenH
+MPSSE_BITS_IN_POS_MSB = 0x22        #len
+MPSSE_SEND_IMMEDIATE = 0x87
+
+#pin value/direction
+PIN_SCL = 0x01
+PIN_SDA_OUT = 0x02
+DIR_SDA_OUT = PIN_SCL | PIN_SDA_OUT     #drive SCL, SDA
+DIR_SDA_IN = PIN_SCL                    #drive SCL, release SDA
+
+#repeat SET_BITS_LOW to hold i2c start/stop timing
+HOLD_REPEAT = 4
+
+#FTDI USB buffer, see drv_ftdi.py header
+DEFAULT_BLOCK_SIZE = 4096
+
+I2C_START = bytes(
+    [MPSSE_SET_BITS_LOW, PIN_SDA_OUT, DIR_SDA_OUT] +                                #SCL low SDA high, for repeated START
+    [MPSSE_SET_BITS_LOW, PIN_SCL | PIN_SDA_OUT, DIR_SDA_OUT] * HOLD_REPEAT +        #SCL high SDA high
+    [MPSSE_SET_BITS_LOW, PIN_SCL, DIR_SDA_OUT] * HOLD_REPEAT +                      #SDA fall while SCL high
+    [MPSSE_SET_BITS_LOW, 0x00, DIR_SDA_OUT]                                         #SCL low
+)
+I2C_STOP = bytes(
+    [MPSSE_SET_BITS_LOW, 0x00, DIR_SDA_OUT] * HOLD_REPEAT +                         #SCL low SDA low
+    [MPSSE_SET_BITS_LOW, PIN_SCL, DIR_SDA_OUT] * HOLD_REPEAT +                      #SCL high
+    [MPSSE_SET_BITS_LOW, PIN_SCL | PIN_SDA_OUT, DIR_SDA_OUT] * HOLD_REPEAT          #SDA rise while SCL high, bus idle
+)
+#byte out + slave ACK bit in, 1 response byte per write byte
+I2C_WRITE_BYTE_HEAD = bytes([MPSSE_BYTES_OUT_NEG_MSB, 0x00, 0x00])
+I2C_WRITE_BYTE_TAIL = bytes(
+    [MPSSE_SET_BITS_LOW, 0x00, DIR_SDA_IN,
+     MPSSE_BITS_IN_POS_MSB, 0x00,
+     MPSSE_SET_BITS_LOW, PIN_SDA_OUT, DIR_SDA_OUT]
+)
+#byte in + master ACK/NACK bit out, 1 response byte per read byte
+#drive SDA again before ACK bit out, same as libMPSSE I2C_Read8bitsAndGiveAck
+I2C_READ_BYTE_HEAD = bytes(
+    [MPSSE_SET_BITS_LOW, 0x00, DIR_SDA_IN,
+     MPSSE_BYTES_IN_POS_MSB, 0x00, 0x00,
+     MPSSE_SET_BITS_LOW, 0x00, DIR_SDA_OUT,
+     MPSSE_BITS_OUT_NEG_MSB, 0x00]
+)
+I2C_READ_BYTE_ACK = I2C_READ_BYTE_HEAD + bytes([0x00, MPSSE_SET_BITS_LOW, PIN_SDA_OUT, DIR_SDA_OUT])
+I2C_READ_BYTE_NACK = I2C_READ_BYTE_HEAD + bytes([0x80, MPSSE_SET_BITS_LOW, PIN_SDA_OUT, DIR_SDA_OUT])
+
+#largest unit (STOP) + SEND_IMMEDIATE must fit in one block
+MIN_BLOCK_SIZE = max(len(I2C_START), len(I2C_STOP), len(I2C_READ_BYTE_ACK)) + 1
+
+
+def build_write_bytes(cmd, data):
+    for value in data:
+        cmd += I2C_WRITE_BYTE_HEAD
+        cmd.append(value)
+        cmd += I2C_WRITE_BYTE_TAIL
+    return
+
+
+def build_transaction(chip_addr, txn):
+    #txn -> (MPSSE command bytes, num response byte, num ack byte)
+    rw, addr1, addr2, data = txn
+    cmd = bytearray(I2C_START)
+    if rw == "w":
+        build_write_bytes(cmd, [chip_addr << 1, addr1, addr2] + list(data))
+        cmd += I2C_STOP
+        return cmd, 3 + len(data), 3 + len(data)
+    cmd_addr = [chip_addr << 1, addr1, addr2]
+    build_write_bytes(cmd, cmd_addr)
+    cmd += I2C_START
+    build_write_bytes(cmd, [(chip_addr << 1) | 1])
+    cmd += I2C_READ_BYTE_ACK * (data - 1)
+    cmd += I2C_READ_BYTE_NACK
+    cmd += I2C_STOP
+    return cmd, 4 + data, 4
+
+
+def build_units(chip_addr, txn):
+    #same command as build_transaction, cut into unit per bus byte/START/STOP
+    #-> [(MPSSE command bytes, num response byte), ...], a block may end after any unit
+    rw, addr1, addr2, data = txn
+    if rw == "w":
+        out_bytes = [chip_addr << 1, addr1, addr2] + list(data)
+    else:
+        out_bytes = [chip_addr << 1, addr1, addr2]
+    units = [(I2C_START, 0)]
+    units += [(I2C_WRITE_BYTE_HEAD + bytes([value]) + I2C_WRITE_BYTE_TAIL, 1) for value in out_bytes]
+    if rw == "r":
+        units.append((I2C_START, 0))
+        units.append((I2C_WRITE_BYTE_HEAD + bytes([(chip_addr << 1) | 1]) + I2C_WRITE_BYTE_TAIL, 1))
+        units += [(I2C_READ_BYTE_ACK, 1)] * (data - 1)
+        units.append((I2C_READ_BYTE_NACK, 1))
+    units.append((I2C_STOP, 0))
+    return units
+
+
+class Ftd2xxPort:
+    #raw USB access to an opened FTDI handle by ftd2xx FT_Write/FT_Read
+    def __init__(self, ftd2xx_lib, handle, read_retry=1000):
+        self.ftd2xx = ftd2xx_lib
+        self.handle = handle
+        self.read_retry = read_retry
+        self.num_done = ctypes.c_uint32()
+        self.num_done_ref = ctypes.byref(self.num_done)
+
+    def write(self, data):
+        buf = (ctypes.c_uint8 * len(data)).from_buffer_copy(data)
+        status = self.ftd2xx.FT_Write(self.handle, buf, len(data), self.num_done_ref)
+        if status != 0 or self.num_done.value != len(data):
+            raise RuntimeError(f"FAIL FT_Write: status={status}, {self.num_done.value}/{len(data)}")
+        return
+
+    def read(self, num):
+        buf = (ctypes.c_uint8 * num)()
+        got = 0
+        for i in range(self.read_retry):
+            status = self.ftd2xx.FT_Read(self.handle, ctypes.byref(buf, got), num - got, self.num_done_ref)
+            if status != 0:
+                raise RuntimeError(f"FAIL FT_Read: status={status}")
+            got += self.num_done.value
+            if got == num:
+                return bytes(buf)
+        raise RuntimeError(f"FAIL FT_Read: timeout, {got}/{num}")
+
+
+class MpsseQueue:
+    def __init__(self, port, chip_addr=0x58, block_size=DEFAULT_BLOCK_SIZE):
+        #port->write(bytes), read(num)->bytes; Ftd2xxPort or MpsseSim
+        if block_size < MIN_BLOCK_SIZE:
+            raise ValueError(f"MPSSE block size {block_size} < {MIN_BLOCK_SIZE}")
+        self.port = port
+        self.chip_addr = chip_addr
+        self.block_size = block_size
+        #statistic
+        self.num_transactions = 0
+        self.num_blocks = 0
+
+    def run(self, transactions):
+        #run all transaction, return read data list per "r" transaction
+        #one block = one FT_Write + one FT_Read, command and response <= block_size
+        block_size = self.block_size
+        cmd_limit = block_size - 1      #SEND_IMMEDIATE at the end
+        results = []
+        pending = []            #(txn index, rw, num ack, num response), response not parsed yet
+        resp = bytearray()      #response of pending transaction
+        block = bytearray()
+        block_resp = 0
+        for index, txn in enumerate(transactions):
+            cmd, num_resp, num_ack = build_transaction(self.chip_addr, txn)
+            if len(cmd) <= cmd_limit and num_resp <= block_size:
+                if block and (len(block) + len(cmd) > cmd_limit or block_resp + num_resp > block_size):
+                    self.run_block(block, block_resp, pending, resp, results)
+                    block = bytearray()
+                    block_resp = 0
+                pending.append((index, txn[0], num_ack, num_resp))
+                block += cmd
+                block_resp += num_resp
+                continue
+            #too big for one block, cut at bus byte boundary
+            pending.append((index, txn[0], num_ack, num_resp))
+            for unit_cmd, unit_resp in build_units(self.chip_addr, txn):
+                if len(block) + len(unit_cmd) > cmd_limit or block_resp + unit_resp > block_size:
+                    self.run_block(block, block_resp, pending, resp, results)
+                    block = bytearray()
+                    block_resp = 0
+                block += unit_cmd
+                block_resp += unit_resp
+        if block:
+            self.run_block(block, block_resp, pending, resp, results)
+        return results
+
+    def run_block(self, block, block_resp, pending, resp, results):
+        #send one block, parse every pending transaction with full response
+        #transaction cut by block -> stay in pending, rest of response in next block
+        block.append(MPSSE_SEND_IMMEDIATE)
+        self.port.write(bytes(block))
+        resp += self.port.read(block_resp)
+        self.num_blocks += 1
+        pos = 0
+        num_done = 0
+        for index, rw, num_ack, num_resp in pending:
+            if pos + num_resp > len(resp):
+                break
+            for i in range(num_ack):
+                #ACK bit clock in at bit0, 0->ACK
+                if resp[pos + i] & 0x01:
+                    raise I2CBusError(f"FAIL MPSSE queue: NACK at transaction {index}, byte {i}")
+            if rw == "r":
+                results.append(list(resp[pos + num_ack:pos + num_resp]))
+            pos += num_resp
+            num_done += 1
+        self.num_transactions += num_done
+        del pending[:num_done]
+        del resp[:pos]
+        return
+
+    def transactions_per_block(self):
+        if self.num_blocks == 0:
+            return 0.0
+        return self.num_transactions / self.num_blocks
@@ -0,0 +1,162 @@
+#########################FTDI MPSSE software stub python3#####################
+#   stand-in for FTDI USB + MPSSE engine + gscoolink i2c slave
+#   no hardware, for MpsseQueue test and USB transfer count
+#
+#   write(bytes) -> run MPSSE command, count one USB write
+#   read(num)    -> response byte, count one USB read
+#
+#   i2c slave: 8bit addr1 + 8bit addr2 reg pointer, auto increase
+#   master NACK after read byte -> slave stop sending
+#   byte/bit out while SDA direction is input -> ValueError, never reach bus
+#
+#########################FTDI MPSSE software stub python3#####################
+
+from .mpsse_queue import (
+    MPSSE_BITS_IN_POS_MSB,
+    MPSSE_BITS_OUT_NEG_MSB,
+    MPSSE_BYTES_IN_POS_MSB,
+    MPSSE_BYTES_OUT_NEG_MSB,
+    MPSSE_SEND_IMMEDIATE,
+    MPSSE_SET_BITS_LOW,
+    PIN_SCL,
+    PIN_SDA_OUT,
+)
+
+#MPSSE setup opcode, no i2c effect, num param byte
+MPSSE_SETUP_OPCODE = {
+    0x82: 2,    #set bits high
+    0x84: 0,    #loopback on
+    0x85: 0,    #loopback off
+    0x86: 2,    #clock divisor
+    0x8A: 0,    #disable clk divide by 5
+    0x8B: 0,    #enable clk divide by 5
+    0x8C: 0,    #enable 3 phase clock
+    0x8D: 0,    #disable 3 phase clock
+    0x97: 0,    #disable adaptive clock
+    0x9E: 2,    #drive only zero
+}
+
+
+class MpsseSim:
+    def __init__(self, chip_addr=0x58, regs=None):
+        self.chip_addr = chip_addr
+        self.regs = regs if regs is not None else bytearray(0x10000)
+        #pin state
+        self.scl = 1
+        self.sda = 1
+        self.sda_out = True         #SDA driven by master
+        #i2c slave state
+        self.selected = False       #addressed after START
+        self.read_mode = False
+        self.byte_index = 0         #byte after START
+        self.reg_ptr = 0
+        self.last_ack = 1           #ACK of last byte clock in, 1->NACK
+        self.response = bytearray()
+        #statistic
+        self.usb_writes = 0
+        self.usb_reads = 0
+        self.num_start = 0
+
+    def set_pins(self, value, direction):
+        scl = value & PIN_SCL
+        #SDA released -> pull up
+        sda = 1 if not (direction & PIN_SDA_OUT) else (value & PIN_SDA_OUT) >> 1
+        if self.scl and scl:
+            if self.sda and not sda:
+                self.i2c_start()
+            elif not self.sda and sda:
+                self.i2c_stop()
+        self.scl = 1 if scl else 0
+        self.sda = sda
+        self.sda_out = bool(direction & PIN_SDA_OUT)
+
+    def i2c_start(self):
+        self.num_start += 1
+        self.selected = False
+        self.read_mode = False
+        self.byte_index = 0
+
+    def i2c_stop(self):
+        self.selected = False
+        self.byte_index = 0
+
+    def master_write_byte(self, value):
+        if self.byte_index == 0:
+            self.selected = (value >> 1) == self.chip_addr
+            self.read_mode = bool(value & 0x01)
+            self.last_ack = 0 if self.selected else 1
+        elif not self.selected or self.read_mode:
+            self.last_ack = 1
+        elif self.byte_index == 1:
+            self.reg_ptr = (value << 8) | (self.reg_ptr & 0xFF)
+            self.last_ack = 0
+        elif self.byte_index == 2:
+            self.reg_ptr = (self.reg_ptr & 0xFF00) | value
+            self.last_ack = 0
+        else:
+            self.regs[self.reg_ptr] = value
+            self.reg_ptr = (self.reg_ptr + 1) & 0xFFFF
+            self.last_ack = 0
+        self.byte_index += 1
+
+    def master_ack(self, value):
+        #ACK/NACK bit at bit7, NACK -> slave release SDA until next START
+        if value & 0x80:
+            self.read_mode = False
+            self.selected = False
+
+    def check_sda_out(self, opcode, pos):
+        if not self.sda_out:
+            raise ValueError(f"MpsseSim: opcode {opcode:#04x} at {pos} drive SDA while SDA is input")
+
+    def master_read_byte(self):
+        if not (self.selected and self.read_mode):
+            return 0xFF
+        value = self.regs[self.reg_ptr]
+        self.reg_ptr = (self.reg_ptr + 1) & 0xFFFF
+        return value
+
+    def write(self, data):
+        self.usb_writes += 1
+        pos = 0
+        num_data = len(data)
+        while pos < num_data:
+            opcode = data[pos]
+            if opcode == MPSSE_SET_BITS_LOW:
+                self.set_pins(data[pos + 1], data[pos + 2])
+                pos += 3
+            elif opcode == MPSSE_BYTES_OUT_NEG_MSB:
+                self.check_sda_out(opcode, pos)
+                num = (data[pos + 1] | (data[pos + 2] << 8)) + 1
+                for value in data[pos + 3:pos + 3 + num]:
+                    self.master_write_byte(value)
+                pos += 3 + num
+            elif opcode == MPSSE_BITS_OUT_NEG_MSB:
+                #master ACK/NACK after read byte
+                self.check_sda_out(opcode, pos)
+                self.master_ack(data[pos + 2])
+                pos += 3
+            elif opcode == MPSSE_BYTES_IN_POS_MSB:
+                num = (data[pos + 1] | (data[pos + 2] << 8)) + 1
+                for i in range(num):
+                    self.response.append(self.master_read_byte())
+                pos += 3
+            elif opcode == MPSSE_BITS_IN_POS_MSB:
+                #slave ACK bit of last written byte at bit0
+                self.response.append(self.last_ack)
+                pos += 2
+            elif opcode == MPSSE_SEND_IMMEDIATE:
+                pos += 1
+            elif opcode in MPSSE_SETUP_OPCODE:
+                pos += 1 + MPSSE_SETUP_OPCODE[opcode]
+            else:
+                raise ValueError(f"MpsseSim: unknown opcode {opcode:#04x} at {pos}")
+        return
+
+    def read(self, num):
+        self.usb_reads += 1
+        if num > len(self.response):
+            raise RuntimeError(f"MpsseSim: read {num}, only {len(self.response)} byte ready")
+        out = bytes(self.response[:num])
+        del self.response[:num]
+        return out
@@ -0,0 +1,154 @@
+#########################multi port runner python3#####################
+#   run same AVES func / reg sequence on many i2c port at the same time
+#   for two board sweep, one aves_script (or generated class) per port
+#
+#   one worker thread per port, all call of a port in its own thread
+#   -> FTDI handle / i2c fd never shared between thread
+#   bus wait (i2ctransfer fork, ioctl, ctypes) release GIL, port overlap
+#
+#   runner.run("func_01_01_Chip_Power_Up")          -> {port: PortResult}
+#   runner.run(lambda chip: chip.readReg(1, 2))
+#   runner.run([("writeReg", 1, 2, 3), ("readReg", 1, 2)])
+#   runner.compare(func) -> serial vs parallel wall clock, speedup
+#
+#########################multi port runner python3#####################
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+import traceback
+
+
+class PortResult:
+    def __init__(self, port, value=None, error=None, trace=None, elapsed=0.0):
+        self.port = port
+        self.value = value          #func return, list of return for reg sequence
+        self.error = error          #exception, None if pass
+        self.trace = trace          #traceback text of error
+        self.elapsed = elapsed      #second, in worker thread
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"PortResult(port={self.port}, {status}, elapsed={self.elapsed:.6f}s)"
+
+
+class MultiPortRunner:
+    def __init__(self, ports=(0, 1), script_class=None, chip_addr=0x58, **script_kwargs):
+        #script_class -> aves_script or generated script class, build per port
+        #script_kwargs -> pass to script_class, e.g. backend="pi_ioctl"
+        if script_class is None:
+            from .get_aves_def import aves_script
+            script_class = aves_script
+        self.ports = list(ports)
+        if len(set(self.ports)) != len(self.ports):
+            raise ValueError(f"MultiPortRunner: duplicate port in {self.ports}")
+        self.workers = {
+            port: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"i2c_port{port}")
+            for port in self.ports
+        }
+        #build script in its port thread
+        self.scripts = {}
+        results = self.submit_all(lambda port: script_class(i2c_port=port, chip_addr=chip_addr, **script_kwargs))
+        failed = {port: res.error for port, res in results.items() if not res.ok}
+        for port, res in results.items():
+            if res.ok:
+                self.scripts[port] = res.value
+        if failed:
+            self.close()
+            raise RuntimeError(f"MultiPortRunner: open port fail {failed}")
+        self.split_aves_path()
+
+    def split_aves_path(self):
+        #driver AVES path is per second timestamp, same for all port
+        #add port to name, no mixed record
+        for port, script in self.scripts.items():
+            drv = getattr(script, "drv", None)
+            if drv is not None and hasattr(drv, "write_to"):
+                root, ext = os.path.splitext(drv.write_to)
+                drv.write_to = f"{root}_port{port}{ext}"
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def close(self):
+        for port, script in self.scripts.items():
+            drv = getattr(script, "drv", None)
+            closer = getattr(drv, "close", None) or getattr(drv, "close_ftdi", None)
+            if closer is not None:
+                self.workers[port].submit(closer).result()
+        self.scripts = {}
+        for worker in self.workers.values():
+            worker.shutdown(wait=True)
+        return
+
+    def get_script(self, port):
+        return self.scripts[port]
+
+    ########run#######
+    def call_port(self, port, func, args, kwargs):
+        #run in port worker thread, never raise, error in PortResult
+        t0 = time.perf_counter()
+        try:
+            value = func(port, *args, **kwargs)
+        except Exception as error:
+            return PortResult(port, error=error, trace=traceback.format_exc(),
+                              elapsed=time.perf_counter() - t0)
+        return PortResult(port, value=value, elapsed=time.perf_counter() - t0)
+
+    def submit_all(self, func, *args, **kwargs):
+        futures = {
+            port: worker.submit(self.call_port, port, func, args, kwargs)
+            for port, worker in self.workers.items()
+        }
+        return {port: future.result() for port, future in futures.items()}
+
+    def get_port_func(self, func):
+        #str -> script method name
+        #list -> reg sequence [(method_name, *args), ...], return list of return
+        #callable -> func(script, *args, **kwargs)
+        if isinstance(func, str):
+            return lambda port, *args, **kwargs: getattr(self.scripts[port], func)(*args, **kwargs)
+        if isinstance(func, (list, tuple)):
+            seq = [(step[0], step[1:]) for step in func]
+            def run_seq(port):
+                script = self.scripts[port]
+                return [getattr(script, name)(*step_args) for name, step_args in seq]
+            return run_seq
+        return lambda port, *args, **kwargs: func(self.scripts[port], *args, **kwargs)
+
+    def run(self, func, *args, **kwargs):
+        #all port in parallel, wait all done
+        return self.submit_all(self.get_port_func(func), *args, **kwargs)
+
+    def run_serial(self, func, *args, **kwargs):
+        #port one after another, still in port thread, same as old sweep
+        port_func = self.get_port_func(func)
+        return {
+            port: worker.submit(self.call_port, port, port_func, args, kwargs).result()
+            for port, worker in self.workers.items()
+        }
+
+    def compare(self, func, *args, **kwargs):
+        #serial then parallel, wall clock
+        t0 = time.perf_counter()
+        serial = self.run_serial(func, *args, **kwargs)
+        t_serial = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        parallel = self.run(func, *args, **kwargs)
+        t_parallel = time.perf_counter() - t0
+        return {
+            "ports": self.ports,
+            "serial_s": t_serial,
+            "parallel_s": t_parallel,
+            "speedup": t_serial / t_parallel if t_parallel > 0 else 0.0,
+            "serial": serial,
+            "parallel": parallel,
+        }
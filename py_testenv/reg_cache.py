@@ -0,0 +1,91 @@
+#########################I2C shadow register cache python3#####################
+#   write-through shadow of chip register, opt-in
+#   key (chip_addr, addr1, addr2)
+#   writeReg -> update shadow after bus write ok, fail -> drop the reg
+#   readReg -> bus only if not cached or volatile
+#   writeBits use shadow as old value, no read-modify-write readback
+#
+#   volatile reg (status, calibration done, ...) never cached,
+#   hint from XMLParser.get_volatile_addrs()
+#
+#   one cache per i2c bus, two board sweep -> two cache
+#
+#########################I2C shadow register cache python3#####################
+
+
+class ShadowCache:
+    def __init__(self, volatile=()):
+        self.regs = {}                  #(chip_addr, addr1, addr2) -> value
+        self.volatile = set()           #16bit addr, addr1<<8 | addr2
+        self.add_volatile(volatile)
+
+    def add_volatile(self, addrs):
+        #addrs->16bit int or (addr1, addr2)
+        for addr in addrs:
+            if isinstance(addr, tuple):
+                addr = (addr[0] << 8) | addr[1]
+            self.volatile.add(addr)
+        #drop cached value of new volatile reg
+        for key in [k for k in self.regs if ((k[1] << 8) | k[2]) in self.volatile]:
+            del self.regs[key]
+        return
+
+    def is_volatile(self, addr1, addr2):
+        return ((addr1 << 8) | addr2) in self.volatile
+
+    def get(self, chip_addr, addr1, addr2):
+        #None -> must read from bus
+        return self.regs.get((chip_addr, addr1, addr2))
+
+    def put(self, chip_addr, addr1, addr2, value):
+        if ((addr1 << 8) | addr2) not in self.volatile:
+            self.regs[(chip_addr, addr1, addr2)] = value
+        return
+
+    def put_burst(self, chip_addr, addr1, addr2, values):
+        #burst from (addr1, addr2), cross page -> (addr1+1, 0x00)
+        addr = (addr1 << 8) | addr2
+        for i, value in enumerate(values):
+            self.put(chip_addr, (addr + i) >> 8, (addr + i) & 0xFF, value)
+        return
+
+    def drop_burst(self, chip_addr, addr1, addr2, num):
+        #forget num reg from (addr1, addr2), e.g. write may not reach chip
+        addr = (addr1 << 8) | addr2
+        regs = self.regs
+        for i in range(num):
+            regs.pop((chip_addr, ((addr + i) >> 8) & 0xFF, (addr + i) & 0xFF), None)
+        return
+
+    def invalidate(self, chip_addr=None, addr1=None, addr2=None):
+        #None -> match all
+        if chip_addr is None and addr1 is None and addr2 is None:
+            self.regs.clear()
+            return
+        for key in list(self.regs):
+            if (chip_addr is None or key[0] == chip_addr) and \
+               (addr1 is None or key[1] == addr1) and \
+               (addr2 is None or key[2] == addr2):
+                del self.regs[key]
+        return
+
+    def cached_runs(self, chip_addr):
+        #contiguous cached addr of one chip -> [(addr1, addr2, num), ...]
+        addrs = sorted((k[1] << 8) | k[2] for k in self.regs if k[0] == chip_addr)
+        runs = []
+        for addr in addrs:
+            if runs:
+                run_addr1, run_addr2, num = runs[-1]
+                if addr == (run_addr1 << 8) + run_addr2 + num and (addr & 0xFF) != 0:
+                    runs[-1] = (run_addr1, run_addr2, num + 1)
+                    continue
+            runs.append((addr >> 8, addr & 0xFF, 1))
+        return runs
+
+    def sync(self, chip_addr, read_regs):
+        #re-read every cached reg from chip, read_regs(addr1, addr2, num)->list
+        for addr1, addr2, num in self.cached_runs(chip_addr):
+            read_list = read_regs(addr1, addr2, num)
+            for i, value in enumerate(read_list):
+                self.put(chip_addr, addr1, addr2 + i, value)
+        return
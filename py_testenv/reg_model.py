@@ -0,0 +1,197 @@
+"""
+reg_model.py
+--------------------------------------
+寄存器模型: 同一XML只解析一次, AutoPyScript与GetAVES共用。
+
+所有数据首次访问时才构建, 之后缓存:
+- parser:         XMLParser (磁盘缓存命中时不解析XML)
+- dev_addr_dict:  页名 -> 页地址
+- json_data:      页名 -> 字段字节配置列表
+- unique_data:    每页按register_name去重
+- page_name_dict: 页名 -> register_name列表
+- page_reg_map:   页名 -> register_name -> (FieldDesc, ...) 预编译字段描述
+
+用法示例：
+    from py_testenv import RegisterModel, AutoPyScript, GetAVES
+    model = RegisterModel('your.xml')
+    autopy = AutoPyScript('your.xml', 'your_aves.txt', model=model)
+    aves = GetAVES('your.xml', 'your_aves.txt', model=model)
+
+--------------------------------------
+"""
+
+from typing import NamedTuple
+
+from .field_record import FieldRecord
+from .xml_parser import XMLParser
+
+
+def mask_to_lsb_bits(mask: int) -> tuple:
+    """
+    掩码 -> (LSB位置, 从LSB起连续1的位数), 0 -> (0, 0)
+    例: 0xF0 -> (4, 4), 0b11000000 -> (6, 2)
+    """
+    if mask == 0:
+        return (0, 0)
+    lsb = (mask & -mask).bit_length() - 1
+    shifted = mask >> lsb
+    bits = 0
+    while (shifted & 1):
+        bits += 1
+        shifted >>= 1
+    return (lsb, bits)
+
+
+class FieldDesc(NamedTuple):
+    """
+    一个field在一个字节上的预编译描述, 每个模型只构建一次, 不可变
+    AutoPyScript改写脚本时只做查表+字符串格式化
+    mask/shift缺失(XML未给出)时对应值为None, 用到时报错
+    """
+    page: int               # addr1
+    offset: int             # addr2
+    mask: int
+    lsb: int                # mask最低置1位
+    width: int              # 从lsb起连续1的位数
+    shift: int
+    order: int              # 该寄存器字节配置中的顺序, 同json_data
+    addr1_str: str          # "0x10"
+    addr2_str: str          # "0x20"
+    read_mask_str: str      # "" (0xFF) 或 "&0x0F"
+    read_shift_str: str     # "" / ">>4" / "<<8"
+    record: FieldRecord     # 原记录, 需要名称/默认值等文本信息时用
+
+    @classmethod
+    def from_record(cls, record, order=0):
+        addr = record.addr
+        mask = record.mask
+        shift = record.shift
+        lsb, width = mask_to_lsb_bits(mask) if mask is not None else (None, None)
+        byte_mask = record.byte_mask
+        if shift is None:
+            read_shift_str = None
+        elif shift == 0:
+            read_shift_str = ""
+        elif shift < 0:
+            read_shift_str = f"<<{-shift}"
+        else:
+            read_shift_str = f">>{shift}"
+        return cls(
+            page=(addr >> 8) & 0xFF,
+            offset=addr & 0xFF,
+            mask=mask,
+            lsb=lsb,
+            width=width,
+            shift=shift,
+            order=order,
+            addr1_str=f"0x{(addr >> 8) & 0xFF:02X}",
+            addr2_str=f"0x{addr & 0xFF:02X}",
+            read_mask_str="" if byte_mask == "0xFF" else f"&{byte_mask}",
+            read_shift_str=read_shift_str,
+            record=record,
+        )
+
+
+class RegisterModel:
+
+    def __init__(self, xml_file_path: str, stream: bool = False, cache=None):
+        """
+        :param xml_file_path: XML文件路径
+        :param stream/cache: 传给XMLParser, 见xml_parser.py
+        """
+        self.xml_file_path = xml_file_path
+        self.stream = stream
+        self.cache = cache
+        # 首次访问时构建
+        self._parser = None
+        self._dev_addr_dict = None
+        self._json_data = None
+        self._unique_data = None
+        self._page_name_dict = None
+        self._page_reg_map = None
+
+    @property
+    def parser(self) -> XMLParser:
+        if self._parser is None:
+            self._parser = XMLParser(self.xml_file_path, stream=self.stream, cache=self.cache)
+        return self._parser
+
+    @property
+    def dev_addr_dict(self) -> dict:
+        if self._dev_addr_dict is None:
+            parser = self.parser
+            # xml_to_json已顺带生成则直接用
+            if not parser.dev_addr_dict:
+                parser.parse_to_dict()
+            self._dev_addr_dict = parser.dev_addr_dict
+        return self._dev_addr_dict
+
+    @property
+    def json_data(self) -> dict:
+        if self._json_data is None:
+            self.parser.xml_to_json()
+            self._json_data = self.parser.json_data
+        return self._json_data
+
+    @property
+    def unique_data(self) -> dict:
+        """
+        在每个PAGE下去除重复的register_name
+        """
+        if self._unique_data is None:
+            self._unique_data = self._build_unique_data()
+        return self._unique_data
+
+    def _build_unique_data(self) -> dict:
+        unique_data = {}
+        for key, registers in self.json_data.items():
+            seen_fields = set()
+            unique_registers = []
+            for register in registers:
+                field_name = register.get("register_name")
+                if field_name and field_name not in seen_fields:
+                    unique_registers.append(register)
+                    seen_fields.add(field_name)
+            unique_data[key] = unique_registers
+        return unique_data
+
+    @property
+    def page_name_dict(self) -> dict:
+        """
+        从unique_data生成一个只包含PAGE name和register_name的字典。
+        """
+        if self._page_name_dict is None:
+            self._page_name_dict = self._build_page_name_dict()
+        return self._page_name_dict
+
+    def _build_page_name_dict(self) -> dict:
+        page_name_dict = {}
+        for key, registers in self.unique_data.items():
+            page_name_dict[key] = [
+                reg.get("register_name")
+                for reg in registers
+                if reg.get("register_name")
+            ]
+        return page_name_dict
+
+    @property
+    def page_reg_map(self) -> dict:
+        """
+        构建两级哈希表：PAGE -> register_name -> (FieldDesc, ...)，支持O(1)查找。
+        字节配置顺序同json_data, 地址/掩码/移位等全部预先算好
+        """
+        if self._page_reg_map is None:
+            self._page_reg_map = self._build_page_reg_map()
+        return self._page_reg_map
+
+    def _build_page_reg_map(self) -> dict:
+        page_reg_map = {}
+        for page, registers in self.json_data.items():
+            reg_lists = page_reg_map.setdefault(page, {})
+            for reg in registers:
+                reg_name = reg.register_name
+                if reg_name:
+                    reg_lists.setdefault(reg_name, []).append(reg)
+            for reg_name, regs in reg_lists.items():
+                reg_lists[reg_name] = tuple(FieldDesc.from_record(reg, order) for order, reg in enumerate(regs))
+        return page_reg_map
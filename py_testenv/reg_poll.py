@@ -0,0 +1,139 @@
+#########################register poll python3#####################
+#   wait until status bits reach expected value, e.g. PLL lock, cal done
+#   replace readBits + time.sleep loop in script
+#
+#   condition: (addr1, addr2, lsb, bits, expected), bits = width like readBits
+#   each round: one readRegs per run of near address, cover all condition
+#   interval: first check at once, then min_interval * backoff^n, cap
+#   max_interval, never sleep past timeout
+#
+#   return WaitResult(ok, elapsed, rounds, values), bool(result) = ok
+#   raise_on_timeout=True -> WaitTimeout (TimeoutError) instead
+#
+#########################register poll python3#####################
+
+import asyncio
+import time
+
+DEFAULT_MIN_INTERVAL = 1e-4     #second
+DEFAULT_MAX_INTERVAL = 0.02
+DEFAULT_BACKOFF = 2.0
+MAX_RUN_GAP = 16                #merge address closer than this into one burst
+
+
+class WaitResult:
+    def __init__(self, ok, elapsed, rounds, values):
+        self.ok = ok
+        self.elapsed = elapsed      #second
+        self.rounds = rounds        #poll round = burst read set
+        self.values = values        #last field value per condition
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return f"WaitResult(ok={self.ok}, elapsed={self.elapsed:.6f}s, rounds={self.rounds}, values={self.values})"
+
+
+class WaitTimeout(TimeoutError):
+    def __init__(self, conditions, result):
+        self.conditions = conditions
+        self.result = result
+        pending = [f"{addr1:#04x}{addr2:02x}[{lsb + bits - 1}:{lsb}]={value}!={expected}"
+                   for (addr1, addr2, lsb, bits, expected), value in zip(conditions, result.values)
+                   if value != expected]
+        super().__init__(f"wait timeout after {result.elapsed:.3f}s, {result.rounds} round: {', '.join(pending)}")
+
+
+class PollPlan:
+    #precompute burst run and per condition (run index, offset, lsb, field mask)
+    def __init__(self, conditions, mode="all"):
+        if mode not in ("all", "any"):
+            raise ValueError(f"wait mode {mode}, use all/any")
+        self.conditions = [tuple(cond) for cond in conditions]
+        self.mode = mode
+        addrs = sorted({(addr1 << 8) | addr2 for addr1, addr2, lsb, bits, expected in self.conditions})
+        runs = []                   #[start, num]
+        for addr in addrs:
+            if runs and addr - (runs[-1][0] + runs[-1][1] - 1) <= MAX_RUN_GAP:
+                runs[-1][1] = addr - runs[-1][0] + 1
+            else:
+                runs.append([addr, 1])
+        self.runs = [(start >> 8, start & 0xFF, num) for start, num in runs]
+        self.checks = []
+        for addr1, addr2, lsb, bits, expected in self.conditions:
+            addr = (addr1 << 8) | addr2
+            for index, (start, num) in enumerate(runs):
+                if start <= addr < start + num:
+                    self.checks.append((index, addr - start, lsb, (1 << bits) - 1, expected))
+                    break
+
+    def check(self, run_data):
+        #run_data -> burst list per run, return (done, values)
+        values = [(run_data[index][offset] >> lsb) & mask for index, offset, lsb, mask, expected in self.checks]
+        hits = [value == check[4] for value, check in zip(values, self.checks)]
+        done = all(hits) if self.mode == "all" else any(hits)
+        return done, values
+
+
+def get_intervals(min_interval, max_interval, backoff):
+    interval = min_interval
+    while 1:
+        yield interval
+        interval = min(interval * backoff, max_interval)
+
+
+def wait_conditions(
+    read_regs,
+    conditions,
+    timeout=1.0,
+    mode="all",
+    min_interval=DEFAULT_MIN_INTERVAL,
+    max_interval=DEFAULT_MAX_INTERVAL,
+    backoff=DEFAULT_BACKOFF,
+    raise_on_timeout=False,
+    ):
+    #read_regs(addr1, addr2, num)->list, driver burst read
+    plan = PollPlan(conditions, mode)
+    intervals = get_intervals(min_interval, max_interval, backoff)
+    t_start = time.perf_counter()
+    rounds = 0
+    while 1:
+        done, values = plan.check([read_regs(addr1, addr2, num) for addr1, addr2, num in plan.runs])
+        rounds += 1
+        elapsed = time.perf_counter() - t_start
+        if done or elapsed >= timeout:
+            break
+        time.sleep(min(next(intervals), timeout - elapsed))
+    result = WaitResult(done, elapsed, rounds, values)
+    if not done and raise_on_timeout:
+        raise WaitTimeout(plan.conditions, result)
+    return result
+
+
+async def wait_conditions_async(
+    read_regs,
+    conditions,
+    timeout=1.0,
+    mode="all",
+    min_interval=DEFAULT_MIN_INTERVAL,
+    max_interval=DEFAULT_MAX_INTERVAL,
+    backoff=DEFAULT_BACKOFF,
+    raise_on_timeout=False,
+    ):
+    #same as wait_conditions, read_regs is coroutine function, asyncio.sleep wait
+    plan = PollPlan(conditions, mode)
+    intervals = get_intervals(min_interval, max_interval, backoff)
+    t_start = time.perf_counter()
+    rounds = 0
+    while 1:
+        done, values = plan.check([await read_regs(addr1, addr2, num) for addr1, addr2, num in plan.runs])
+        rounds += 1
+        elapsed = time.perf_counter() - t_start
+        if done or elapsed >= timeout:
+            break
+        await asyncio.sleep(min(next(intervals), timeout - elapsed))
+    result = WaitResult(done, elapsed, rounds, values)
+    if not done and raise_on_timeout:
+        raise WaitTimeout(plan.conditions, result)
+    return result
@@ -0,0 +1,234 @@
+#########################register snapshot python3#####################
+#   full-chip register dump to compact binary, diff at byte/field level
+#
+#   RegSnapshot: 64K byte image + 1 bit per byte valid bitmap
+#   capture: burst readRegs per page, page list from XMLParser.dev_addr_dict
+#   file: only valid page stored, page = 32 byte bitmap + 256 byte data
+#
+#   FieldMap: field -> ((byte addr, mask, shift), ...) from XML json_data
+#   shift>0: byte_bits = (field << shift) & mask -> field |= (byte & mask) >> shift
+#   shift<0: byte_bits = (field >> -shift) & mask -> field |= (byte & mask) << -shift
+#
+#   diff: whole page compare first (C speed), byte/field work only on
+#   changed page, so 1000 snapshot load + diff in a sweep is cheap
+#
+#   snap = RegSnapshot.capture(drv.readRegs, field_map.pages)
+#   snap.save("run_001.snap")
+#   snap.diff_fields(RegSnapshot.from_defaults(field_map), field_map)
+#
+#########################register snapshot python3#####################
+
+from collections import defaultdict
+import json
+import struct
+import time
+
+from .i2c_util import PAGE_SIZE
+
+SNAP_MAGIC = b"PYTSNAP1"
+NUM_PAGES = 0x100
+BITMAP_PAGE_SIZE = PAGE_SIZE // 8      #32 byte valid bitmap per page
+FULL_PAGE_BITMAP = b"\xff" * BITMAP_PAGE_SIZE
+DIFF_BLOCK_SIZE = 0x1000
+
+
+class FieldMap:
+    def __init__(self, fields):
+        #fields -> [(register_name, field_name, ((addr16, mask, shift), ...), default or None), ...]
+        self.fields = fields
+        self.addr_fields = defaultdict(list)     #addr16 -> field index
+        for index, (reg_name, field_name, byte_cfgs, default) in enumerate(fields):
+            for addr, mask, shift in byte_cfgs:
+                self.addr_fields[addr].append(index)
+        self.pages = sorted({addr >> 8 for addr in self.addr_fields})
+
+    @classmethod
+    def from_parser(cls, parser):
+        #parser -> XMLParser, json_data built if not yet
+        if not parser.json_data:
+            parser.xml_to_json()
+        grouped = {}
+        for registers in parser.json_data.values():
+            for reg in registers:
+                #FieldRecord integer addr/mask/shift, None if not in XML
+                if reg.addr is None or reg.mask is None:
+                    continue
+                #same caption/name may repeat on each page, base address keep it unique
+                key = (reg.register_name, reg.field_name, reg.base_address)
+                entry = grouped.get(key)
+                if entry is None:
+                    default = None
+                    try:
+                        default = parser._parse_int(reg.default_value or "")
+                    except ValueError:
+                        pass
+                    entry = grouped[key] = [[], default]
+                entry[0].append((reg.addr, reg.mask, reg.shift or 0))
+        fields = [(reg_name, field_name, tuple(byte_cfgs), default)
+                  for (reg_name, field_name, base_addr), (byte_cfgs, default) in grouped.items()]
+        return cls(fields)
+
+    @classmethod
+    def from_xml(cls, xml_file_path):
+        from .xml_parser import XMLParser
+        return cls.from_parser(XMLParser(xml_file_path))
+
+    def field_value(self, image, index):
+        value = 0
+        for addr, mask, shift in self.fields[index][2]:
+            byte_bits = image[addr] & mask
+            value |= byte_bits >> shift if shift >= 0 else byte_bits << -shift
+        return value
+
+
+class RegSnapshot:
+    def __init__(self, chip_addr=0x58, label="", timestamp=None):
+        self.chip_addr = chip_addr
+        self.label = label
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.image = bytearray(0x10000)
+        self.valid = bytearray(0x10000 // 8)
+
+    ########fill#######
+    def set_range(self, addr1, addr2, data_list):
+        #burst data from (addr1, addr2), cross page -> (addr1+1, 0x00)
+        addr = (addr1 << 8) | addr2
+        num = len(data_list)
+        self.image[addr:addr + num] = bytes(data_list)
+        valid = self.valid
+        if addr2 == 0 and num == PAGE_SIZE:
+            valid[addr1 * BITMAP_PAGE_SIZE:(addr1 + 1) * BITMAP_PAGE_SIZE] = FULL_PAGE_BITMAP
+            return
+        for i in range(addr, addr + num):
+            valid[i >> 3] |= 1 << (i & 7)
+        return
+
+    def is_valid(self, addr):
+        return bool(self.valid[addr >> 3] & (1 << (addr & 7)))
+
+    def get(self, addr1, addr2):
+        #None if not captured
+        addr = (addr1 << 8) | addr2
+        return self.image[addr] if self.is_valid(addr) else None
+
+    def get_pages(self):
+        #page with any valid byte
+        valid = self.valid
+        empty = bytes(BITMAP_PAGE_SIZE)
+        return [page for page in range(NUM_PAGES)
+                if valid[page * BITMAP_PAGE_SIZE:(page + 1) * BITMAP_PAGE_SIZE] != empty]
+
+    @classmethod
+    def capture(cls, read_regs, pages, chip_addr=0x58, label=""):
+        #read_regs(addr1, addr2, num)->list, driver burst read
+        #pages -> [addr1, ...] or XMLParser.dev_addr_dict
+        if isinstance(pages, dict):
+            pages = [int(page_addr, 16) for page_addr in pages.values()]
+        snap = cls(chip_addr, label)
+        for page in sorted(set(pages)):
+            snap.set_range(page, 0x00, read_regs(page, 0x00, PAGE_SIZE))
+        return snap
+
+    @classmethod
+    def from_defaults(cls, defaults, chip_addr=0x58, label="xml_default"):
+        #defaults -> FieldMap (field default, only field byte valid)
+        #or {addr16: value}, XMLParser.get_reg_defaults()
+        snap = cls(chip_addr, label, timestamp=0.0)
+        if isinstance(defaults, FieldMap):
+            image = snap.image
+            for reg_name, field_name, byte_cfgs, default in defaults.fields:
+                for addr, mask, shift in byte_cfgs:
+                    if default is not None:
+                        byte_bits = (default << shift) & mask if shift >= 0 else (default >> -shift) & mask
+                        image[addr] = (image[addr] & ~mask & 0xFF) | byte_bits
+                    snap.valid[addr >> 3] |= 1 << (addr & 7)
+        else:
+            for addr, value in defaults.items():
+                snap.set_range(addr >> 8, addr & 0xFF, [value])
+        return snap
+
+    ########file#######
+    def to_bytes(self):
+        header = json.dumps({"chip_addr": self.chip_addr, "label": self.label,
+                             "timestamp": self.timestamp}).encode("utf-8")
+        pages = self.get_pages()
+        out = [SNAP_MAGIC, struct.pack("<I", len(header)), header, struct.pack("<H", len(pages))]
+        for page in pages:
+            out.append(bytes((page,)))
+            out.append(self.valid[page * BITMAP_PAGE_SIZE:(page + 1) * BITMAP_PAGE_SIZE])
+            out.append(self.image[page << 8:(page + 1) << 8])
+        return b"".join(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:len(SNAP_MAGIC)] != SNAP_MAGIC:
+            raise ValueError("not a register snapshot, bad magic")
+        pos = len(SNAP_MAGIC)
+        (len_header,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        header = json.loads(data[pos:pos + len_header].decode("utf-8"))
+        pos += len_header
+        (num_pages,) = struct.unpack_from("<H", data, pos)
+        pos += 2
+        snap = cls(header["chip_addr"], header["label"], header["timestamp"])
+        for i in range(num_pages):
+            page = data[pos]
+            pos += 1
+            snap.valid[page * BITMAP_PAGE_SIZE:(page + 1) * BITMAP_PAGE_SIZE] = data[pos:pos + BITMAP_PAGE_SIZE]
+            pos += BITMAP_PAGE_SIZE
+            snap.image[page << 8:(page + 1) << 8] = data[pos:pos + PAGE_SIZE]
+            pos += PAGE_SIZE
+        return snap
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    ########diff#######
+    def diff_bytes(self, other):
+        #[(addr16, self value, other value)], byte valid in both only
+        out = []
+        image_a, image_b = self.image, other.image
+        if image_a == image_b:
+            return out
+        valid_a, valid_b = self.valid, other.valid
+        #4K block compare, skip 16 page at once
+        pages = []
+        for block in range(0, 0x10000, DIFF_BLOCK_SIZE):
+            if image_a[block:block + DIFF_BLOCK_SIZE] != image_b[block:block + DIFF_BLOCK_SIZE]:
+                pages.extend(range(block >> 8, (block + DIFF_BLOCK_SIZE) >> 8))
+        for page in pages:
+            lo = page << 8
+            page_a = image_a[lo:lo + PAGE_SIZE]
+            page_b = image_b[lo:lo + PAGE_SIZE]
+            if page_a == page_b:
+                continue
+            for offset, (value_a, value_b) in enumerate(zip(page_a, page_b)):
+                if value_a != value_b:
+                    addr = lo + offset
+                    if valid_a[addr >> 3] & valid_b[addr >> 3] & (1 << (addr & 7)):
+                        out.append((addr, value_a, value_b))
+        return out
+
+    def diff_fields(self, other, field_map):
+        #[(register_name, field_name, self value, other value)], field order
+        #only field touching a changed byte, and all its byte valid in both
+        touched = set()
+        for addr, value_a, value_b in self.diff_bytes(other):
+            touched.update(field_map.addr_fields.get(addr, ()))
+        out = []
+        for index in sorted(touched):
+            reg_name, field_name, byte_cfgs, default = field_map.fields[index]
+            if not all(self.is_valid(addr) and other.is_valid(addr) for addr, mask, shift in byte_cfgs):
+                continue
+            value_a = field_map.field_value(self.image, index)
+            value_b = field_map.field_value(other.image, index)
+            if value_a != value_b:
+                out.append((reg_name, field_name, value_a, value_b))
+        return out
@@ -0,0 +1,57 @@
+#########################I2C register transaction python3#####################
+#   with chip.transaction(): ...
+#   collect writeBits/writeReg as masked update per byte address
+#   commit: per touched byte one read (none if full byte or shadow hit)
+#           + write in address order, contiguous byte -> one burst write
+#
+#########################I2C register transaction python3#####################
+
+
+class RegTransaction:
+    def __init__(self):
+        self.pending = {}       #(addr1, addr2) -> [mask, value]
+
+    def write_bits(self, addr1, addr2, lsb, bits, invalue):
+        #same result as driver writeBits: new = (old & ~mask) | (invalue << lsb)
+        mask = (((1 << bits) - 1) << lsb) & 0xFF
+        value = (invalue << lsb) & 0xFF
+        entry = self.pending.get((addr1, addr2))
+        if entry is None:
+            #bits of value outside mask are also forced to 1, so known
+            self.pending[(addr1, addr2)] = [mask | value, value]
+        else:
+            entry[1] = (entry[1] & ~mask & 0xFF) | value
+            entry[0] |= mask | value
+        return
+
+    def write_reg(self, addr1, addr2, value):
+        self.pending[(addr1, addr2)] = [0xFF, value]
+        return
+
+    def write_regs(self, addr1, addr2, data_list):
+        #burst write in transaction, cross page -> (addr1+1, 0x00)
+        addr = (addr1 << 8) | addr2
+        for i, value in enumerate(data_list):
+            self.pending[((addr + i) >> 8, (addr + i) & 0xFF)] = [0xFF, value]
+        return
+
+    def commit(self, read_reg, write_reg, write_regs):
+        #read_reg(addr1, addr2)->int, shadow aware
+        #write_reg(addr1, addr2, value), write_regs(addr1, addr2, data_list)
+        pending = self.pending
+        self.pending = {}
+        runs = []           #[addr1, addr2_start, [data...]]
+        for addr1, addr2 in sorted(pending):
+            mask, value = pending[(addr1, addr2)]
+            if mask != 0xFF:
+                value = (read_reg(addr1, addr2) & ~mask & 0xFF) | value
+            if runs and runs[-1][0] == addr1 and runs[-1][1] + len(runs[-1][2]) == addr2:
+                runs[-1][2].append(value)
+            else:
+                runs.append([addr1, addr2, [value]])
+        for addr1, addr2, data_list in runs:
+            if len(data_list) == 1:
+                write_reg(addr1, addr2, data_list[0])
+            else:
+                write_regs(addr1, addr2, data_list)
+        return
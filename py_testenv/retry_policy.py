@@ -0,0 +1,110 @@
+#########################I2C retry policy python3#####################
+#   bounded retry for DrvPI/DrvFTDI/DrvSim bus error
+#   replace old "wait 1s, continue" forever loop
+#
+#   first try always direct in driver, policy only run after an error
+#   retry 1..fast_retries   -> no wait, NACK often pass right away
+#   then                    -> base_delay * backoff^n, cap max_delay
+#   give up when attempt >= max_attempts or next wait pass deadline
+#   -> raise I2CRetryError (RuntimeError), last error inside
+#
+#   RetryPolicy(max_attempts=None, deadline=None, fast_retries=0,
+#               base_delay=1.0, backoff=1.0) -> old forever 1s loop
+#
+#########################I2C retry policy python3#####################
+
+import asyncio
+import time
+
+
+class I2CBusError(RuntimeError):
+    #one failed bus transfer, raise by driver single attempt
+    pass
+
+
+class I2CRetryError(I2CBusError):
+    #all retry used up
+    def __init__(self, op_name, addr, attempts, elapsed, last_error):
+        self.op_name = op_name
+        self.addr = addr                #(addr1, addr2) or None
+        self.attempts = attempts
+        self.elapsed = elapsed          #second since first error
+        self.last_error = last_error
+        addr_str = f"{addr[0]:#04x}{addr[1]:02x}" if addr else "-"
+        super().__init__(f"{op_name} fail at {addr_str} after {attempts} attempt, {elapsed:.3f}s: {last_error}")
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts=10,    #include the first try, None -> no limit
+        deadline=10.0,      #second since first error, None -> no limit
+        fast_retries=2,     #retry without wait
+        base_delay=1e-3,    #first backoff wait, second
+        backoff=2.0,
+        max_delay=1.0,
+        ):
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.fast_retries = fast_retries
+        self.base_delay = base_delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+
+    def get_delay(self, retry_index):
+        #retry_index 0 -> first retry
+        if retry_index < self.fast_retries:
+            return 0.0
+        return min(self.base_delay * self.backoff ** (retry_index - self.fast_retries), self.max_delay)
+
+    def next_delay(self, attempts, t_first_error, op_name, addr, error):
+        #wait before next attempt, raise I2CRetryError if no more
+        elapsed = time.monotonic() - t_first_error
+        if self.max_attempts is not None and attempts >= self.max_attempts:
+            raise I2CRetryError(op_name, addr, attempts, elapsed, error)
+        delay = self.get_delay(attempts - 1)
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            raise I2CRetryError(op_name, addr, attempts, elapsed, error)
+        return delay
+
+    def retry(self, attempt, args, op_name, addr, error, on_retry=None):
+        #first try already fail with error
+        #attempt(*args) -> value, raise I2CBusError if fail
+        #on_retry(op_name, addr, attempt_no, delay, error) before each retry
+        t_first_error = time.monotonic()
+        attempts = 1
+        while 1:
+            delay = self.next_delay(attempts, t_first_error, op_name, addr, error)
+            if on_retry is not None:
+                on_retry(op_name, addr, attempts, delay, error)
+            if delay:
+                time.sleep(delay)
+            attempts += 1
+            try:
+                return attempt(*args)
+            except I2CBusError as error_bus:
+                error = error_bus
+
+    async def retry_async(self, attempt, args, op_name, addr, error, on_retry=None):
+        #same as retry(), attempt is coroutine function, asyncio.sleep wait
+        t_first_error = time.monotonic()
+        attempts = 1
+        while 1:
+            delay = self.next_delay(attempts, t_first_error, op_name, addr, error)
+            if on_retry is not None:
+                on_retry(op_name, addr, attempts, delay, error)
+            if delay:
+                await asyncio.sleep(delay)
+            attempts += 1
+            try:
+                return await attempt(*args)
+            except I2CBusError as error_bus:
+                error = error_bus
+
+
+def msgs_addr(msgs):
+    #first reg addr of a msg list, for per address retry count
+    for rw, data in msgs:
+        if rw == "w" and len(data) >= 2:
+            return (data[0], data[1])
+    return None
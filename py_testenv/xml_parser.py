@@ -19,6 +19,13 @@ XMLParser
     parser.xml_to_json()
     parser.write_json_file()
 
+    # 超大XML(数百MB): 流式iterparse, 不保留整棵树, 结果相同
+    parser = XMLParser('your.xml', stream=True)
+
+    # 可选: 解析结果磁盘缓存, XML内容不变时不再解析, 见model_cache.py
+    parser = XMLParser('your.xml', cache=True)    # 缓存到用户缓存目录
+    parser = XMLParser('your.xml', cache="xml")   # 缓存放在XML旁边
+
 作者：yfzhao
 
 --------------------------------------
@@ -29,11 +36,24 @@ import json
 import os
 import re
 from collections import defaultdict
+from copy import copy
 
 #build EXCEL file need 
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
+
+from .field_record import FIELD_RECORD_KEYS, FieldRecord, intern_str, record_to_dict
+from .model_cache import file_digest, get_cache_path, load_model, save_model
+
+# 解析结果格式版本, 字段表/json_data结构变化时加1, 旧缓存自动失效
+PARSER_VERSION = 3
+
+# 预编译正则, 字段表单次遍历中复用
+BASE_ADDR_RE = re.compile(r"(0x[0-9A-Fa-f]+)")
+BIT_RANGE_RE = re.compile(r"\[(\d+):(\d+)\]")
+
 
 class XMLParser:
     """
@@ -42,16 +62,24 @@ class XMLParser:
     2. XML转Excel功能（原xml_to_excel.py）
     """
     
-    def __init__(self, xml_file_path: str):
+    def __init__(self, xml_file_path: str, stream: bool = False, cache=None):
         """
         初始化解析器
         :param xml_file_path: XML配置文件路径
+        :param stream: True -> iterparse流式解析, 不保留整棵树, 内存峰值有界
+                       首次parse_to_dict/get_field_records时一次遍历同时得到页表和字段表
+        :param cache: 解析结果磁盘缓存, 默认不缓存
+                      None -> 环境变量PY_TESTENV_XML_CACHE, 未设置则不缓存
+                      True -> 用户缓存目录, "xml" -> XML旁边, False/"off" -> 不缓存, 其他字符串 -> 缓存目录
+                      首次取数据时才加载/生成, XML内容hash与PARSER_VERSION一致时直接加载, 不用ElementTree
         """
         self.xml_file = xml_file_path
         self.dev_addr_dict = {}
-        self.tree = ET.parse(xml_file_path)
-        self.root = self.tree.getroot()
-        
+        self.stream = stream
+        self.stream_error = None
+        self.tree = None
+        self.root = None
+
         # 自动生成输出文件名
         base_name = os.path.splitext(os.path.basename(xml_file_path))[0]
         self.dict_output_file = f"{base_name}_dev_addr.dict"
@@ -61,13 +89,74 @@ class XMLParser:
 
         #json data init
         self.json_data = {}
-    
+        #字段表, 见get_field_records
+        self.field_records = None
+
+        # 磁盘缓存, 首次取数据时由_load_cache加载或生成
+        self.cache_path = get_cache_path(xml_file_path, cache)
+        self.cache_pending = bool(self.cache_path)
+        self.from_cache = False
+        self.cached_json = None     # 缓存中的json_data, 首次xml_to_json直接使用
+        if self.cache_pending:
+            return
+
+        if not stream:
+            self.tree = ET.parse(xml_file_path)
+            self.root = self.tree.getroot()
+
+    def _load_cache(self) -> None:
+        """首次取数据: 加载缓存, 未命中则解析XML生成完整模型并写缓存"""
+        self.cache_pending = False
+        self.cache_digest = file_digest(self.xml_file)
+        model = load_model(self.cache_path, self.cache_digest, PARSER_VERSION)
+        if model is not None:
+            self.from_cache = True
+            self.dev_addr_dict = model["dev_addr_dict"]
+            self.addr_to_key = model["addr_to_key"]
+            self.field_records = model["field_records"]
+            self.cached_json = model["json_data"]
+            return
+
+        if not self.stream:
+            self.tree = ET.parse(self.xml_file)
+            self.root = self.tree.getroot()
+        self._save_cache()
+
+    def _save_cache(self) -> None:
+        """冷启动: 生成完整模型并写缓存, XML结构有误时不缓存, 错误留给原接口报"""
+        try:
+            self.parse_to_dict()
+            self.xml_to_json()
+        except ValueError:
+            return
+        save_model(self.cache_path, {
+            "version": PARSER_VERSION,
+            "digest": self.cache_digest,
+            "dev_addr_dict": self.dev_addr_dict,
+            "addr_to_key": self.addr_to_key,
+            "field_records": self.field_records,
+            "json_data": self.json_data,
+        })
+        # 刚生成, 首次xml_to_json直接使用
+        self.cached_json = self.json_data
+
     # ========== 原XMLDeviceAddressParser功能 ==========
     def parse_to_dict(self) -> dict:
         """
         解析XML文件并返回地址字典
         :return: 包含页面名称到地址映射的字典
         """
+        if self.cache_pending:
+            self._load_cache()
+        if self.from_cache:
+            return self.dev_addr_dict
+        if self.stream:
+            if self.field_records is None:
+                self._iterparse()
+            if self.stream_error:
+                raise ValueError(self.stream_error)
+            return self.dev_addr_dict
+
         # 按照正确结构解析：file -> device -> interface
         file_node = self.root
         if file_node.tag != 'file':
@@ -107,6 +196,70 @@ class XMLParser:
 
         return self.dev_addr_dict
     
+    def _iterparse(self) -> None:
+        """
+        流式解析: 一次遍历同时生成dev_addr_dict与字段表
+        规则同parse_to_dict/get_field_records (file -> 第一个device -> interface)
+        field/interface结束即处理并从父节点移除, 内存只保留当前interface
+        """
+        dev_addr_dict = {}
+        records = []
+        stack = []              # 当前路径上的元素
+        root_tag = None
+        device = None           # 第一个device, 页表只看它
+        has_interface = False
+        page_name = None
+        page_address = None
+        first_field = False     # 当前interface的第一个field已处理
+
+        for event, elem in ET.iterparse(self.xml_file, events=("start", "end")):
+            if event == "start":
+                if not stack:
+                    root_tag = elem.tag
+                elif elem.tag == 'device' and device is None and len(stack) == 1 and root_tag == 'file':
+                    device = elem
+                elif elem.tag == 'interface' and device is not None and stack[-1] is device:
+                    has_interface = True
+                    page_name = None
+                    page_address = None
+                    first_field = False
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+            tag = elem.tag
+            if tag == 'field':
+                if elem.get('class') == 'Field':
+                    self._add_field_records(elem, records)
+                if parent is not None and parent.tag == 'interface' and len(stack) == 3 and stack[1] is device:
+                    if not first_field:
+                        first_field = True
+                        page_address = elem.findtext('address')
+                # 已处理, 从父节点移除释放内存
+                if parent is not None:
+                    parent.remove(elem)
+            elif tag == 'name' and parent is not None and parent.tag == 'interface' \
+                    and len(stack) == 3 and stack[1] is device and page_name is None:
+                page_name = elem.text or ""
+            elif tag == 'interface' and parent is not None:
+                if parent is device and page_name and page_address:
+                    dev_addr_dict[page_name] = page_address[:4]  # 取前4位作为页地址
+                parent.remove(elem)
+
+        # 结构错误同parse_to_dict, 留到取页表时再报, 字段表照常可用
+        if root_tag != 'file':
+            self.stream_error = "根节点不是file，请检查XML结构"
+        elif device is None:
+            self.stream_error = "XML文件中未找到device节点"
+        elif not has_interface:
+            self.stream_error = "XML文件中未找到interface节点"
+
+        self.dev_addr_dict.update(dev_addr_dict)
+        # 生成反向字典，便于地址查找
+        self.addr_to_key = {int(v, 16): k for k, v in self.dev_addr_dict.items()}
+        self.field_records = records
+
     def get_page_name_addr(self, output_file: str = None) -> str:
         """
         将解析结果保存为JSON文件
@@ -144,8 +297,11 @@ class XMLParser:
         return output_path
 
     # ========== 原xml_to_excel.py功能 ==========
-    def _parse_mask_shift(self, mask_shift_str):
-        """解析mask和shift字段的跨字节配置"""
+    def _parse_mask_shift(self, mask_shift_str, field_name=None):
+        """
+        解析mask和shift字段的跨字节配置
+        {addr:value, addr:value} -> [(addr, value), ...], 格式错误抛ValueError(带field名)
+        """
         if not mask_shift_str or mask_shift_str == "{}":
             return []
         
@@ -153,38 +309,193 @@ class XMLParser:
         # 去除大括号并按逗号分割
         items = mask_shift_str.strip("{}").split(",")
         for item in items:
-            addr_part, value_part = item.split(":")
-            addr = addr_part.strip()
-            value = value_part.strip()
-            entries.append((addr, value))
+            parts = item.split(":")
+            if len(parts) != 2:
+                raise ValueError(f"field {field_name}: bad mask/shift {mask_shift_str!r}")
+            entries.append((parts[0].strip(), parts[1].strip()))
         return entries
 
-    def xml_to_excel(self, excel_file: str = None) -> str:
+    def _parse_int(self, value_str) -> int:
+        """解析XML数值字符串, 支持0x十六进制和十进制"""
+        value_str = value_str.strip()
+        if value_str.startswith(('0x', '0X')):
+            return int(value_str, 16)
+        return int(value_str)
+
+    def get_reg_defaults(self) -> dict:
+        """
+        由field的defaultvalue/mask/shift合成每个字节寄存器的默认值
+        shift>0: 字节位 = (默认值 << shift) & mask
+        shift<0: 字节位 = (默认值 >> -shift) & mask
+        :return: {16bit字节地址(int): 默认值(int)}
+        """
+        if not self.json_data:
+            self.xml_to_json()
+        reg_defaults = {}
+        for registers in self.json_data.values():
+            for reg in registers:
+                default_value = reg.get("default_value")
+                mask = reg.mask
+                if not default_value or mask is None:
+                    continue
+                try:
+                    value = self._parse_int(default_value)
+                except ValueError:
+                    continue
+                shift = reg.shift or 0
+                if shift >= 0:
+                    byte_bits = (value << shift) & mask
+                else:
+                    byte_bits = (value >> -shift) & mask
+                addr = reg.addr
+                reg_defaults[addr] = (reg_defaults.get(addr, 0) & ~mask) | byte_bits
+        return reg_defaults
+
+    # field access值, 表示寄存器由芯片更新(状态/只读), 不能shadow缓存
+    VOLATILE_ACCESS = ("r", "ro", "read-only", "readonly", "status", "volatile")
+
+    def get_volatile_addrs(self) -> set:
+        """
+        提取易变寄存器(状态位等)的字节地址, 供ShadowCache使用
+        field满足以下任一条件视为易变:
+        - <access> 为只读/状态类 (R, RO, read-only, status...)
+        - <volatile> 为 true/1
+        :return: 16bit字节地址(int)集合
+        """
+        volatile_addrs = set()
+        for record in self.get_field_records():
+            if record.volatile and record.addr is not None:
+                volatile_addrs.add(record.addr)
+        return volatile_addrs
+
+    def get_field_records(self) -> list:
+        """
+        单次遍历所有field, 生成字段表(每个字节配置一条记录), 结果缓存
+        xml_to_json/xml_to_excel等导出只做投影, 不再各自解析XML
+        :return: [FieldRecord, ...], 见field_record.py
+        """
+        if self.cache_pending:
+            self._load_cache()
+        if self.field_records is not None:
+            return self.field_records
+        if self.stream:
+            self._iterparse()
+            return self.field_records
+
+        records = []
+        for field in self.root.findall(".//field[@class='Field']"):
+            self._add_field_records(field, records)
+
+        self.field_records = records
+        return records
+
+    def _add_field_records(self, field, records) -> None:
+        """单个field -> 每个字节配置一条记录, 追加到records"""
+        name = field.findtext('name')
+        caption = field.findtext('caption') or name
+        address = field.findtext('address')
+        default_value = field.findtext('defaultvalue')
+        size = field.findtext('size')
+        description = field.findtext('description') or ""
+        datatype = field.findtext('datatype') or ""
+        mask = field.findtext('mask') or "{}"
+        shift = field.findtext('shift') or "{}"
+        byteorder = field.findtext('byteorder') or ""
+        access = (field.findtext('access') or "").strip().lower()
+        volatile = (field.findtext('volatile') or "").strip().lower()
+        is_volatile = access in self.VOLATILE_ACCESS or volatile in ("true", "1")
+        # 名称类字符串intern, 各页重复的寄存器名/类型只存一份
+        name = intern_str(name)
+        caption = intern_str(caption)
+        datatype = intern_str(datatype)
+
+        # 解析基地址
+        base_addr = "0x0000"
+        if address:
+            match = BASE_ADDR_RE.match(address)
+            base_addr = match.group(1) if match else address.split(".")[0]
+        base_addr = intern_str(base_addr)
+
+        # 解析位域范围
+        bit_range = None
+        range_match = BIT_RANGE_RE.search(name)
+        if range_match:
+            msb = int(range_match.group(1))
+            lsb = int(range_match.group(2))
+            bit_range = f"[{msb}:{lsb}]"
+            total_bits = msb - lsb + 1
+        else:
+            total_bits = int(size) if size else 1
+
+        # 字节序说明, 同一field各字节相同
+        if byteorder == "littleendian":
+            order_note = "小端字节序"
+        elif byteorder == "bigendian":
+            order_note = "大端字节序"
+        else:
+            order_note = None
+
+        # 合并mask和shift配置
+        configs = defaultdict(dict)
+        for addr, mask_val in self._parse_mask_shift(mask, name):
+            configs[addr]["mask"] = mask_val
+        for addr, shift_val in self._parse_mask_shift(shift, name):
+            configs[addr]["shift"] = shift_val
+
+        # 为每个字节配置创建一条记录
+        for byte_addr, byte_config in configs.items():
+            # 计算有效位数
+            mask_val = byte_config.get("mask", "0x00")
+            effective_bits = bin(int(mask_val, 16)).count("1")
+
+            # 配置说明
+            notes = []
+            if byte_config.get("shift"):
+                shift_val = int(byte_config["shift"])
+                if shift_val > 0:
+                    notes.append(f"左移{shift_val}位")
+                elif shift_val < 0:
+                    notes.append(f"右移{abs(shift_val)}位")
+            if order_note:
+                notes.append(order_note)
+
+            records.append(FieldRecord(
+                caption, base_addr, name, bit_range,
+                total_bits, default_value, datatype, description,
+                byte_addr, byte_config.get("mask", ""), byte_config.get("shift", ""), effective_bits,
+                intern_str("; ".join(notes)), is_volatile,
+            ))
+
+    # Excel标题行, 顺序同FIELD_RECORD_KEYS
+    EXCEL_HEADERS = (
+        "Register Name", "Base Address", "Field Name", "Bit Range",
+        "Total Bits", "Default Value", "Data Type", "Description",
+        "Byte Address", "Byte Mask", "Byte Shift", "Effective Bits",
+        "Configuration Notes",
+    )
+    EXCEL_CENTER_COLS = (2, 4, 5, 9, 10, 11, 12)  # 数值列居中
+
+    def xml_to_excel(self, excel_file: str = None, write_only: bool = True) -> str:
         """
         将XML转换为Excel文件
         :param excel_file: (可选)自定义输出文件路径
+        :param write_only: True -> openpyxl write_only流式写出, 行写完即落盘, 内存有界
+                           False -> 原普通工作簿方式, 内容相同
         :return: 实际使用的输出文件路径
         """
         output_path = excel_file if excel_file else self.excel_output_file
-        
+        if write_only:
+            return self._write_excel_stream(output_path)
+
         wb = Workbook()
         ws = wb.active
         ws.title = "Registers"
 
         # 增强的标题行
-        headers = [
-            "Register Name", "Base Address", "Field Name", "Bit Range", 
-            "Total Bits", "Default Value", "Data Type", "Description",
-            "Byte Address", "Byte Mask", "Byte Shift", "Effective Bits",
-            "Configuration Notes"
-        ]
-        
+        headers = self.EXCEL_HEADERS
+
         # 设置标题样式
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="2F5597", end_color="2F5597", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), 
-                            top=Side(style='thin'), bottom=Side(style='thin'))
+        header_font, header_fill, header_alignment, thin_border = self._excel_styles()
 
         # 写入标题
         for col_num, header in enumerate(headers, 1):
@@ -195,90 +506,20 @@ class XMLParser:
             cell.border = thin_border
 
         row_num = 2  # 数据从第2行开始
-
-        for field in self.root.findall(".//field[@class='Field']"):
-            name = field.findtext('name')
-            caption = field.findtext('caption') or name
-            address = field.findtext('address')
-            default_value = field.findtext('defaultvalue')
-            size = field.findtext('size')
-            description = field.findtext('description') or ""
-            datatype = field.findtext('datatype') or ""
-            mask = field.findtext('mask') or "{}"
-            shift = field.findtext('shift') or "{}"
-            byteorder = field.findtext('byteorder') or ""
-
-            # 解析基地址
-            base_addr = "0x0000"
-            if address:
-                match = re.match(r"(0x[0-9A-Fa-f]+)", address)
-                base_addr = match.group(1) if match else address.split(".")[0]
-
-            # 解析位域范围
-            bit_range = None
-            range_match = re.search(r"\[(\d+):(\d+)\]", name)
-            if range_match:
-                msb = int(range_match.group(1))
-                lsb = int(range_match.group(2))
-                bit_range = f"[{msb}:{lsb}]"
-                total_bits = msb - lsb + 1
-            else:
-                total_bits = int(size) if size else 1
-
-            # 解析mask和shift配置
-            mask_entries = self._parse_mask_shift(mask)
-            shift_entries = self._parse_mask_shift(shift)
-            
-            # 合并配置信息
-            configs = defaultdict(dict)
-            for addr, mask_val in mask_entries:
-                configs[addr]["mask"] = mask_val
-            for addr, shift_val in shift_entries:
-                configs[addr]["shift"] = shift_val
-
-            # 为每个字节配置创建一行
-            for byte_addr, byte_config in configs.items():
-                # 计算有效位数
-                mask_val = byte_config.get("mask", "0x00")
-                effective_bits = bin(int(mask_val, 16)).count("1")
-                
-                # 配置说明
-                notes = []
-                if byte_config.get("shift"):
-                    shift_val = int(byte_config["shift"])
-                    if shift_val > 0:
-                        notes.append(f"左移{shift_val}位")
-                    elif shift_val < 0:
-                        notes.append(f"右移{abs(shift_val)}位")
-                
-                if byteorder == "littleendian":
-                    notes.append("小端字节序")
-                elif byteorder == "bigendian":
-                    notes.append("大端字节序")
-                    
-                # 写入Excel行数据
-                ws.cell(row=row_num, column=1, value=caption)  # Register Name
-                ws.cell(row=row_num, column=2, value=base_addr)  # Base Address
-                ws.cell(row=row_num, column=3, value=name)  # Field Name
-                ws.cell(row=row_num, column=4, value=bit_range)  # Bit Range
-                ws.cell(row=row_num, column=5, value=total_bits)  # Total Bits
-                ws.cell(row=row_num, column=6, value=default_value)  # Default Value
-                ws.cell(row=row_num, column=7, value=datatype)  # Data Type
-                ws.cell(row=row_num, column=8, value=description)  # Description
-                ws.cell(row=row_num, column=9, value=byte_addr)  # Byte Address
-                ws.cell(row=row_num, column=10, value=byte_config.get("mask", ""))  # Byte Mask
-                ws.cell(row=row_num, column=11, value=byte_config.get("shift", ""))  # Byte Shift
-                ws.cell(row=row_num, column=12, value=effective_bits)  # Effective Bits
-                ws.cell(row=row_num, column=13, value="; ".join(notes))  # Configuration Notes
-
+        num_cols = len(headers)
+        center_alignment = Alignment(horizontal="center")
+
+        for record in self.get_field_records():
+            # 写入Excel行数据, 列顺序同FIELD_RECORD_KEYS
+            values = record.values()
+            for col_num in range(1, num_cols + 1):
+                cell = ws.cell(row=row_num, column=col_num, value=values[col_num - 1])
                 # 设置数据行样式
-                for col_num in range(1, 14):
-                    cell = ws.cell(row=row_num, column=col_num)
-                    cell.border = thin_border
-                    if col_num in [2,4,5,9,10,11,12]:  # 数值列居中
-                        cell.alignment = Alignment(horizontal="center")
+                cell.border = thin_border
+                if col_num in self.EXCEL_CENTER_COLS:  # 数值列居中
+                    cell.alignment = center_alignment
 
-                row_num += 1
+            row_num += 1
 
         # 自动调整列宽
         for col in ws.columns:
@@ -302,6 +543,78 @@ class XMLParser:
         print(f"成功生成增强版Excel文件: {output_path}，共 {row_num-2} 行配置数据")
         return output_path
 
+    def _excel_styles(self) -> tuple:
+        """标题字体/填充/对齐, 及所有单元格细边框"""
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="2F5597", end_color="2F5597", fill_type="solid")
+        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                            top=Side(style='thin'), bottom=Side(style='thin'))
+        return header_font, header_fill, header_alignment, thin_border
+
+    def _write_excel_stream(self, output_path: str) -> str:
+        """
+        write_only工作簿: 逐行append带样式的WriteOnlyCell, 不保留单元格对象
+        列宽必须在第一行之前写入(<cols>在sheetData前), 所以先对字段表做一次
+        只算长度的预扫描, 规则同普通方式: (最长str(value) + 2) * 1.2
+        """
+        records = self.get_field_records()
+        headers = self.EXCEL_HEADERS
+        num_cols = len(headers)
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Registers")
+
+        # 列宽预扫描, 只遍历内存中的字段表
+        max_lengths = [len(header) for header in headers]
+        for record in records:
+            for col_index, value in enumerate(record.values()):
+                length = len(str(value))
+                if length > max_lengths[col_index]:
+                    max_lengths[col_index] = length
+        for col_index, max_length in enumerate(max_lengths):
+            ws.column_dimensions[get_column_letter(col_index + 1)].width = (max_length + 2) * 1.2
+
+        # 冻结标题行并添加筛选
+        ws.freeze_panes = "A2"
+        ws.auto_filter.ref = f"A1:{get_column_letter(num_cols)}{len(records) + 1}"
+
+        header_font, header_fill, header_alignment, thin_border = self._excel_styles()
+        center_alignment = Alignment(horizontal="center")
+
+        # 写入标题
+        row = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            cell.border = thin_border
+            row.append(cell)
+        ws.append(row)
+
+        # 每列一个样式模板, 数据单元格只复制样式索引
+        templates = []
+        for col_num in range(1, num_cols + 1):
+            cell = WriteOnlyCell(ws)
+            cell.border = thin_border
+            if col_num in self.EXCEL_CENTER_COLS:  # 数值列居中
+                cell.alignment = center_alignment
+            templates.append(cell._style)
+
+        for record in records:
+            row = []
+            for value, style in zip(record.values(), templates):
+                cell = WriteOnlyCell(ws, value=value)
+                cell._style = copy(style)
+                row.append(cell)
+            ws.append(row)
+
+        # 保存Excel文件
+        wb.save(output_path)
+        print(f"成功生成增强版Excel文件: {output_path}，共 {len(records)} 行配置数据")
+        return output_path
+
     def _get_key_by_addr(self, addr: int) -> str:
         # 确保dev_addr_dict已初始化
         if not self.dev_addr_dict:
@@ -317,19 +630,13 @@ class XMLParser:
 
         
 
-    def _get_base_key(self, byte_address) -> str:
-        addr_int = int(byte_address, 16)
-        base_addr = addr_int >> 8
-        base_name = self._get_key_by_addr(base_addr)
-        return base_name
-    
     def _organize_registers(self, register_list) -> dict:
         organized = {}
         for reg in register_list:
-            byte_addr = reg.get("byte_address")
-            if not byte_addr:
+            # FieldRecord整数地址, 不再int(byte_address, 16)
+            if reg.addr is None:
                 continue
-            base_key = self._get_base_key(byte_addr)
+            base_key = self._get_key_by_addr(reg.addr >> 8)
             if base_key not in organized:
                 organized[base_key] = []
             organized[base_key].append(reg)
@@ -367,7 +674,7 @@ class XMLParser:
             self.xml_to_json()
         output_path = json_file if json_file else self.json_output_file
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.json_data, f, ensure_ascii=False, indent=4)
+            json.dump(self.json_data, f, ensure_ascii=False, indent=4, default=record_to_dict)
         print(f"成功生成JSON文件: {output_path}")
 
     def xml_to_json(self) -> None:
@@ -377,86 +684,16 @@ class XMLParser:
         :return: 实际使用的输出文件路径
         """
         #output_path = json_file if json_file else self.json_output_file
-        
-        registers = []
-        
-        for field in self.root.findall(".//field[@class='Field']"):
-            name = field.findtext('name')
-            caption = field.findtext('caption') or name
-            address = field.findtext('address')
-            default_value = field.findtext('defaultvalue')
-            size = field.findtext('size')
-            description = field.findtext('description') or ""
-            datatype = field.findtext('datatype') or ""
-            mask = field.findtext('mask') or "{}"
-            shift = field.findtext('shift') or "{}"
-            byteorder = field.findtext('byteorder') or ""
-
-            # 解析基地址
-            base_addr = "0x0000"
-            if address:
-                match = re.match(r"(0x[0-9A-Fa-f]+)", address)
-                base_addr = match.group(1) if match else address.split(".")[0]
-
-            # 解析位域范围
-            bit_range = None
-            range_match = re.search(r"\[(\d+):(\d+)\]", name)
-            if range_match:
-                msb = int(range_match.group(1))
-                lsb = int(range_match.group(2))
-                bit_range = f"[{msb}:{lsb}]"
-                total_bits = msb - lsb + 1
-            else:
-                total_bits = int(size) if size else 1
-
-            # 解析mask和shift配置
-            mask_entries = self._parse_mask_shift(mask)
-            shift_entries = self._parse_mask_shift(shift)
-            
-            # 合并配置信息
-            configs = defaultdict(dict)
-            for addr, mask_val in mask_entries:
-                configs[addr]["mask"] = mask_val
-            for addr, shift_val in shift_entries:
-                configs[addr]["shift"] = shift_val
-
-            # 为每个字节配置创建条目
-            for byte_addr, byte_config in configs.items():
-                # 计算有效位数
-                mask_val = byte_config.get("mask", "0x00")
-                effective_bits = bin(int(mask_val, 16)).count("1")
-                
-                # 配置说明
-                notes = []
-                if byte_config.get("shift"):
-                    shift_val = int(byte_config["shift"])
-                    if shift_val > 0:
-                        notes.append(f"左移{shift_val}位")
-                    elif shift_val < 0:
-                        notes.append(f"右移{abs(shift_val)}位")
-                
-                if byteorder == "littleendian":
-                    notes.append("小端字节序")
-                elif byteorder == "bigendian":
-                    notes.append("大端字节序")
-                    
-                register_data = {
-                    "register_name": caption,
-                    "base_address": base_addr,
-                    "field_name": name,
-                    "bit_range": bit_range,
-                    "total_bits": total_bits,
-                    "default_value": default_value,
-                    "data_type": datatype,
-                    "description": description,
-                    "byte_address": byte_addr,
-                    "byte_mask": byte_config.get("mask", ""),
-                    "byte_shift": byte_config.get("shift", ""),
-                    "effective_bits": effective_bits,
-                    "configuration_notes": "; ".join(notes)
-                }
-                
-                registers.append(register_data)
+
+        # 缓存/冷启动刚生成的json_data, 只用一次, 之后由字段表重新投影
+        if self.cache_pending:
+            self._load_cache()
+        if self.cached_json is not None:
+            self.json_data, self.cached_json = self.cached_json, None
+            return
+
+        # 字段表每条记录复制一份(只复制slot引用), 后续清理名称不影响字段表
+        registers = [record.copy() for record in self.get_field_records()]
 
         # 组织寄存器数据, 可选是否write to json
         self.json_data = self._organize_registers(registers)